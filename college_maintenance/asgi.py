@@ -0,0 +1,6 @@
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'college_maintenance.settings')
+# Each async request runs its ORM calls on a fresh thread, so persistent connections would only pile up
+os.environ.setdefault('PORTAL_CONN_MAX_AGE', '0')
+application = get_asgi_application()
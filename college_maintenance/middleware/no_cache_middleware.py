@@ -1,7 +1,18 @@
 from django.utils.deprecation import MiddlewareMixin
 
 class NoCacheMiddleware(MiddlewareMixin):
+    """
+    Keep browsers/proxies from caching pages rendered for a logged-in user.
+    Public pages (homepage, login, vendor links, static files) and responses
+    that already set their own Cache-Control are left alone.
+    """
     def process_response(self, request, response):
+        if response.has_header('Cache-Control'):
+            # Checked first: touching request.user reads the session and adds "Vary: Cookie"
+            return response
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return response
         # These headers prevent browser and proxy caching
         response['Cache-Control'] = 'no-cache, no-store, must-revalidate, private, max-age=0'
         response['Pragma'] = 'no-cache'
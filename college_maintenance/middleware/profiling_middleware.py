@@ -0,0 +1,46 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from maintenance_app import profiling
+
+
+class ProfilingMiddleware:
+    """
+    Time every request (wall clock, DB queries, templates, WeasyPrint, SMTP),
+    add a Server-Timing header and feed the /metrics/ endpoint.
+    Runs natively under WSGI and ASGI; streamed responses are recorded when
+    they close. Only installed when PROFILING_ENABLED is on (see settings.py).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        profiling.install_template_hook()
+        profiling.install_query_hook()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile, token = profiling.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.stop(token)
+        return profiling.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        profile, token = profiling.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiling.stop(token)
+        return profiling.finish(request, response, profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        request_profile = profiling.current()
+        if request_profile is not None:
+            request_profile.view = (match.view_name if match else None) or view_func.__name__
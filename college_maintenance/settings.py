@@ -1,3 +1,4 @@
+# Shared settings and the development profile; production overrides live in settings_production.py
 from pathlib import Path
 import os
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,10 +24,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'django.middleware.cache.UpdateCacheMiddleware',
     'college_maintenance.middleware.no_cache_middleware.NoCacheMiddleware',
-
 ]
+
+# Request profiling: Server-Timing headers, /metrics/ and slow query/request logging
+PROFILING_ENABLED = os.environ.get('PORTAL_PROFILING') == '1'
+PROFILING_SLOW_REQUEST_MS = int(os.environ.get('PORTAL_SLOW_REQUEST_MS', 500))
+PROFILING_SLOW_QUERY_MS = int(os.environ.get('PORTAL_SLOW_QUERY_MS', 100))
+PROFILING_METRICS_TOKEN = os.environ.get('PORTAL_METRICS_TOKEN', '')
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'college_maintenance.middleware.profiling_middleware.ProfilingMiddleware')
 ROOT_URLCONF = 'college_maintenance.urls'
 TEMPLATES = [
     {
@@ -44,10 +51,57 @@ TEMPLATES = [
     },
 ]
 WSGI_APPLICATION = 'college_maintenance.wsgi.application'
+ASGI_APPLICATION = 'college_maintenance.asgi.application'
+
+# Per-process memory cache; use a shared backend (file/redis) when running several workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'college-maintenance',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+PUBLIC_PAGE_CACHE_SECONDS = 600
+FRAGMENT_CACHE_SECONDS = 300
+# Rendered request letter PDFs, one folder per request (see maintenance_app.letters)
+LETTER_CACHE_DIR = os.environ.get('PORTAL_LETTER_CACHE_DIR', BASE_DIR / 'letter_cache')
+# WeasyPrint runs in a pool of rendering processes (maintenance_app.pdf_pool); 0 renders in-process
+PDF_WORKERS = int(os.environ.get('PORTAL_PDF_WORKERS', 2))
+PDF_QUEUE_LIMIT = 8
+PDF_RENDER_TIMEOUT = 60
+PDF_MAX_TASKS_PER_WORKER = 200
+# Threads that run blocking calls (waiting on a PDF render) for the async views (maintenance_app.blocking)
+BLOCKING_WORKERS = int(os.environ.get('PORTAL_BLOCKING_WORKERS', PDF_QUEUE_LIMIT))
+# Live dashboard updates over Server-Sent Events (maintenance_app.changefeed, the event_stream view).
+# Under ASGI a stream stays open for CHANGE_FEED_STREAM_SECONDS (Django 4.2 doesn't notice a client
+# leaving mid-stream, so streams end and the browser reconnects); under WSGI each connection returns
+# what is pending and the browser reconnects after CHANGE_FEED_RETRY_SECONDS.
+CHANGE_FEED_POLL_SECONDS = 2
+CHANGE_FEED_HEARTBEAT_SECONDS = 15
+CHANGE_FEED_STREAM_SECONDS = 60
+CHANGE_FEED_RETRY_SECONDS = 5
+CHANGE_FEED_RETENTION_HOURS = 24
+# SQLite connection profile, applied to every new connection (maintenance_app.signals.apply_sqlite_pragmas):
+# WAL lets readers carry on while a writer commits, busy_timeout waits for the write lock instead of
+# failing with "database is locked", and connections are kept open so the pragmas are paid once.
+# PORTAL_SQLITE_TUNING=0 turns it off (a database file already switched to WAL stays in WAL).
+SQLITE_TUNING = os.environ.get('PORTAL_SQLITE_TUNING', '1') == '1'
+SQLITE_TUNED_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',         # fsync at checkpoints only; safe with WAL
+    'busy_timeout': 5000,            # ms
+    'cache_size': -20000,            # negative = KiB, i.e. ~20 MB page cache
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRAGMAS = SQLITE_TUNED_PRAGMAS if SQLITE_TUNING else {}
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # asgi.py defaults PORTAL_CONN_MAX_AGE to 0: async requests don't reuse thread-bound connections
+        'CONN_MAX_AGE': int(os.environ.get('PORTAL_CONN_MAX_AGE', 600 if SQLITE_TUNING else 0)),
     }
 }
 AUTH_PASSWORD_VALIDATORS = []
@@ -60,15 +114,19 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / "maintenance_app" / "static",
 ]
+# Serve STATIC_ROOT from Django (precompressed, fingerprinted; see maintenance_app.static_assets).
+# Off in development, where runserver serves the source files.
+SERVE_STATIC = False
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/accounts/login/'
-STATIC_VERSION = 2
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Offline: PORTAL_EMAIL_BACKEND=maintenance_app.mail_backends.SimulatedSMTPBackend (or Django's filebased/console)
+EMAIL_BACKEND = os.environ.get('PORTAL_EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -77,3 +135,9 @@ EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', 'masoodmashu251@gmail.com')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', 'ousm iuda kxjx xnry')
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Outbox dispatcher (maintenance_app.outbox): batch size per SMTP connection, provider rate limit, retry backoff
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_RATE_PER_MINUTE = int(os.environ.get('PORTAL_EMAIL_RATE_PER_MINUTE', 60))
+EMAIL_RETRY_BASE_SECONDS = 60
+EMAIL_RETRY_MAX_SECONDS = 60 * 60
@@ -0,0 +1,57 @@
+"""
+Production profile. settings.py holds the shared settings and the development
+defaults; run production workers with
+
+    DJANGO_SETTINGS_MODULE=college_maintenance.settings_production
+    PORTAL_SECRET_KEY=... PORTAL_ALLOWED_HOSTS=portal.example.edu
+
+and run "python manage.py build_static" on deploy (static files are served
+with hashed names, precompressed, from STATIC_ROOT).
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES, os
+
+DEBUG = False
+SECRET_KEY = os.environ['PORTAL_SECRET_KEY']
+ALLOWED_HOSTS = [host for host in os.environ.get('PORTAL_ALLOWED_HOSTS', '').split(',') if host]
+
+# Keep DB connections open between requests instead of reconnecting every time
+DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('PORTAL_CONN_MAX_AGE', 600))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Templates are compiled once per process; no debug context processor
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'] = [
+    p for p in TEMPLATES[0]['OPTIONS']['context_processors'] if p != 'django.template.context_processors.debug'
+]
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Set PORTAL_SERVE_STATIC=0 when a front-end server (nginx) serves STATIC_ROOT itself
+SERVE_STATIC = os.environ.get('PORTAL_SERVE_STATIC', '1') == '1'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+}
+
+# Shared between the web workers and run_jobs, so cache invalidation reaches every process
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('PORTAL_CACHE_DIR', str(BASE_DIR / 'cache')),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'root': {'handlers': ['console'], 'level': 'WARNING'},
+}
@@ -1,6 +1,15 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from maintenance_app import static_assets
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('maintenance_app.urls')),
 ]
+
+if settings.SERVE_STATIC:
+    urlpatterns += [re_path(r'^%s/(?P<path>.+)$' % re.escape(settings.STATIC_URL.strip('/')), static_assets.serve)]
@@ -1,6 +1,9 @@
 from django.contrib import admin
-from .models import Profile, MaintenanceRequest
-from .models import QuotationResponse, QuotationItem, QuotationBatch
+from django.db.models.expressions import RawSQL
+from . import search
+from .models import Profile, MaintenanceRequest, RequestItem
+from .models import QuotationResponse, QuotationItem, QuotationBatch, BackgroundJob, RequestStatusCount
+from .models import EquipmentCatalog, EquipmentPriceHistory, DailyBranchStats, OutboundEmail, ChangeEvent
 
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
@@ -8,12 +11,35 @@ class ProfileAdmin(admin.ModelAdmin):
     list_filter = ('role', 'branch')
     search_fields = ('user__username', 'user__first_name', 'user__last_name')
 
+class RequestItemInline(admin.TabularInline):
+    model = RequestItem
+    extra = 0
+
 @admin.register(MaintenanceRequest)
 class MaintenanceRequestAdmin(admin.ModelAdmin):
+    inlines = [RequestItemInline]
     list_display = ('title', 'branch', 'hod', 'status', 'date_submitted')
     list_filter = ('status', 'branch', 'date_submitted')
-    search_fields = ('title', 'description', 'hod__username', 'hod__first_name', 'hod__last_name')
+    # Text search goes through the full-text index (see get_search_results); HODs match by exact username
+    search_fields = ('=hod__username',)
     ordering = ('-date_submitted',)
+
+    def get_search_fields(self, request):
+        if search.available():
+            return self.search_fields
+        return ('title', 'description', 'lab_name', 'hod__username')
+
+    def get_search_results(self, request, queryset, search_term):
+        by_user, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not search_term or not search.available() or not search.match_expression(search_term):
+            return by_user, may_have_duplicates
+        by_text = queryset.filter(pk__in=RawSQL(*search.matching_ids(search_term)))
+        return by_user | by_text, may_have_duplicates
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Item rows may have changed through the inline
+        search.index([form.instance.pk])
  
 @admin.register(QuotationResponse)
 class QuotationResponseAdmin(admin.ModelAdmin):
@@ -27,4 +53,54 @@ class QuotationItemAdmin(admin.ModelAdmin):
 
 @admin.register(QuotationBatch)
 class QuotationBatchAdmin(admin.ModelAdmin):
-    list_display = ('id', 'token', 'created_at')
\ No newline at end of file
+    list_display = ('id', 'token', 'created_at')
+    filter_horizontal = ('requests',)
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('created_at', 'updated_at')
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('subject', 'to')
+    exclude = ('attachment',)
+    readonly_fields = ('created_at', 'updated_at', 'sent_at')
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'request_id', 'hod_id', 'created_at')
+    list_filter = ('kind',)
+    readonly_fields = ('created_at',)
+
+@admin.register(RequestStatusCount)
+class RequestStatusCountAdmin(admin.ModelAdmin):
+    list_display = ('hod', 'status', 'count')
+    list_filter = ('status',)
+
+@admin.register(DailyBranchStats)
+class DailyBranchStatsAdmin(admin.ModelAdmin):
+    list_display = ('day', 'branch', 'status', 'count', 'amount')
+    list_filter = ('status', 'branch')
+    date_hierarchy = 'day'
+
+class EquipmentPriceHistoryInline(admin.TabularInline):
+    model = EquipmentPriceHistory
+    extra = 0
+    can_delete = False
+    readonly_fields = ('version', 'price', 'effective_from')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(EquipmentCatalog)
+class EquipmentCatalogAdmin(admin.ModelAdmin):
+    inlines = [EquipmentPriceHistoryInline]
+    list_display = ('device', 'brand', 'size', 'price', 'price_version', 'is_active', 'sort_order')
+    list_editable = ('price', 'is_active', 'sort_order')
+    list_filter = ('is_active', 'device')
+    search_fields = ('device', 'brand', 'size')
+    readonly_fields = ('price_version',)
@@ -2,3 +2,7 @@ from django.apps import AppConfig
 class MaintenanceAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'maintenance_app'
+
+    def ready(self):
+        # Model signal receivers; job handlers (maintenance_app.tasks) are imported by jobs on first use
+        from . import signals  # noqa: F401
@@ -0,0 +1,43 @@
+"""
+Bounded thread pool for blocking work started from async views.
+
+Under ASGI the async views run on the event loop; anything that waits on
+something slow (a PDF render, an SMTP server) goes through ``run`` so it
+occupies one of BLOCKING_WORKERS threads instead of the loop. Work sent here
+must not touch the ORM: do the queries first (async ORM or sync_to_async) and
+pass plain values in.
+"""
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(settings.BLOCKING_WORKERS, 1),
+                                           thread_name_prefix='portal-blocking')
+    return _executor
+
+
+async def run(func, *args, **kwargs):
+    """Await ``func(*args, **kwargs)`` running in the blocking pool."""
+    return await sync_to_async(func, thread_sensitive=False, executor=executor())(*args, **kwargs)
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown)
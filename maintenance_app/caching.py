@@ -0,0 +1,77 @@
+"""
+Cache helpers for pages and template fragments.
+
+Anything that doesn't depend on the logged-in user (homepage, equipment
+catalog rows, department list) is cached with a TTL. Fragments built from
+requests or quotations put a version number in their cache key; the signals
+in maintenance_app.signals bump the version when the underlying rows change,
+so stale fragments are simply never looked up again.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from .models import MaintenanceRequest
+
+# Version scopes
+REQUESTS = 'requests'        # anything listing MaintenanceRequest rows across HODs
+QUOTATIONS = 'quotations'    # quotation batch list
+CATALOG = 'catalog'          # active EquipmentCatalog rows (maintenance_app.catalog)
+
+
+def fragment_ttl():
+    return getattr(settings, 'FRAGMENT_CACHE_SECONDS', 300)
+
+
+def public_page_ttl():
+    return getattr(settings, 'PUBLIC_PAGE_CACHE_SECONDS', 600)
+
+
+def hod_scope(hod_id):
+    return f'hod:{hod_id}'
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def version(scope):
+    """Current version number of ``scope`` (for use in fragment cache keys)."""
+    key = _version_key(scope)
+    current = cache.get(key)
+    if current is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        current = time.time_ns()
+        cache.add(key, current, None)
+        current = cache.get(key, current)
+    return current
+
+
+def bump(*scopes):
+    """Invalidate every fragment keyed on ``scopes``."""
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), time.time_ns(), None)
+
+
+def requests_changed(*hod_ids):
+    """MaintenanceRequest rows of ``hod_ids`` were created/changed/deleted."""
+    bump(REQUESTS, *(hod_scope(hod_id) for hod_id in set(hod_ids) if hod_id))
+    cache.delete('departments')
+
+
+def departments():
+    """Distinct request branches (sorted) for the filter dropdowns."""
+    return cache.get_or_set(
+        'departments',
+        lambda: list(MaintenanceRequest.objects.values_list('branch', flat=True).distinct().order_by('branch')),
+        fragment_ttl(),
+    )
+
+
+def forget_catalog_rows():
+    cache.delete(make_template_fragment_key('catalog_rows'))
@@ -0,0 +1,111 @@
+"""
+Process-local cache of the equipment catalog.
+
+new_request / edit_request read the catalog on every hit, so the active
+items are loaded once per process. The copy is tagged with the CATALOG
+version in the shared cache (maintenance_app.caching): saving or deleting an
+EquipmentCatalog row bumps it once the change commits (see
+maintenance_app.signals), and every worker reloads on its next read.
+"""
+from decimal import Decimal
+
+from . import caching
+from .models import EquipmentCatalog
+
+_items = None
+_by_id = None
+_loaded_version = None
+
+
+def _current():
+    """Load the catalog if this process has none or the shared version moved on."""
+    global _items, _by_id, _loaded_version
+    current = caching.version(caching.CATALOG)
+    if _items is None or _loaded_version != current:
+        rows = EquipmentCatalog.objects.filter(is_active=True).values(
+            'id', 'device', 'brand', 'size', 'usage', 'remarks', 'price', 'price_version')
+        _items = tuple(rows)
+        _by_id = {row['id']: row for row in _items}
+        _loaded_version = current
+
+
+def catalog_items():
+    """Active catalog items (dicts) in display order."""
+    _current()
+    return _items
+
+
+def catalog_by_id():
+    """Active catalog items keyed by id."""
+    _current()
+    return _by_id
+
+
+def invalidate():
+    """Drop the catalog in every process (call after the change has committed)."""
+    global _items, _by_id
+    _items = _by_id = None
+    caching.bump(caching.CATALOG)
+
+
+def _line_entry(line):
+    """A saved RequestItem as an entry, at the price and price_version it was ordered at."""
+    return {
+        'catalog_id': line.catalog_item_id,
+        'price_version': line.price_version,
+        'device': line.device,
+        'brand': line.brand,
+        'size': line.size,
+        'usage': line.usage,
+        'remarks': line.remarks,
+        'price': line.price,
+    }
+
+
+def _catalog_entry(item):
+    return {
+        'catalog_id': item['id'],
+        'price_version': item['price_version'],
+        'device': item['device'],
+        'brand': item['brand'],
+        'size': item['size'],
+        'usage': item['usage'],
+        'remarks': item['remarks'],
+        'price': item['price'],
+    }
+
+
+def price_entries(entries, lines=None):
+    """
+    Check posted item entries against the catalog and re-price them server side.
+    Each entry needs a ``catalog_id`` of an active item; device details and price
+    come from the catalog, only the quantity is taken from the form.
+    ``lines`` (RequestItem id -> RequestItem) are the saved lines of a request
+    being edited: an entry whose ``line_id`` is one of them keeps that line's
+    details, price and price_version, even if the catalog item has changed or gone.
+    Returns (entries, total). Raises ValueError for unknown catalog ids.
+    """
+    by_id = catalog_by_id()
+    lines = lines or {}
+    priced, total = [], Decimal('0.00')
+    for entry in entries:
+        try:
+            quantity = max(int(entry.get('quantity', 1)), 0)
+        except (TypeError, ValueError):
+            quantity = 0
+        try:
+            line = lines.get(int(entry.get('line_id')))
+        except (TypeError, ValueError):
+            line = None
+        if line is not None:
+            details = _line_entry(line)
+        else:
+            try:
+                details = _catalog_entry(by_id[int(entry.get('catalog_id'))])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Unknown catalog item: {entry.get('catalog_id')!r}")
+        if not quantity:
+            continue
+        priced.append(dict(details, quantity=quantity))
+        total += details['price'] * quantity
+    return priced, total
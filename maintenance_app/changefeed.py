@@ -0,0 +1,165 @@
+"""
+Change feed behind the live dashboards (the event_stream view).
+
+Every change a dashboard shows is written as a ChangeEvent row in the same
+transaction as the change: the MaintenanceRequest / QuotationResponse signals
+record submissions, status changes, edits, deletions and quotations, and
+bulk_update_status records its .update() with record_status_changes(). The
+row id is the SSE event id, so a browser reconnecting with Last-Event-ID gets
+exactly what it missed (SQLite commits one writer at a time, so ids become
+visible in order).
+
+Streams in this process are woken as soon as a change commits; changes made
+by other processes are picked up by polling. prune() (run from run_jobs)
+drops events older than CHANGE_FEED_RETENTION_HOURS.
+"""
+import asyncio
+import json
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ChangeEvent
+
+REQUEST_CREATED = 'request.created'
+REQUEST_STATUS = 'request.status'
+REQUEST_UPDATED = 'request.updated'
+REQUEST_DELETED = 'request.deleted'
+QUOTATION_RECEIVED = 'quotation.received'
+QUOTATION_UPDATED = 'quotation.updated'
+# Sent instead of a backlog the feed no longer has; the dashboard reloads
+RESET = 'reset'
+
+# The MaintenanceRequest fields a dashboard row shows
+DISPLAYED_FIELDS = ('status', 'title', 'branch')
+# What record_status_changes() reads, for loading rows before a bulk update
+PAYLOAD_FIELDS = ('hod', 'title', 'branch', 'status', 'date_submitted', 'total_amount')
+BATCH_SIZE = 200
+
+_waiters = set()
+_waiters_lock = threading.Lock()
+
+
+def state_of(instance):
+    """The displayed fields of a MaintenanceRequest as loaded, to tell whether a save changes its row."""
+    return tuple(instance.__dict__.get(f) for f in DISPLAYED_FIELDS)
+
+
+def request_payload(r, **extra):
+    """Event data of a request row (the request_row() fields bar the URL, which the stream adds)."""
+    return dict({
+        'id': r.id,
+        'title': r.title,
+        'branch': r.branch,
+        'status': r.status,
+        'date_submitted': r.date_submitted.isoformat() if r.date_submitted else None,
+        'total_amount': str(r.total_amount),
+    }, **extra)
+
+
+def quotation_payload(q):
+    return {
+        'id': q.id,
+        'batch_id': q.batch_id,
+        'company_name': q.company_name,
+        'total_amount': q.total_amount,
+        'selected': q.selected,
+    }
+
+
+def record(kind, payload, hod_id=None, request_id=None):
+    """Add an event; it becomes visible (and wakes the streams) when the current transaction commits."""
+    ChangeEvent.objects.create(kind=kind, payload=payload, hod_id=hod_id, request_id=request_id)
+    transaction.on_commit(_wake)
+
+
+def record_status_changes(requests, new_status):
+    """Events for a bulk ``.update(status=new_status)``; ``requests`` are the rows as loaded before it."""
+    events = [
+        ChangeEvent(kind=REQUEST_STATUS, hod_id=r.hod_id, request_id=r.id,
+                    payload=request_payload(r, status=new_status, old_status=r.status))
+        for r in requests if r.status != new_status
+    ]
+    if events:
+        ChangeEvent.objects.bulk_create(events)
+        transaction.on_commit(_wake)
+
+
+def _after(last_id, hod_id):
+    events = ChangeEvent.objects.filter(id__gt=last_id).order_by('id')
+    if hod_id is not None:
+        events = events.filter(hod_id=hod_id)
+    return events[:BATCH_SIZE]
+
+
+def events_after(last_id, hod_id=None):
+    """Up to BATCH_SIZE events after ``last_id``, oldest first (only ``hod_id``'s when given)."""
+    return list(_after(last_id, hod_id))
+
+
+async def aevents_after(last_id, hod_id=None):
+    return [event async for event in _after(last_id, hod_id)]
+
+
+def _latest():
+    return ChangeEvent.objects.order_by('-id').values_list('id', flat=True)
+
+
+def latest_id():
+    """Id of the newest event (0 when there are none): where a freshly rendered dashboard resumes."""
+    return _latest().first() or 0
+
+
+async def alatest_id():
+    return await _latest().afirst() or 0
+
+
+async def aexpired(last_id):
+    """
+    True if the events after ``last_id`` may be gone. prune() always keeps the
+    newest event, so an id the feed handed out exists until it is pruned.
+    """
+    return bool(last_id) and not await ChangeEvent.objects.filter(id=last_id).aexists()
+
+
+def prune(hours=None):
+    """Delete events older than ``hours`` (CHANGE_FEED_RETENTION_HOURS), keeping the newest. Returns the count."""
+    hours = settings.CHANGE_FEED_RETENTION_HOURS if hours is None else hours
+    cutoff = timezone.now() - timedelta(hours=hours)
+    deleted, _ = ChangeEvent.objects.filter(created_at__lt=cutoff, id__lt=latest_id()).delete()
+    return deleted
+
+
+def message(event_id, kind, data):
+    """One Server-Sent Events message (without an id line when ``event_id`` is None)."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {kind}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def _wake():
+    with _waiters_lock:
+        waiters = list(_waiters)
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:  # the stream's loop has closed
+            pass
+
+
+async def wait(timeout):
+    """Sleep until a change commits in this process or ``timeout`` seconds pass; True if woken."""
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    with _waiters_lock:
+        _waiters.add(waiter)
+    try:
+        await asyncio.wait_for(waiter[1].wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+    finally:
+        with _waiters_lock:
+            _waiters.discard(waiter)
@@ -0,0 +1,82 @@
+"""
+Status counter cache for the dashboard cards.
+
+Per-HOD counts live in RequestStatusCount (one row per HOD + status) and are
+adjusted by the MaintenanceRequest signals in maintenance_app.signals, so
+reading them is a single small query no matter how many requests exist. The
+all-HOD cards are summed from the DailyBranchStats rollup
+(maintenance_app.rollup), which is the only all-HOD source.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import DailyBranchStats, MaintenanceRequest, RequestStatusCount
+
+CARD_STATUSES = ('Pending', 'Approved', 'Rejected')
+
+
+def _bump(hod_id, status, delta):
+    rows = RequestStatusCount.objects.filter(hod_id=hod_id, status=status)
+    if rows.update(count=F('count') + delta) or delta < 0:
+        # Decrements never create rows (the HOD may be mid-cascade delete)
+        return
+    try:
+        with transaction.atomic():
+            RequestStatusCount.objects.create(hod_id=hod_id, status=status, count=delta)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(count=F('count') + delta)
+
+
+def adjust(hod_id, status, delta):
+    """Add ``delta`` to ``hod_id``'s counter of ``status``."""
+    if not delta or hod_id is None:
+        return
+    _bump(hod_id, status, delta)
+
+
+def apply_grouped(grouped, new_status):
+    """
+    Move counts after a bulk ``.update(status=new_status)``.
+    ``grouped`` is the pre-update ``values('hod', 'status').annotate(n=Count('id'))`` result.
+    """
+    for row in grouped:
+        if row['status'] != new_status:
+            adjust(row['hod'], row['status'], -row['n'])
+            adjust(row['hod'], new_status, row['n'])
+
+
+def _status_rows(hod_id):
+    if hod_id is None:
+        return (DailyBranchStats.objects.order_by().values('status')
+                .annotate(n=Sum('count')).values_list('status', 'n'))
+    return RequestStatusCount.objects.filter(hod_id=hod_id).values_list('status', 'count')
+
+
+def _cards(by_status):
+    counts = {status.lower(): by_status.get(status, 0) for status in CARD_STATUSES}
+    counts['total'] = sum(by_status.values())
+    return counts
+
+
+def status_counts(hod=None):
+    """
+    Card counts for one HOD (or everyone when ``hod`` is None, read from the
+    DailyBranchStats rollup): {'total': .., 'pending': .., 'approved': .., 'rejected': ..}
+    """
+    return _cards(dict(_status_rows(getattr(hod, 'pk', hod))))
+
+
+async def astatus_counts(hod=None):
+    """status_counts() through the async ORM, for the ASGI views."""
+    return _cards({status: n async for status, n in _status_rows(getattr(hod, 'pk', hod))})
+
+
+def rebuild():
+    """Recompute every counter from one grouped aggregation over MaintenanceRequest."""
+    grouped = MaintenanceRequest.objects.order_by().values('hod', 'status').annotate(n=Count('id'))
+    rows = [RequestStatusCount(hod_id=row['hod'], status=row['status'], count=row['n']) for row in grouped]
+
+    with transaction.atomic():
+        RequestStatusCount.objects.all().delete()
+        RequestStatusCount.objects.bulk_create(rows)
@@ -0,0 +1,86 @@
+"""
+Serve a file from disk with an ETag (If-None-Match -> 304) and single byte-range
+support (Range / If-Range -> 206 or 416).
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def byte_range(header, size):
+    """
+    Inclusive (start, end) for a single ``Range: bytes=...`` header.
+    None when there is no usable range (serve the whole file), False when it can't be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            data = fh.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def serve_file(request, path, etag, content_type, filename=None, as_attachment=False,
+               cache_control='private, no-cache'):
+    """
+    FileResponse for ``path`` honouring If-None-Match, Range and If-Range.
+    Content-Disposition is only sent when ``filename`` is given.
+    """
+    etag = quote_etag(etag)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        not_modified['Cache-Control'] = cache_control
+        return not_modified
+
+    size = os.path.getsize(path)
+    span = None
+    if request.headers.get('If-Range', etag) == etag:
+        span = byte_range(request.headers.get('Range', ''), size)
+
+    if span is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif span:
+        start, end = span
+        response = FileResponse(_read(path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    if filename:
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    else:
+        # FileResponse names the file on disk (e.g. app.<hash>.js.gz); without a filename send none
+        del response['Content-Disposition']
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,115 @@
+"""
+Helpers for the equipment lines of a MaintenanceRequest (RequestItem rows).
+
+The request forms still post the selection as a JSON list of
+{catalog_id, device, brand, size, price, usage, remarks, quantity}; these helpers turn
+that payload into RequestItem rows.
+"""
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Sum
+
+from . import search
+from .models import RequestItem
+
+
+def parse_selected_items(raw):
+    """
+    Decode the posted selected_items JSON into a list of dicts.
+    Tolerates double-encoded payloads; raises ValueError on anything that isn't a list.
+    """
+    if not raw:
+        return []
+    data = json.loads(raw)
+    if isinstance(data, str):
+        data = json.loads(data)
+    if not isinstance(data, list):
+        raise ValueError("selected_items must be a JSON list")
+    return [entry for entry in data if isinstance(entry, dict)]
+
+
+def _decimal(value):
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError, TypeError):
+        return Decimal('0.00')
+
+
+def _quantity(value):
+    try:
+        return max(int(value), 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def build_items(req, entries):
+    """Unsaved RequestItem rows for ``req`` from parsed entries (zero-quantity lines are skipped)."""
+    items = []
+    for entry in entries:
+        quantity = _quantity(entry.get('quantity', 1))
+        if not quantity:
+            continue
+        price = _decimal(entry.get('price', 0))
+        items.append(RequestItem(
+            request=req,
+            catalog_item_id=entry.get('catalog_id'),
+            price_version=entry.get('price_version'),
+            device=str(entry.get('device', ''))[:255],
+            brand=str(entry.get('brand', '') or '')[:255],
+            size=str(entry.get('size', '') or '')[:255],
+            usage=str(entry.get('usage', '') or '')[:100],
+            remarks=str(entry.get('remarks', '') or '')[:255],
+            price=price,
+            quantity=quantity,
+            subtotal=price * quantity,
+        ))
+    return items
+
+
+def replace_items(req, entries):
+    """Swap the saved items of ``req`` for ``entries`` (call inside a transaction)."""
+    req.items.all().delete()
+    items = RequestItem.objects.bulk_create(build_items(req, entries))
+    # bulk_create skips the signals; the device names are part of the search document
+    search.index([req.pk])
+    return items
+
+
+def _same_item(line, item):
+    if line.catalog_item_id:
+        return line.catalog_item_id == item['id']
+    # Lines from before the catalog have no catalog id
+    return (line.device, line.size, line.brand) == (item['device'], item['size'], item['brand'])
+
+
+def edit_rows(req, catalog_items):
+    """
+    Rows of the edit form: the active catalog with the request's saved lines on
+    the item they were ordered as (at their own price), then the saved lines
+    whose item is no longer in the catalog. Rows of saved lines carry line_id.
+    """
+    lines = list(req.items.all())
+    rows = []
+    for item in catalog_items:
+        line = next((line for line in lines if _same_item(line, item)), None)
+        if line is None:
+            rows.append(dict(item, catalog_id=item['id'], line_id=None, quantity=0))
+        else:
+            lines.remove(line)
+            rows.append(dict(item, catalog_id=item['id'], line_id=line.id, price=line.price, quantity=line.quantity))
+    rows.extend({
+        'catalog_id': line.catalog_item_id, 'line_id': line.id, 'device': line.device, 'brand': line.brand,
+        'size': line.size, 'usage': line.usage, 'remarks': line.remarks, 'price': line.price,
+        'quantity': line.quantity,
+    } for line in lines)
+    return rows
+
+
+def device_summary(requests_qs):
+    """Quantity and spend per device across ``requests_qs``, as one SQL aggregate."""
+    return (RequestItem.objects
+            .filter(request__in=requests_qs.order_by().values('id'))
+            .values('device')
+            .annotate(requests=Count('request', distinct=True), quantity=Sum('quantity'), spend=Sum('subtotal'))
+            .order_by('-spend'))
@@ -0,0 +1,110 @@
+"""
+Persistent, DB-backed job queue.
+
+Views call ``enqueue()`` and return straight away; the ``run_jobs`` management
+command picks queued jobs up, runs the registered handler and retries failures
+with exponential backoff.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+# Modules whose @handler functions fill HANDLERS; imported on first use so web
+# workers don't load the PDF/email code at start-up
+HANDLER_MODULES = ('maintenance_app.tasks',)
+
+RETRY_BASE_SECONDS = getattr(settings, 'JOB_RETRY_BASE_SECONDS', 30)
+RETRY_MAX_SECONDS = getattr(settings, 'JOB_RETRY_MAX_SECONDS', 60 * 60)
+
+
+def handler(kind):
+    """Register the decorated function as the handler for jobs of ``kind``."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def handlers():
+    """Registered handlers by kind (imports HANDLER_MODULES the first time)."""
+    for module in HANDLER_MODULES:
+        import_module(module)
+    return HANDLERS
+
+
+def enqueue(kind, max_attempts=5, **payload):
+    """Store a job for the worker and return it."""
+    if kind not in handlers():
+        raise ValueError(f"No job handler registered for '{kind}'")
+    return BackgroundJob.objects.create(kind=kind, payload=payload, max_attempts=max_attempts)
+
+
+def backoff_delay(attempts):
+    """Seconds to wait before retrying a job that has failed ``attempts`` times."""
+    return min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+
+
+def claim_next():
+    """
+    Atomically move the oldest runnable job from Queued to Running.
+    The conditional UPDATE keeps two workers from claiming the same job.
+    """
+    now = timezone.now()
+    candidates = (BackgroundJob.objects
+                  .filter(status='Queued', run_after__lte=now)
+                  .order_by('run_after', 'id')
+                  .values_list('id', flat=True)[:5])
+    for job_id in candidates:
+        claimed = BackgroundJob.objects.filter(id=job_id, status='Queued').update(status='Running', updated_at=now)
+        if claimed:
+            return BackgroundJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome (Done, re-Queued with backoff, or Failed)."""
+    job.attempts += 1
+    try:
+        func = handlers()[job.kind]
+        func(**job.payload)
+    except Exception as e:
+        job.last_error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        if job.attempts >= job.max_attempts:
+            job.status = 'Failed'
+            logger.error("Job %s (%s) failed permanently: %s", job.id, job.kind, job.last_error)
+        else:
+            job.status = 'Queued'
+            job.run_after = timezone.now() + timedelta(seconds=backoff_delay(job.attempts))
+            logger.warning("Job %s (%s) failed, retry %s at %s", job.id, job.kind, job.attempts, job.run_after)
+    else:
+        job.status = 'Done'
+        job.last_error = None
+    job.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'updated_at'])
+    return job
+
+
+def requeue_stale(minutes=15):
+    """Put back jobs left Running by a worker that died mid-job."""
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return BackgroundJob.objects.filter(status='Running', updated_at__lt=cutoff).update(status='Queued')
+
+
+def run_pending(limit=None):
+    """Run runnable jobs until the queue is empty (or ``limit`` is reached). Returns the number run."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_next()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
@@ -0,0 +1,86 @@
+"""
+Content-addressed store of rendered request letters.
+
+A letter is kept as LETTER_CACHE_DIR/<request id>/<sha256>.pdf. The hash covers
+the rendered letter HTML (so the template and every field it shows) plus the
+WeasyPrint version, so a letter is only rendered again when the request, its
+items or the template change; the outdated PDF of that request is removed then.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from . import pdf_pool, profiling
+
+TEMPLATE = 'request_letter.html'
+
+
+@lru_cache(maxsize=None)
+def _renderer_version():
+    try:
+        return metadata.version('weasyprint')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def letter_html(req):
+    """HTML of the letter of ``req`` (prefetch ``items`` to save a query)."""
+    return render_to_string(TEMPLATE, {'request_obj': req, 'items': req.items.all()})
+
+
+def digest(html):
+    return hashlib.sha256(f"{_renderer_version()}\n{html}".encode()).hexdigest()
+
+
+def letter_dir(request_id):
+    return Path(settings.LETTER_CACHE_DIR) / str(request_id)
+
+
+def render_pdf(html):
+    """Render letter HTML to PDF bytes in the rendering pool (see maintenance_app.pdf_pool)."""
+    with profiling.section('weasyprint'):
+        return pdf_pool.render(html)
+
+
+def _store(folder, path, pdf):
+    folder.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so readers never see a half written file
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(pdf)
+    os.replace(tmp, path)
+    for old in folder.glob('*.pdf'):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def stored_letter(request_id, html):
+    """(path, hash) of the stored PDF of letter ``html``, rendering it first if it is missing. No queries."""
+    key = digest(html)
+    folder = letter_dir(request_id)
+    path = folder / f'{key}.pdf'
+    if not path.exists():
+        _store(folder, path, render_pdf(html))
+    return path, key
+
+
+def letter_file(req):
+    """(path, hash) of the stored letter PDF of ``req``, rendering it first if it is missing or outdated."""
+    return stored_letter(req.pk, letter_html(req))
+
+
+def letter_pdf(req):
+    """The letter of ``req`` as PDF bytes (from the store when it is current)."""
+    path, _ = letter_file(req)
+    return path.read_bytes()
+
+
+def forget(request_id):
+    shutil.rmtree(letter_dir(request_id), ignore_errors=True)
@@ -0,0 +1,40 @@
+"""
+Local stand-in for the SMTP server, for development and offline throughput runs.
+
+SimulatedSMTPBackend keeps messages in django.core.mail.outbox like the locmem
+backend, but waits EMAIL_SIMULATED_CONNECT_MS when a connection is opened and
+EMAIL_SIMULATED_SEND_MS per message, roughly what a hosted SMTP provider costs.
+Use it with PORTAL_EMAIL_BACKEND=maintenance_app.mail_backends.SimulatedSMTPBackend.
+"""
+import time
+
+from django.conf import settings
+from django.core.mail.backends.locmem import EmailBackend
+
+
+class SimulatedSMTPBackend(EmailBackend):
+    connections_opened = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connected = False
+
+    def open(self):
+        if self.connected:
+            return False
+        time.sleep(getattr(settings, 'EMAIL_SIMULATED_CONNECT_MS', 300) / 1000)
+        type(self).connections_opened += 1
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        opened = self.open()
+        try:
+            time.sleep(getattr(settings, 'EMAIL_SIMULATED_SEND_MS', 20) / 1000 * len(messages))
+            return super().send_messages(messages)
+        finally:
+            if opened:
+                self.close()
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import unquote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = ('/api/counts/', '/api/requests/?page_size=50', '/reports/data/?bucket=week',
+                 '/principal/quotations/{batch_id}/comparison/')
+
+
+# The helpers below run in spawned processes: they point the default connection at the
+# benchmark database before anything touches it, and import models only after setup.
+
+def _prepare(db_path, pending, result):
+    """Migrate a fresh database, seed requests and a batch, and log an admin in."""
+    import django
+    django.setup()
+    from decimal import Decimal
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+
+    connections['default'].settings_dict['NAME'] = db_path
+    from maintenance_app import counters, rollup
+    from maintenance_app.models import MaintenanceRequest, Profile
+    from maintenance_app.quotations import create_batch
+
+    call_command('migrate', verbosity=0)
+    admin = User.objects.create_user('bench_admin', password='x', is_superuser=True, is_staff=True)
+    Profile.objects.create(user=admin, role='ADMIN')
+    hod = User.objects.create_user('bench_hod', password='x')
+    Profile.objects.create(user=hod, role='HOD', branch='CSE')
+    branches = ('CSE', 'ECE', 'MECH', 'CIVIL')
+    statuses = ('Pending', 'Approved', 'Rejected')
+    MaintenanceRequest.objects.bulk_create(
+        MaintenanceRequest(hod=hod, branch=branches[n % 4], status=statuses[n % 3], title=f'Request {n}',
+                           description='bench', total_amount=Decimal(100 + n % 50)) for n in range(pending))
+    counters.rebuild()
+    rollup.rebuild()
+    batch = create_batch(MaintenanceRequest.objects.order_by('id').values_list('id', flat=True)[:5])
+    client = Client()
+    client.force_login(admin)
+    result.put({'cookie': f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}",
+                'batch_id': batch.id})
+
+
+def _serve(db_path, interface, server, port, threads):
+    """Run college_maintenance.wsgi / .asgi on 127.0.0.1:port until terminated."""
+    from importlib import import_module
+
+    module = import_module(f'college_maintenance.{interface}')
+    from django.db import connections
+    connections['default'].settings_dict['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['127.0.0.1']
+
+    if interface == 'wsgi':
+        PooledWSGIServer.threads = threads
+        make_server('127.0.0.1', port, module.application, PooledWSGIServer, QuietHandler).serve_forever()
+    elif server == 'uvicorn':
+        import uvicorn
+        uvicorn.run(module.application, host='127.0.0.1', port=port, log_level='warning',
+                    access_log=False, lifespan='off')
+    else:
+        asyncio.run(_asgi_server(module.application, port))
+
+
+class PooledWSGIServer(WSGIServer):
+    """wsgiref with a fixed pool of request threads, like a server with N sync workers."""
+    threads = 4
+    request_queue_size = 1024
+    _pool = None
+
+    def process_request(self, request, client_address):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.threads)
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def _asgi_server(app, port):
+    """Minimal HTTP/1.0 front end for an ASGI app (one request per connection), when uvicorn is missing."""
+    async def handle(reader, writer):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, _ = lines[0].split(' ', 2)
+        headers = [(name.strip().lower().encode('latin-1'), value.strip().encode('latin-1'))
+                   for name, _, value in (line.partition(':') for line in lines[1:] if line)]
+        length = int(dict(headers).get(b'content-length', b'0'))
+        body = await reader.readexactly(length) if length else b''
+        path, _, query = target.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.0', 'method': method,
+            'scheme': 'http', 'path': unquote(path), 'raw_path': path.encode('latin-1'),
+            'query_string': query.encode('latin-1'), 'root_path': '', 'headers': headers,
+            'client': writer.get_extra_info('peername')[:2], 'server': ('127.0.0.1', port),
+        }
+        finished = asyncio.Event()
+        body_sent = False
+        status, response_headers, chunks = 500, [], []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            await finished.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status, response_headers
+            if message['type'] == 'http.response.start':
+                status, response_headers = message['status'], message.get('headers', [])
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        await app(scope, receive, send)
+        finished.set()
+        payload = b''.join(chunks)
+        out = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}'.encode()]
+        out += [name + b': ' + value for name, value in response_headers if name.lower() != b'content-length']
+        out += [f'Content-Length: {len(payload)}'.encode(), b'Connection: close']
+        writer.write(b'\r\n'.join(out) + b'\r\n\r\n' + payload)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+async def _load(port, path, cookie, concurrency, total):
+    """``total`` GETs of ``path`` from ``concurrency`` clients, one connection per request."""
+    request = (f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n'
+               f'Connection: close\r\n\r\n').encode()
+    pending = iter(range(total))
+    timings, failed = [], 0
+
+    async def client():
+        nonlocal failed
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(request)
+                await writer.drain()
+                data = await reader.read()
+                writer.close()
+                status = int(data.split(b' ', 2)[1])
+            except (OSError, ValueError, IndexError):
+                failed += 1
+                continue
+            if status == 200:
+                timings.append((time.perf_counter() - started) * 1000)
+            else:
+                failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {'ok': len(timings), 'failed': failed, 'req_per_s': len(timings) / elapsed,
+            'p50_ms': statistics.median(timings) if timings else None,
+            'p95_ms': timings[int(len(timings) * 0.95)] if timings else None}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not proc.is_alive():
+            raise CommandError("The server process exited during start-up.")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f"The server did not start listening on port {port}.")
+
+
+class Command(BaseCommand):
+    help = ("Serve a scratch database through college_maintenance.wsgi (wsgiref with a fixed thread pool, "
+            "like N sync workers) and college_maintenance.asgi (uvicorn when installed, else a minimal "
+            "asyncio server), then compare throughput of the read-only endpoints at several concurrency levels.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', default='1,16,64', help="Comma separated concurrent client counts")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per path and concurrency level")
+        parser.add_argument('--threads', type=int, default=4, help="WSGI request threads (sync workers)")
+        parser.add_argument('--server', choices=('auto', 'uvicorn', 'builtin'), default='auto',
+                            help="ASGI server; auto uses uvicorn when it is installed")
+        parser.add_argument('--paths', help="Comma separated paths ({batch_id} is filled in); "
+                                            "default: the async JSON endpoints")
+        parser.add_argument('--pending', type=int, default=5000, help="Requests seeded into the scratch database")
+        parser.add_argument('--output', help="Also write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        server = options['server']
+        if server == 'auto':
+            try:
+                import uvicorn  # noqa: F401
+                server = 'uvicorn'
+            except ImportError:
+                server = 'builtin'
+        elif server == 'uvicorn':
+            try:
+                import uvicorn  # noqa: F401
+            except ImportError:
+                raise CommandError("uvicorn is not installed (pip install uvicorn), use --server builtin.")
+
+        levels = [int(n) for n in options['concurrency'].split(',') if n.strip()]
+        paths = options['paths'].split(',') if options['paths'] else DEFAULT_PATHS
+        context = multiprocessing.get_context('spawn')
+        workdir = tempfile.mkdtemp(prefix='bench-asgi-')
+        db_path = os.path.join(workdir, 'bench.sqlite3')
+        try:
+            result = context.Queue()
+            prep = context.Process(target=_prepare, args=(db_path, options['pending'], result))
+            prep.start()
+            seed = result.get()
+            prep.join()
+            paths = [p.strip().format(batch_id=seed['batch_id']) for p in paths if p.strip()]
+
+            report = []
+            for interface, label in (('wsgi', f"wsgi ({options['threads']} threads)"), ('asgi', f'asgi ({server})')):
+                port = _free_port()
+                proc = context.Process(target=_serve, args=(db_path, interface, server, port, options['threads']))
+                proc.start()
+                try:
+                    _wait_for_port(port, proc)
+                    for path in paths:
+                        asyncio.run(_load(port, path, seed['cookie'], 4, 20))  # warm up caches and connections
+                        for level in levels:
+                            row = asyncio.run(_load(port, path, seed['cookie'], level, options['requests']))
+                            report.append(dict(row, server=label, path=path, concurrency=level))
+                finally:
+                    proc.terminate()
+                    proc.join()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        self.stdout.write(f"{'server':<18} {'path':<36} {'conc':>5} {'ok':>6} {'failed':>7} {'req/s':>8} "
+                          f"{'p50 ms':>8} {'p95 ms':>8}")
+        for row in report:
+            p50 = f"{row['p50_ms']:.1f}" if row['p50_ms'] is not None else '-'
+            p95 = f"{row['p95_ms']:.1f}" if row['p95_ms'] is not None else '-'
+            self.stdout.write(f"{row['server']:<18} {row['path'][:36]:<36} {row['concurrency']:>5} {row['ok']:>6} "
+                              f"{row['failed']:>7} {row['req_per_s']:>8.1f} {p50:>8} {p95:>8}")
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
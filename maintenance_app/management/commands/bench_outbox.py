@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from maintenance_app import outbox
+from maintenance_app.mail_backends import SimulatedSMTPBackend
+from maintenance_app.models import OutboundEmail
+
+BACKEND = 'maintenance_app.mail_backends.SimulatedSMTPBackend'
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _message(n):
+    return EmailMessage(f'Maintenance Request Approved: bench {n}', 'Body ' * 50,
+                        settings.DEFAULT_FROM_EMAIL, [f'hod{n}@example.com'])
+
+
+class Command(BaseCommand):
+    help = ("Measure email throughput offline against the simulated SMTP backend: one connection "
+            "per message (the old inline sends) versus the outbox dispatcher. Rolled back afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=200)
+        parser.add_argument('--connect-ms', type=float, default=300, help="Simulated cost of opening a connection")
+        parser.add_argument('--send-ms', type=float, default=20, help="Simulated cost per message")
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--rate', type=int, default=0, help="EMAIL_RATE_PER_MINUTE for the dispatcher (0 = off)")
+
+    def handle(self, *args, **options):
+        count = options['messages']
+        with override_settings(EMAIL_BACKEND=BACKEND, EMAIL_SIMULATED_CONNECT_MS=options['connect_ms'],
+                               EMAIL_SIMULATED_SEND_MS=options['send_ms'], EMAIL_RATE_PER_MINUTE=options['rate'],
+                               EMAIL_OUTBOX_BATCH_SIZE=options['batch_size']):
+            self.stdout.write(f"{'path':<22} {'messages':>9} {'connections':>12} {'seconds':>9} {'msg/s':>8}")
+            self._report('inline send()', count, lambda: [_message(n).send() for n in range(count)])
+            try:
+                with transaction.atomic():
+                    for n in range(count):
+                        outbox.queue(_message(n), kind='bench')
+                    self._report('outbox dispatch', count, outbox.dispatch_pending)
+                    sent = OutboundEmail.objects.filter(kind='bench', status='Sent').count()
+                    self.stdout.write(f"Outbox rows marked Sent: {sent}/{count}")
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _report(self, label, count, func):
+        SimulatedSMTPBackend.connections_opened = 0
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:<22} {count:>9} {SimulatedSMTPBackend.connections_opened:>12} "
+                          f"{elapsed:>9.2f} {count / elapsed:>8.1f}")
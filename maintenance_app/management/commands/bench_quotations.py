@@ -0,0 +1,80 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from maintenance_app.models import MaintenanceRequest, QuotationBatch, QuotationItem, QuotationResponse
+from maintenance_app.quotations import price_field, submit_quotation
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_submit(batch_id, company_name, email, lines, post):
+    """The pre-bulk_create path: one INSERT per line plus a second save for the total."""
+    quotation = QuotationResponse.objects.create(batch_id=batch_id, company_name=company_name, email=email)
+    total = 0
+    for line in lines:
+        try:
+            price = float(post.get(price_field(line), 0))
+        except ValueError:
+            price = 0
+        subtotal = price * int(line["quantity"])
+        total += subtotal
+        QuotationItem.objects.create(
+            quotation=quotation, request_id=line["request_id"], device=line["device"],
+            brand=line["brand"], quantity=line["quantity"], price=price, subtotal=subtotal,
+        )
+    quotation.total_amount = total
+    quotation.save()
+    return quotation
+
+
+class Command(BaseCommand):
+    help = ("Compare the old per-row quotation submission with the bulk_create path "
+            "for growing numbers of lines. Runs inside a transaction that is rolled back.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,500,1000',
+                            help="Comma separated line counts (default: 10,100,500,1000)")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the best time is reported")
+
+    def handle(self, *args, **options):
+        # Everything shares one outer transaction, so the old path's per-row
+        # commits are not paid here; real autocommit requests are slower still.
+        sizes = [int(n) for n in options['sizes'].split(',') if n.strip()]
+        try:
+            with transaction.atomic():
+                self._run(sizes, max(options['repeat'], 1))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, sizes, repeat):
+        hod = User.objects.create(username='__bench_quotations__')
+        req = MaintenanceRequest.objects.create(hod=hod, branch='BENCH', title='bench', description='bench')
+        batch = QuotationBatch.objects.create()
+        batch.requests.add(req)
+
+        self.stdout.write(f"{'lines':>7} {'old ms':>10} {'old q':>7} {'new ms':>10} {'new q':>7} {'speedup':>8}")
+        for size in sizes:
+            lines = [{"request_id": req.id, "device": f"Device {n}", "brand": "Any", "quantity": 2}
+                     for n in range(size)]
+            post = {price_field(line): "125.50" for line in lines}
+            old_ms, old_q = self._measure(legacy_submit, batch, lines, post, repeat)
+            new_ms, new_q = self._measure(submit_quotation, batch, lines, post, repeat)
+            self.stdout.write(f"{size:>7} {old_ms:>10.1f} {old_q:>7} {new_ms:>10.1f} {new_q:>7} {old_ms / new_ms:>7.1f}x")
+
+    def _measure(self, submit, batch, lines, post, repeat):
+        best, queries = None, 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                submit(batch.id, 'Bench Co', 'bench@example.com', lines, post)
+                elapsed = (time.perf_counter() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+            queries = len(ctx.captured_queries)
+        return best, queries
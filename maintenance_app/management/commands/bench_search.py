@@ -0,0 +1,132 @@
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.test.utils import (setup_databases, setup_test_environment, teardown_databases,
+                               teardown_test_environment)
+
+from maintenance_app import search
+from maintenance_app.models import MaintenanceRequest, Profile, RequestItem
+
+BRANCHES = ['CSE', 'ECE', 'MECH', 'CIVIL', 'EEE', 'IT']
+DEVICES = ['Projector', 'Desktop computer', 'Laser printer', 'UPS battery', 'Oscilloscope', 'Network switch',
+           'Air conditioner', 'Soldering station', 'Lathe motor', 'Smart board', 'Router', 'Webcam']
+PROBLEMS = ['not working', 'flickering display', 'overheating', 'needs replacement', 'making noise',
+            'power failure', 'broken cable', 'slow performance', 'calibration required', 'firmware update']
+LABS = ['Robotics Lab', 'Networks Lab', 'Electronics Lab', 'Workshop', 'Seminar Hall', 'Project Lab',
+        'Power Systems Lab', 'Computer Centre']
+FILLER = ('the unit in our lab has been reported by students and staff several times this semester '
+          'please arrange a technician visit at the earliest so classes are not affected').split()
+QUERIES = ['projector', 'oscilloscope calibration', 'robotics', 'flicker', 'network switch cse', 'zzz']
+CHUNK = 5000
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway test database with N requests and compare search latency: the FTS5 index "
+            "(BM25 ranked) against the LIKE '%%term%%' search the admin used to run.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query")
+        parser.add_argument('--output', help="Also write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = self._run(options['rows'], max(options['repeat'], 1))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def _seed(self, rows):
+        rng = random.Random(42)
+        hods = []
+        for branch in BRANCHES:
+            hod = User.objects.create_user(f'bench_hod_{branch.lower()}', password='x')
+            Profile.objects.create(user=hod, role='HOD', branch=branch)
+            hods.append(hod)
+        for start in range(0, rows, CHUNK):
+            batch = []
+            for n in range(start, min(start + CHUNK, rows)):
+                device, problem, lab = rng.choice(DEVICES), rng.choice(PROBLEMS), rng.choice(LABS)
+                words = rng.sample(FILLER, 12)
+                batch.append(MaintenanceRequest(
+                    hod=hods[n % len(hods)], branch=BRANCHES[n % len(BRANCHES)], lab_name=lab,
+                    title=f'{device} {problem}', total_amount=Decimal('0'),
+                    description=f'{device} in {lab} is {problem}; ' + ' '.join(words)))
+            created = MaintenanceRequest.objects.bulk_create(batch)
+            RequestItem.objects.bulk_create(
+                RequestItem(request=req, device=rng.choice(DEVICES), price=Decimal('100'), subtotal=Decimal('100'))
+                for req in created)
+        return hods
+
+    def _time(self, func, repeat):
+        func()  # warm the page cache
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        return result, statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def _run(self, rows, repeat):
+        self.stdout.write(f"Seeding {rows} requests...")
+        hods = self._seed(rows)
+        started = time.perf_counter()
+        search.rebuild()
+        rebuild_s = time.perf_counter() - started
+        self.stdout.write(f"Index rebuilt in {rebuild_s:.2f}s")
+
+        def like(text, hod=None):
+            # What MaintenanceRequestAdmin.search_fields used to run: every word in any column, newest first
+            queryset = MaintenanceRequest.objects.select_related('hod')
+            for word in text.split():
+                queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word) |
+                                           Q(hod__username__icontains=word) | Q(hod__first_name__icontains=word) |
+                                           Q(hod__last_name__icontains=word))
+            if hod is not None:
+                queryset = queryset.filter(hod=hod)
+            # The changelist also counts the matches for its "N results" line
+            queryset.count()
+            return list(queryset.order_by('-date_submitted')[:search.DEFAULT_LIMIT])
+
+        report = {'rows': rows, 'rebuild_s': rebuild_s, 'queries': []}
+        self.stdout.write(f"{'query':<28} {'scope':<6} {'method':<6} {'hits':>5} {'p50 ms':>9} {'p95 ms':>9}")
+        for text in QUERIES:
+            for scope, hod in (('admin', None), ('hod', hods[0])):
+                for method, func in (('fts', lambda: search.search(text, hod=hod)), ('like', lambda: like(text, hod))):
+                    result, p50, p95 = self._time(func, repeat)
+                    report['queries'].append({'query': text, 'scope': scope, 'method': method, 'hits': len(result),
+                                              'p50_ms': p50, 'p95_ms': p95})
+                    self.stdout.write(f"{text:<28} {scope:<6} {method:<6} {len(result):>5} {p50:>9.2f} {p95:>9.2f}")
+
+        # Cost the index adds to writes: a save that changes indexed text vs one that doesn't
+        req = MaintenanceRequest.objects.order_by('id').first()
+        n = 0
+
+        def retitle():
+            nonlocal n
+            n += 1
+            req.title = f'Projector check {n}'
+            req.save()
+
+        def restatus():
+            req.status = 'Approved' if req.status == 'Pending' else 'Pending'
+            req.save()
+
+        for label, func in (('save (title changed)', retitle), ('save (status only)', restatus)):
+            _, p50, p95 = self._time(func, repeat)
+            report[label] = {'p50_ms': p50, 'p95_ms': p95}
+            self.stdout.write(f"{label:<41} {p50:>15.2f} {p95:>9.2f}")
+        return report
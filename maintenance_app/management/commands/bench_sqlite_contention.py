@@ -0,0 +1,186 @@
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+ROLES = ('new_request', 'approve_request', 'quotation_fill')
+TUNED = {'pragmas': settings.SQLITE_TUNED_PRAGMAS, 'conn_max_age': 600}
+DEFAULT = {'pragmas': {}, 'conn_max_age': 0}
+LOCK_MARKERS = ('database is locked', 'database table is locked', 'busy')
+
+
+# The helpers below run in spawned processes: they point the default connection at the
+# benchmark database before anything touches it, and import models only after setup().
+
+def _setup(db_path, profile):
+    import django
+    django.setup()
+    from django.db import connections
+    from django.test.utils import setup_test_environment
+    setup_test_environment(debug=False)  # test client host, locmem email, no query log
+    settings.SQLITE_PRAGMAS = profile['pragmas']
+    connections['default'].settings_dict.update(NAME=db_path, CONN_MAX_AGE=profile['conn_max_age'])
+
+
+def _prepare(db_path, profile, pending, result):
+    """Migrate a fresh database and seed users, pending requests and a quotation batch."""
+    _setup(db_path, profile)
+    from decimal import Decimal
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    from maintenance_app import counters, rollup
+    from maintenance_app.models import EquipmentCatalog, MaintenanceRequest, Profile
+    from maintenance_app.quotations import create_batch
+
+    call_command('migrate', verbosity=0)
+    admin = User.objects.create_user('bench_admin', password='x', is_superuser=True, is_staff=True)
+    Profile.objects.create(user=admin, role='ADMIN')
+    hod = User.objects.create_user('bench_hod', password='x')
+    Profile.objects.create(user=hod, role='HOD', branch='CSE')
+    MaintenanceRequest.objects.bulk_create(
+        MaintenanceRequest(hod=hod, branch='CSE', title=f'Pending {n}', description='bench',
+                           total_amount=Decimal('100')) for n in range(pending))
+    counters.rebuild()
+    rollup.rebuild()
+    ids = list(MaintenanceRequest.objects.order_by('id').values_list('id', flat=True))
+    batch = create_batch(ids[:5])
+    result.put({'pending': ids[5:], 'token': batch.token,
+                'catalog_id': EquipmentCatalog.objects.filter(is_active=True).values_list('id', flat=True).first()})
+
+
+def _worker(db_path, profile, role, seed, ids, duration, start_at, result):
+    _setup(db_path, profile)
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, close_old_connections
+    from django.test import Client
+    from django.urls import reverse
+
+    from maintenance_app.quotations import batch_snapshot, price_field
+
+    client = Client()
+    ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+    if role == 'new_request':
+        client.force_login(User.objects.get(username='bench_hod'))
+        url = reverse('new_request')
+        items = json.dumps([{'catalog_id': seed['catalog_id'], 'quantity': 2}])
+    elif role == 'approve_request':
+        client.force_login(User.objects.get(username='bench_admin'))
+        pending = iter(ids)
+    else:
+        url = reverse('quotation_fill', args=[seed['token']])
+        post = {price_field(line): '120' for line in batch_snapshot(seed['token'])['lines']}
+    close_old_connections()
+
+    def run_once(n):
+        if role == 'new_request':
+            return client.post(url, {'title': f'Bench {os.getpid()}-{n}', 'description': 'bench',
+                                     'branch': 'CSE', 'selected_items': items})
+        if role == 'approve_request':
+            return client.post(reverse('approve_request', args=[next(pending)]), **ajax)
+        if n % 2:
+            return client.get(url)
+        return client.post(url, dict(post, company_name=f'Vendor {os.getpid()}', email='v@example.com'))
+
+    while time.time() < start_at:
+        time.sleep(0.005)
+    deadline = time.time() + duration
+    ok = locked = failed = n = 0
+    timings = []
+    while time.time() < deadline:
+        n += 1
+        started = time.perf_counter()
+        try:
+            response = run_once(n)
+        except StopIteration:
+            break
+        except OperationalError as e:
+            if any(marker in str(e) for marker in LOCK_MARKERS):
+                locked += 1
+            else:
+                failed += 1
+            continue
+        if response.status_code < 400:
+            ok += 1
+            timings.append((time.perf_counter() - started) * 1000)
+        else:
+            failed += 1
+    timings.sort()
+    result.put({'role': role, 'ok': ok, 'locked': locked, 'failed': failed,
+                'p95_ms': timings[int(len(timings) * 0.95)] if timings else None})
+
+
+class Command(BaseCommand):
+    help = ("Hammer new_request, approve_request and quotation_fill from several processes at once on a "
+            "scratch SQLite file, with and without the SQLITE_PRAGMAS/CONN_MAX_AGE profile, and report "
+            "throughput and 'database is locked' errors.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help="Processes per route")
+        parser.add_argument('--duration', type=float, default=10, help="Seconds per run")
+        parser.add_argument('--pending', type=int, default=20000, help="Pending requests seeded for approvals")
+        parser.add_argument('--output', help="Also write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('spawn')
+        workdir = tempfile.mkdtemp(prefix='bench-sqlite-')
+        report = {}
+        try:
+            for label, profile in (('default', DEFAULT), ('tuned', TUNED)):
+                report[label] = self._run(context, os.path.join(workdir, f'{label}.sqlite3'), profile, options)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        self.stdout.write(f"{'profile':<9} {'route':<17} {'ok':>7} {'ops/s':>8} {'locked':>7} {'failed':>7} {'p95 ms':>8}")
+        for label, rows in report.items():
+            for row in rows['routes']:
+                p95 = f"{row['p95_ms']:.1f}" if row['p95_ms'] is not None else '-'
+                self.stdout.write(f"{label:<9} {row['role']:<17} {row['ok']:>7} {row['ops_per_s']:>8.1f} "
+                                  f"{row['locked']:>7} {row['failed']:>7} {p95:>8}")
+            self.stdout.write(f"{label:<9} {'total':<17} {rows['ok']:>7} {rows['ops_per_s']:>8.1f} "
+                              f"{rows['locked']:>7} {rows['failed']:>7}")
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def _run(self, context, db_path, profile, options):
+        result = context.Queue()
+        prep = context.Process(target=_prepare, args=(db_path, profile, options['pending'], result))
+        prep.start()
+        seed = result.get()
+        prep.join()
+
+        workers = options['workers']
+        approver_ids = [seed['pending'][k::workers] for k in range(workers)]
+        start_at = time.time() + 3  # let every process finish django.setup() first
+        procs = []
+        for role in ROLES:
+            for k in range(workers):
+                ids = approver_ids[k] if role == 'approve_request' else []
+                procs.append(context.Process(target=_worker, args=(
+                    db_path, profile, role, seed, ids, options['duration'], start_at, result)))
+        for proc in procs:
+            proc.start()
+        samples = [result.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        routes = []
+        for role in ROLES:
+            mine = [s for s in samples if s['role'] == role]
+            p95s = [s['p95_ms'] for s in mine if s['p95_ms'] is not None]
+            ok = sum(s['ok'] for s in mine)
+            routes.append({'role': role, 'ok': ok, 'ops_per_s': ok / options['duration'],
+                           'locked': sum(s['locked'] for s in mine), 'failed': sum(s['failed'] for s in mine),
+                           'p95_ms': statistics.median(p95s) if p95s else None})
+        ok = sum(r['ok'] for r in routes)
+        return {'routes': routes, 'ok': ok, 'ops_per_s': ok / options['duration'],
+                'locked': sum(r['locked'] for r in routes), 'failed': sum(r['failed'] for r in routes)}
@@ -0,0 +1,89 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per sample, so nothing is already imported or cached
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+setup_ms = (time.perf_counter() - started) * 1000
+setup_rss = rss_mb()
+
+from django.test import Client
+response = Client(raise_request_exception=False).get(sys.argv[1], HTTP_HOST='localhost')
+first_ms = (time.perf_counter() - started) * 1000
+
+print(json.dumps({
+    'setup_ms': setup_ms, 'first_response_ms': first_ms, 'status': response.status_code,
+    'rss_after_setup_mb': setup_rss, 'rss_after_first_response_mb': rss_mb(),
+    'modules': len(sys.modules),
+    'weasyprint_loaded': 'weasyprint' in sys.modules,
+    'tasks_loaded': 'maintenance_app.tasks' in sys.modules,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = ("Start a fresh interpreter per sample and measure django.setup() + WSGI app load time, "
+            "time to the first response and RSS, for each settings profile.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default='college_maintenance.settings,college_maintenance.settings_production',
+                            help="Comma separated settings modules to compare")
+        parser.add_argument('--path', default='/accounts/login/', help="URL requested as the first response")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--output', help="Also write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        results = {}
+        self.stdout.write(f"{'profile':<44} {'setup ms':>9} {'first ms':>9} {'RSS MB':>7} {'RSS 1st':>8} "
+                          f"{'modules':>8} {'status':>6}")
+        for profile in [p.strip() for p in options['profiles'].split(',') if p.strip()]:
+            samples = [self._sample(profile, options['path']) for _ in range(max(options['repeat'], 1))]
+            row = {key: statistics.median(s[key] for s in samples)
+                   for key in ('setup_ms', 'first_response_ms', 'rss_after_setup_mb',
+                               'rss_after_first_response_mb', 'modules')}
+            row.update(status=samples[-1]['status'], weasyprint_loaded=samples[-1]['weasyprint_loaded'],
+                       tasks_loaded=samples[-1]['tasks_loaded'])
+            results[profile] = row
+            self.stdout.write(f"{profile:<44} {row['setup_ms']:>9.1f} {row['first_response_ms']:>9.1f} "
+                              f"{row['rss_after_setup_mb']:>7.1f} {row['rss_after_first_response_mb']:>8.1f} "
+                              f"{row['modules']:>8.0f} {row['status']:>6}")
+            if row['weasyprint_loaded']:
+                self.stderr.write(f"{profile}: WeasyPrint was imported by a web worker")
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}")
+
+    def _sample(self, profile, path):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+        # Let the production profile start without a real deployment's secrets
+        env.setdefault('PORTAL_SECRET_KEY', 'bench-startup')
+        env.setdefault('PORTAL_ALLOWED_HOSTS', 'localhost')
+        proc = subprocess.run([sys.executable, '-c', PROBE, path], env=env, cwd=str(settings.BASE_DIR),
+                              capture_output=True, text=True)
+        if proc.returncode:
+            raise CommandError(f"{profile} failed to start:\n{proc.stderr.strip()}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
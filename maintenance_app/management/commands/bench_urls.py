@@ -0,0 +1,279 @@
+import json
+import platform
+import time
+from decimal import Decimal
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (CaptureQueriesContext, override_settings, setup_databases, setup_test_environment,
+                               teardown_databases, teardown_test_environment)
+from django.urls import reverse
+from django.utils import timezone
+
+from maintenance_app import counters, rollup, search, urls
+from maintenance_app.models import (BackgroundJob, EquipmentCatalog, MaintenanceRequest, Profile, QuotationBatch,
+                                    QuotationResponse, RequestItem)
+from maintenance_app.quotations import create_batch, price_field, submit_quotation
+
+BRANCHES = ['CSE', 'ECE', 'MECH', 'CIVIL', 'EEE', 'IT']
+STATUSES = ['Pending', 'Approved', 'Rejected']
+CHUNK = 5000
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def _pending(ctx, i):
+    """A different pending request for every call, so state-changing routes always have work."""
+    if not ctx['pending']:
+        raise CommandError("Ran out of pending requests; use a larger --sizes minimum or fewer --repeat.")
+    return ctx['pending'].pop()
+
+
+# name -> (role, method, kwargs(ctx, i), data(ctx, i), extra headers)
+ROUTES = {
+    'login': ('anon', 'get', None, None, {}),
+    'logout': ('hod', 'post', None, None, {}),
+    'home_redirect': ('anon', 'get', None, None, {}),
+    'hod_dashboard': ('hod', 'get', None, None, {}),
+    'new_request': ('hod', 'get', None, None, {}),
+    'request_detail': ('admin', 'get', lambda c, i: {'pk': c['request_id']}, None, {}),
+    'request_letter': ('admin', 'get', lambda c, i: {'pk': c['request_id']}, None, {}),
+    'admin_dashboard': ('admin', 'get', None, None, {}),
+    'approve_request': ('admin', 'post', lambda c, i: {'pk': _pending(c, i)}, None, AJAX),
+    'reject_request': ('admin', 'post', lambda c, i: {'pk': _pending(c, i)},
+                       lambda c, i: {'admin_remark': 'bench'}, AJAX),
+    'edit_request': ('admin', 'get', lambda c, i: {'pk': c['request_id']}, None, {}),
+    'bulk_update_status': ('admin', 'post', None,
+                           lambda c, i: {'action': 'approve', 'ids[]': [_pending(c, i) for _ in range(20)]}, AJAX),
+    'job_status': ('admin', 'get', lambda c, i: {'pk': c['job_id']}, None, {}),
+    'generate_quotation_link': ('admin', 'post', None,
+                                lambda c, i: {'selected_requests[]': c['batch_requests']}, AJAX),
+    'quotation_fill': ('anon', 'get', lambda c, i: {'token': c['token']}, None, {}),
+    'principal_view_quotations': ('admin', 'get', None, None, {}),
+    'select_quotation': ('admin', 'post', lambda c, i: {'response_id': c['response_id']}, None, {}),
+    'reports': ('admin', 'get', None, None, {}),
+    'reports_data': ('admin', 'get', None, lambda c, i: {'bucket': 'week'}, {}),
+    'dashboard_counts': ('hod', 'get', None, None, {}),
+    'requests_page': ('admin', 'get', None, lambda c, i: {'rows': 'report'}, {}),
+    'search_requests': ('hod', 'get', None, lambda c, i: {'q': 'synthetic request'}, {}),
+    'event_stream': ('admin', 'get', None, lambda c, i: {'last_event_id': 0}, {}),
+    'reports_export': ('admin', 'get', None, lambda c, i: {'format': 'csv', 'kind': 'summary'}, {}),
+    'department_list': ('hod', 'get', None, None, {}),
+    'metrics': ('admin', 'get', None, None, {}),
+    'principal_view_quotations_batch': ('admin', 'get', lambda c, i: {'batch_id': c['batch_id']}, None, {}),
+    'quotation_comparison': ('admin', 'get', lambda c, i: {'batch_id': c['batch_id']}, None, {}),
+}
+# Settings a route needs to answer at all (/metrics/ is a 404 with profiling off)
+ROUTE_SETTINGS = {
+    'metrics': {'PROFILING_ENABLED': True},
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class Command(BaseCommand):
+    help = ("Seed a throwaway test database at several sizes, request every named route in "
+            "maintenance_app.urls as the right role and record query counts and p50/p95 latency. "
+            "Writes a JSON report and fails if a route answers with an error status or its query count "
+            "grows with the data size.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,100000',
+                            help="Comma separated request counts (default: 1000,10000,100000)")
+        parser.add_argument('--repeat', type=int, default=10, help="Timed requests per route and size")
+        parser.add_argument('--output', default='bench-urls.json', help="Where to write the JSON report")
+        parser.add_argument('--skip', default='',
+                            help="Comma separated routes to leave out, e.g. request_letter without WeasyPrint")
+
+    def handle(self, *args, **options):
+        missing = {p.name for p in urls.urlpatterns if p.name} - set(ROUTES)
+        if missing:
+            raise CommandError(f"No benchmark entry for route(s): {', '.join(sorted(missing))}")
+        skip = {name.strip() for name in options['skip'].split(',') if name.strip()}
+        unknown = skip - set(ROUTES)
+        if unknown:
+            raise CommandError(f"Unknown route(s) in --skip: {', '.join(sorted(unknown))}")
+
+        sizes = sorted(int(n) for n in options['sizes'].split(',') if n.strip())
+        repeat = max(options['repeat'], 1)
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = self._run(sizes, repeat, skip)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+        self.stdout.write(f"Report written to {options['output']}")
+
+        for line in report['errors'] + report['regressions']:
+            self.stderr.write(line)
+        if report['errors']:
+            raise CommandError(f"{len(report['errors'])} route(s) answered with an error status.")
+        if report['regressions']:
+            raise CommandError(f"{len(report['regressions'])} route(s) run more queries on larger data.")
+        self.stdout.write(self.style.SUCCESS("Every route answered and query counts are flat across data sizes."))
+
+    # ------------------------------------------------------------------
+    def _run(self, sizes, repeat, skip):
+        users = self._users()
+        routes = {name: route for name, route in ROUTES.items() if name not in skip}
+        results = {name: {} for name in routes}
+        for size in sizes:
+            started = time.perf_counter()
+            self._seed(size, users)
+            self.stdout.write(f"Seeded {size} requests in {time.perf_counter() - started:.1f}s")
+            ctx = self._context(size, repeat)
+            self.stdout.write(f"{'route':<34} {'queries':>8} {'warm':>6} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, route in routes.items():
+                with override_settings(**ROUTE_SETTINGS.get(name, {})):
+                    row = self._measure(name, route, users, ctx, repeat)
+                results[name][str(size)] = row
+                if row['errors']:
+                    self.stdout.write(f"{name:<34} {row['queries']:>8} {row['warm_queries']:>6} "
+                                      f"{'error ' + ', '.join(map(str, row['status'])):>19}")
+                else:
+                    self.stdout.write(f"{name:<34} {row['queries']:>8} {row['warm_queries']:>6} "
+                                      f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f}")
+
+        # An error page is fast and cheap, so its timings and query counts say nothing about the route
+        errors = [f"{name}: " + ', '.join(f"{size} rows -> HTTP {', '.join(map(str, row['status']))}"
+                                          for size, row in by_size.items() if row['errors'])
+                  for name, by_size in results.items() if any(row['errors'] for row in by_size.values())]
+        regressions = []
+        for name, by_size in results.items():
+            counts = [(size, by_size[str(size)]['queries']) for size in sizes]
+            if any(count > counts[0][1] for _, count in counts[1:]):
+                regressions.append(f"{name}: " + ', '.join(f"{s} rows -> {c} queries" for s, c in counts))
+
+        return {
+            'generated_at': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'sizes': sizes,
+            'repeat': repeat,
+            'skipped': sorted(skip),
+            'results': results,
+            'errors': errors,
+            'regressions': regressions,
+        }
+
+    def _measure(self, name, route, users, ctx, repeat):
+        role, method, kwargs, data, headers = route
+        client = Client()
+        timings, statuses, errors, queries, warm_queries = [], set(), 0, None, None
+        cache.clear()
+        for i in range(repeat + 1):
+            if role != 'anon':
+                client.force_login(users[role])
+            url = reverse(name, kwargs=kwargs(ctx, i) if kwargs else None)
+            payload = data(ctx, i) if data else {}
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, payload, **headers)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = (time.perf_counter() - started) * 1000
+            statuses.add(response.status_code)
+            if response.status_code >= 400:
+                errors += 1
+            if i == 0:
+                # First (cold cache) request sets the query count; the rest are timed
+                queries = len(captured)
+            else:
+                warm_queries = len(captured)
+                if response.status_code < 400:
+                    timings.append(elapsed)
+        return {
+            'role': role,
+            'method': method.upper(),
+            'status': sorted(statuses),
+            'errors': errors,
+            'queries': queries,
+            'warm_queries': warm_queries,
+            'p50_ms': round(percentile(timings, 50), 2) if timings else None,
+            'p95_ms': round(percentile(timings, 95), 2) if timings else None,
+        }
+
+    # ------------------------------------------------------------------
+    def _users(self):
+        admin = User.objects.create_user('bench_admin', password='x', is_staff=True, is_superuser=True)
+        Profile.objects.create(user=admin, role='ADMIN')
+        users = {'admin': admin}
+        for branch in BRANCHES:
+            hod = User.objects.create_user(f'bench_hod_{branch.lower()}', password='x')
+            Profile.objects.create(user=hod, role='HOD', branch=branch)
+            users.setdefault('hod', hod)
+            users[branch] = hod
+        return users
+
+    def _seed(self, size, users):
+        """Grow the dataset to ``size`` requests (2 items each) with one quotation batch per 100 requests."""
+        catalog = list(EquipmentCatalog.objects.all()[:6])
+        have = MaintenanceRequest.objects.count()
+        first_new_id = (MaintenanceRequest.objects.order_by('-id').values_list('id', flat=True).first() or 0) + 1
+        for start in range(have, size, CHUNK):
+            batch = []
+            for n in range(start, min(start + CHUNK, size)):
+                branch = BRANCHES[n % len(BRANCHES)]
+                batch.append(MaintenanceRequest(
+                    hod=users[branch], branch=branch, title=f'Synthetic request {n}', lab_name='Lab',
+                    description='Generated by bench_urls', status=STATUSES[n % len(STATUSES)],
+                    total_amount=Decimal('0'),
+                ))
+            created = MaintenanceRequest.objects.bulk_create(batch)
+            items = []
+            for n, req in enumerate(created):
+                for entry in (catalog[n % len(catalog)], catalog[(n + 1) % len(catalog)]):
+                    items.append(RequestItem(request=req, catalog_item=entry, price_version=entry.price_version,
+                                             device=entry.device, brand=entry.brand, size=entry.size,
+                                             price=entry.price, quantity=1, subtotal=entry.price))
+            RequestItem.objects.bulk_create(items)
+
+        with connection.cursor() as cursor:
+            # auto_now_add stamps every row with "now"; spread the new ones over two years
+            cursor.execute(
+                "UPDATE maintenance_app_maintenancerequest "
+                "SET date_submitted = datetime('now', '-' || (id %% 730) || ' days'), "
+                "total_amount = (SELECT COALESCE(SUM(subtotal), 0) FROM maintenance_app_requestitem "
+                "                WHERE request_id = maintenance_app_maintenancerequest.id) "
+                "WHERE id >= %s", [first_new_id])
+
+        ids = list(MaintenanceRequest.objects.filter(id__gte=first_new_id).values_list('id', flat=True))
+        for n in range(QuotationBatch.objects.count(), size // 100):
+            quotation_batch = create_batch(ids[(n * 5) % len(ids):][:5] or ids[:5])
+            for vendor in range(3):
+                post = {price_field(line): str(100 + vendor * 10) for line in quotation_batch.line_items}
+                submit_quotation(quotation_batch.id, f'Vendor {vendor}', f'vendor{vendor}@example.com',
+                                 quotation_batch.line_items, post)
+
+        # bulk_create skips the signals that keep these current
+        counters.rebuild()
+        rollup.rebuild()
+        search.rebuild()
+
+    def _context(self, size, repeat):
+        # generate_quotation_link adds batches without vendor responses; use the newest seeded one
+        batch = QuotationBatch.objects.filter(responses__isnull=False).order_by('-id').first()
+        pending = list(MaintenanceRequest.objects.filter(status='Pending')
+                       .order_by('id').values_list('id', flat=True)[:(repeat + 1) * 25])
+        job = BackgroundJob.objects.order_by('-id').first() or BackgroundJob.objects.create(kind='bench')
+        return {
+            'request_id': MaintenanceRequest.objects.order_by('-id').values_list('id', flat=True).first(),
+            'pending': pending,
+            'job_id': job.id,
+            'batch_id': batch.id,
+            'token': batch.token,
+            'batch_requests': batch.get_request_list(),
+            'response_id': QuotationResponse.objects.filter(batch=batch).values_list('id', flat=True).first(),
+        }
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance_app import static_assets
+
+
+class Command(BaseCommand):
+    help = ("Collect static files into STATIC_ROOT with content-hashed names and write gzip/brotli "
+            "variants of the text assets, for maintenance_app.static_assets.serve or a front-end server.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help="Empty STATIC_ROOT first (drops old hashed files)")
+
+    def handle(self, *args, **options):
+        if not settings.STATIC_ROOT:
+            raise CommandError("STATIC_ROOT is not set; run with "
+                               "DJANGO_SETTINGS_MODULE=college_maintenance.settings_production.")
+        if not isinstance(staticfiles_storage, ManifestFilesMixin):
+            self.stderr.write("STORAGES['staticfiles'] does not fingerprint file names; "
+                              "assets can't be cached as immutable.")
+
+        call_command('collectstatic', interactive=False, clear=options['clear'], verbosity=0)
+
+        root = Path(settings.STATIC_ROOT)
+        files = compressed = saved = 0
+        for path in sorted(root.rglob('*')):
+            if not path.is_file() or path.suffix in ('.gz', '.br'):
+                continue
+            files += 1
+            gain = static_assets.compress(path)
+            if gain:
+                compressed += 1
+                saved += gain
+
+        if static_assets.brotli is None:
+            self.stderr.write("brotli is not installed; only .gz variants were written (pip install Brotli).")
+        self.stdout.write(self.style.SUCCESS(
+            f"{files} file(s) in {root}, {compressed} precompressed, {saved / 1024:.0f} KB saved across variants."))
@@ -0,0 +1,112 @@
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from maintenance_app import caching, reports
+from maintenance_app.items import device_summary
+from maintenance_app.models import (DailyBranchStats, MaintenanceRequest, QuotationItem, QuotationResponse,
+                                    RequestStatusCount)
+from maintenance_app.pagination import encode_cursor, filter_requests, keyset_queryset
+
+_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(.*)$')
+_TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+# Queries whose ORDER BY must come from an index: sorting every row of a HOD on each page view
+# doesn't show up as a full scan, only as a temp b-tree
+INDEX_ORDERED = {'hod_dashboard', 'hod_dashboard ?status', 'hod requests page'}
+
+
+def hot_queries():
+    """
+    (name, queryset, allow_full_scan) for every dashboard / report query.
+    allow_full_scan marks queries that read a whole (small, pre-aggregated) table by design.
+    """
+    today = timezone.localdate()
+    month = {'date_from': str(today.replace(day=1)), 'date_to': str(today)}
+    newest = MaintenanceRequest.objects.order_by('-date_submitted', '-id').first()
+    cursor = encode_cursor(newest) if newest else None
+    requests = MaintenanceRequest.objects.all()
+    since = timezone.now() - timedelta(days=30)
+
+    def page(params, after=None):
+        return keyset_queryset(filter_requests(requests, params), after)[:51]
+
+    return [
+        ('hod_dashboard', requests.filter(hod_id=1).order_by('-date_submitted'), False),
+        ('hod_dashboard ?status', requests.filter(hod_id=1, status='Pending').order_by('-date_submitted'), False),
+        ('hod requests page', keyset_queryset(requests.filter(hod_id=1), cursor)[:51], False),
+        ('hod cards', RequestStatusCount.objects.filter(hod_id=1), False),
+        ('admin cards (rollup)', DailyBranchStats.objects.order_by().values('status').annotate(n=Sum('count')), True),
+        ('admin_dashboard page 1', page({}), False),
+        ('admin_dashboard next page', page({}, cursor), False),
+        ('admin_dashboard ?status', page({'status': 'Pending'}), False),
+        ('admin_dashboard ?status&department', page({'status': 'Pending', 'department': 'CSE'}), False),
+        ('admin_dashboard ?department', page({'department': 'CSE'}), False),
+        ('reports ?range', page(month), False),
+        ('departments distinct', requests.values_list('branch', flat=True).distinct().order_by('branch'), False),
+        ('device summary ?department', device_summary(filter_requests(requests, {'department': 'CSE'})), False),
+        ('report aggregate ?range', reports.filter_rollup(month).values('branch', 'status').annotate(n=Sum('count')), False),
+        ('report aggregate ?department', reports.filter_rollup({'department': 'CSE'}).values('status').annotate(n=Sum('count')), False),
+        ('report export ?range', filter_requests(requests, month).order_by('date_submitted', 'id'), False),
+        ('recent requests', requests.filter(date_submitted__gte=since).order_by('-date_submitted'), False),
+        ('quotation batch responses', QuotationResponse.objects.filter(batch_id=1).order_by('-submitted_at'), False),
+        ('vendor comparison', QuotationItem.objects.filter(quotation__batch_id=1).values('quotation_id', 'price'), False),
+    ]
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def temp_sorts(plan):
+    """Plan lines that sort the result in a temporary b-tree instead of reading it in index order."""
+    return [detail for detail in plan if detail.startswith(_TEMP_SORT)]
+
+
+def full_scans(plan, tables):
+    """Plan lines that walk a whole table without an index."""
+    scans = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if match and match.group(1) in tables and 'INDEX' not in match.group(2):
+            scans.append(detail)
+    return scans
+
+
+class Command(BaseCommand):
+    help = ("Run EXPLAIN QUERY PLAN for each dashboard / report query (SQLite) and fail "
+            "if any of them falls back to a full table scan (or, for the HOD dashboard, a sort).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the full plan of every query")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("check_query_plans reads SQLite's EXPLAIN QUERY PLAN output.")
+
+        tables = set(connection.introspection.table_names())
+        failures = 0
+        for name, queryset, allow_full_scan in hot_queries():
+            plan = query_plan(queryset)
+            scans = [] if allow_full_scan else full_scans(plan, tables)
+            sorts = temp_sorts(plan) if name in INDEX_ORDERED else []
+            if scans:
+                status = self.style.ERROR('FULL SCAN')
+            elif sorts:
+                status = self.style.ERROR('TEMP SORT')
+            else:
+                status = self.style.SUCCESS('ok')
+            self.stdout.write(f"{name:<40} {status}")
+            for line in (plan if options['verbose_plans'] else scans + sorts):
+                self.stdout.write(f"    {line}")
+            failures += bool(scans or sorts)
+
+        if failures:
+            raise CommandError(f"{failures} hot queries fall back to a full table scan or a temp b-tree sort.")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from maintenance_app import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard status counters from the MaintenanceRequest table."
+
+    def handle(self, *args, **options):
+        counters.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Status counters rebuilt: {counters.status_counts()}"))
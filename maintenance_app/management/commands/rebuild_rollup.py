@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance_app import rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyBranchStats rollup from MaintenanceRequest and verify it matches the live data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check-only', action='store_true',
+                            help="Only compare the stored rollup with the live data (exit 1 on mismatch)")
+
+    def handle(self, *args, **options):
+        if not options['check_only']:
+            count = rollup.rebuild()
+            self.stdout.write(f"Rollup rebuilt: {count} day/branch/status rows.")
+
+        mismatches = rollup.check()
+        if mismatches:
+            for (day, branch, status), (stored, live) in sorted(mismatches.items(), key=str):
+                self.stderr.write(f"{day} {branch} {status}: stored={stored} live={live}")
+            raise CommandError(f"Rollup does not match the live data ({len(mismatches)} rows differ).")
+        self.stdout.write(self.style.SUCCESS("Rollup matches the live data."))
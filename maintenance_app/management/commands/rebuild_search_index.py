@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance_app import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of maintenance requests and verify it covers every request."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check-only', action='store_true',
+                            help="Only compare the indexed requests with the live data (exit 1 on mismatch)")
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("Full-text search needs SQLite (FTS5); other databases use the LIKE fallback.")
+        if not options['check_only']:
+            count = search.rebuild()
+            self.stdout.write(f"Search index rebuilt: {count} requests.")
+
+        missing, stale = search.check()
+        if missing or stale:
+            if missing:
+                self.stderr.write(f"Not indexed: {', '.join(map(str, sorted(missing)[:20]))}")
+            if stale:
+                self.stderr.write(f"Indexed but deleted: {', '.join(map(str, sorted(stale)[:20]))}")
+            raise CommandError(f"Search index does not match the live data "
+                               f"({len(missing)} missing, {len(stale)} stale).")
+        self.stdout.write(self.style.SUCCESS("Search index matches the live data."))
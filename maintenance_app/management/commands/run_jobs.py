@@ -0,0 +1,59 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from maintenance_app import changefeed, jobs, outbox
+
+PRUNE_INTERVAL = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Run queued background jobs (approval letters, notification emails), send the email outbox "
+            "and prune the dashboard change feed.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--stale-minutes', type=int, default=15,
+                            help="Requeue jobs stuck in Running (and emails stuck in Sending) for longer than this.")
+
+    def handle(self, *args, **options):
+        requeued = jobs.requeue_stale(options['stale_minutes'])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+        requeued = outbox.requeue_stale(options['stale_minutes'])
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale email(s).")
+
+        pruned = changefeed.prune()
+        if pruned:
+            self.stdout.write(f"Pruned {pruned} change feed event(s).")
+
+        if options['once']:
+            count = jobs.run_pending()
+            sent = outbox.dispatch_pending()
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} job(s), dispatched {sent} email(s)."))
+            return
+
+        self.stdout.write("Job worker started. Press Ctrl+C to stop.")
+        next_prune = time.monotonic() + PRUNE_INTERVAL
+        try:
+            while True:
+                try:
+                    if time.monotonic() >= next_prune:
+                        changefeed.prune()
+                        next_prune = time.monotonic() + PRUNE_INTERVAL
+                    ran = jobs.run_pending()
+                    # One batch per round, so a long mail queue doesn't hold up new jobs
+                    busy = outbox.dispatch() or ran
+                except Exception:
+                    # A database or SMTP error in one round must not stop the worker
+                    logger.exception("Job worker round failed")
+                    busy = False
+                if not busy:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Job worker stopped.")
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 08:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0003_quotationbatch_quotationresponse_quotationitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('Queued', 'Queued'), ('Running', 'Running'), ('Done', 'Done'), ('Failed', 'Failed')], default='Queued', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='backgroundjob',
+            index=models.Index(fields=['status', 'run_after'], name='maintenance_status_607efd_idx'),
+        ),
+    ]
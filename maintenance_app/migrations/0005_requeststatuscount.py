@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 08:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    MaintenanceRequest = apps.get_model('maintenance_app', 'MaintenanceRequest')
+    RequestStatusCount = apps.get_model('maintenance_app', 'RequestStatusCount')
+    totals = {}
+    for row in MaintenanceRequest.objects.order_by().values('hod', 'status').annotate(n=Count('id')):
+        RequestStatusCount.objects.create(hod_id=row['hod'], status=row['status'], count=row['n'])
+        totals[row['status']] = totals.get(row['status'], 0) + row['n']
+    for status, n in totals.items():
+        RequestStatusCount.objects.create(hod_id=None, status=status, count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('maintenance_app', '0004_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('hod', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='requeststatuscount',
+            constraint=models.UniqueConstraint(fields=('hod', 'status'), name='unique_status_count_per_hod'),
+        ),
+        migrations.AddConstraint(
+            model_name='requeststatuscount',
+            constraint=models.UniqueConstraint(condition=models.Q(('hod__isnull', True)), fields=('status',), name='unique_global_status_count'),
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2 on 2026-10-18 08:24
+
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def _decimal(value):
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError, TypeError):
+        return Decimal('0.00')
+
+
+def _entries(raw):
+    """selected_items JSON -> list of dicts; some rows were stored double-encoded."""
+    try:
+        data = json.loads(raw)
+        if isinstance(data, str):
+            data = json.loads(data)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    return [e for e in data if isinstance(e, dict)] if isinstance(data, list) else []
+
+
+def selected_items_to_rows(apps, schema_editor):
+    MaintenanceRequest = apps.get_model('maintenance_app', 'MaintenanceRequest')
+    RequestItem = apps.get_model('maintenance_app', 'RequestItem')
+    rows = []
+    for req in MaintenanceRequest.objects.exclude(selected_items__isnull=True).exclude(selected_items='').iterator():
+        for entry in _entries(req.selected_items):
+            try:
+                quantity = max(int(entry.get('quantity', 1)), 0)
+            except (ValueError, TypeError):
+                quantity = 0
+            if not quantity:
+                continue
+            price = _decimal(entry.get('price', 0))
+            rows.append(RequestItem(
+                request_id=req.pk,
+                device=str(entry.get('device', ''))[:255],
+                brand=str(entry.get('brand', '') or '')[:255],
+                size=str(entry.get('size', '') or '')[:255],
+                usage=str(entry.get('usage', '') or '')[:100],
+                remarks=str(entry.get('remarks', '') or '')[:255],
+                price=price,
+                quantity=quantity,
+                subtotal=price * quantity,
+            ))
+    RequestItem.objects.bulk_create(rows, batch_size=500)
+
+
+def rows_to_selected_items(apps, schema_editor):
+    MaintenanceRequest = apps.get_model('maintenance_app', 'MaintenanceRequest')
+    RequestItem = apps.get_model('maintenance_app', 'RequestItem')
+    grouped = {}
+    for item in RequestItem.objects.order_by('id').iterator():
+        grouped.setdefault(item.request_id, []).append({
+            "device": item.device, "brand": item.brand, "size": item.size, "price": float(item.price),
+            "usage": item.usage, "remarks": item.remarks, "quantity": item.quantity,
+            "subtotal": float(item.subtotal),
+        })
+    for request_id, entries in grouped.items():
+        MaintenanceRequest.objects.filter(pk=request_id).update(selected_items=json.dumps(entries))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0005_requeststatuscount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device', models.CharField(max_length=255)),
+                ('brand', models.CharField(blank=True, default='', max_length=255)),
+                ('size', models.CharField(blank=True, default='', max_length=255)),
+                ('usage', models.CharField(blank=True, default='', max_length=100)),
+                ('remarks', models.CharField(blank=True, default='', max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='maintenance_app.maintenancerequest')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='requestitem',
+            index=models.Index(fields=['device'], name='maintenance_device_81581a_idx'),
+        ),
+        migrations.RunPython(selected_items_to_rows, rows_to_selected_items),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 08:24
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0006_requestitem'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='maintenancerequest',
+            name='selected_items',
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2 on 2026-10-18 08:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0007_remove_maintenancerequest_selected_items'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentCatalog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device', models.CharField(max_length=255)),
+                ('brand', models.CharField(blank=True, default='', max_length=255)),
+                ('size', models.CharField(blank=True, default='', max_length=255)),
+                ('usage', models.CharField(blank=True, default='', max_length=100)),
+                ('remarks', models.CharField(blank=True, default='', max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('price_version', models.PositiveIntegerField(default=1, editable=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('sort_order', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Equipment catalog',
+                'ordering': ['sort_order', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='requestitem',
+            name='price_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='EquipmentPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('version', models.PositiveIntegerField()),
+                ('effective_from', models.DateTimeField(default=django.utils.timezone.now)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='maintenance_app.equipmentcatalog')),
+            ],
+            options={
+                'ordering': ['-version'],
+            },
+        ),
+        migrations.AddField(
+            model_name='requestitem',
+            name='catalog_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_items', to='maintenance_app.equipmentcatalog'),
+        ),
+        migrations.AddConstraint(
+            model_name='equipmentpricehistory',
+            constraint=models.UniqueConstraint(fields=('item', 'version'), name='unique_price_version'),
+        ),
+    ]
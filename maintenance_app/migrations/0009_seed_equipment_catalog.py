@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+# The equipment list that used to be hard-coded in new_request / edit_request
+SEED_ITEMS = [
+    ("SSD", "Any", "256GB", 1750, "win-10", "best and less price"),
+    ("RAM", "Any", "8GB ddr3", 1600, "win-10", "best and less price"),
+    ("Motherboard", "Any", "G41-LGA 775 Socket", 1800, "win-7", "best and less price"),
+    ("Motherboard", "Any", "H61-LGA 1155 Socket", 2100, "win-10", "best and less price"),
+    ("Motherboard", "Any", "H110-LGA 1151 Socket", 2100, "win-11", "best and less price"),
+    ("Processor", "i3 3rd gen", "any", 1200, "win-10", "best and less price"),
+    ("Processor", "Intel dual core", "any", 1000, "win-10", "best and less price"),
+    ("SMPS", "Any", "any", 650, "win-10", "best and less price"),
+    ("Keyboard", "Any", "any", 700, "win-10", "best and less price"),
+    ("Mouse", "Any", "any", 400, "win-10", "best and less price"),
+    ("Keyboard-Mouse combo", "Any", "any", 1000, "win-10", "best and less price"),
+    ("USB to PS2 Connector", "Any", "any", 650, "win-10", "best and less price"),
+    ("USB to LAN Connector", "Any", "any", 650, "win-10", "best and less price"),
+    ("Monitor", "Any", "any", 5600, "win-11", "best and less price"),
+    ("One Set (i3)", "G61 + H61", "SSD 256GB + RAM 8GB", 7200, "-", "Souza's Price 7200"),
+    ("One Set (i5)", "Gh110", "SSD 256GB + RAM 8GB ddr4", 8800, "-", "Souza's Price 8800"),
+    ("One Set (Dual core)", "G41", "SSD 256GB + RAM 8GB", 6500, "-", "Souza's Price"),
+]
+
+
+def seed_catalog(apps, schema_editor):
+    EquipmentCatalog = apps.get_model('maintenance_app', 'EquipmentCatalog')
+    EquipmentPriceHistory = apps.get_model('maintenance_app', 'EquipmentPriceHistory')
+    RequestItem = apps.get_model('maintenance_app', 'RequestItem')
+
+    # Historical models don't run EquipmentCatalog.save(), so write version 1 by hand
+    by_key = {}
+    for order, (device, brand, size, price, usage, remarks) in enumerate(SEED_ITEMS, start=1):
+        item = EquipmentCatalog.objects.create(
+            device=device, brand=brand, size=size, usage=usage, remarks=remarks,
+            price=Decimal(price), price_version=1, sort_order=order,
+        )
+        EquipmentPriceHistory.objects.create(item=item, price=item.price, version=1)
+        by_key[(device, brand, size)] = item
+
+    # Link existing request lines to the catalog row they were picked from
+    for (device, brand, size), item in by_key.items():
+        RequestItem.objects.filter(
+            catalog_item__isnull=True, device=device, brand=brand, size=size,
+        ).update(catalog_item=item, price_version=1)
+
+
+def unseed_catalog(apps, schema_editor):
+    RequestItem = apps.get_model('maintenance_app', 'RequestItem')
+    EquipmentCatalog = apps.get_model('maintenance_app', 'EquipmentCatalog')
+    RequestItem.objects.update(catalog_item=None, price_version=None)
+    EquipmentCatalog.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0008_equipmentcatalog'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_catalog, unseed_catalog),
+    ]
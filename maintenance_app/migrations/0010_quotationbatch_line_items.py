@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 08:28
+
+import json
+
+from django.db import migrations, models
+
+
+def snapshot_existing_batches(apps, schema_editor):
+    QuotationBatch = apps.get_model('maintenance_app', 'QuotationBatch')
+    RequestItem = apps.get_model('maintenance_app', 'RequestItem')
+    for batch in QuotationBatch.objects.all():
+        try:
+            request_ids = [int(pk) for pk in json.loads(batch.requests)]
+        except (TypeError, ValueError):
+            request_ids = []
+        batch.line_items = [
+            {"request_id": i.request_id, "request_title": i.request.title,
+             "device": i.device, "brand": i.brand, "quantity": i.quantity}
+            for i in RequestItem.objects.filter(request_id__in=request_ids)
+                                        .select_related('request').order_by('request_id', 'id')
+        ]
+        batch.save(update_fields=['line_items'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0009_seed_equipment_catalog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quotationbatch',
+            name='line_items',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(snapshot_existing_batches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+import json
+
+from django.db import migrations, models
+
+import maintenance_app.models
+
+
+def json_to_m2m(apps, schema_editor):
+    QuotationBatch = apps.get_model('maintenance_app', 'QuotationBatch')
+    MaintenanceRequest = apps.get_model('maintenance_app', 'MaintenanceRequest')
+    Through = QuotationBatch.requests.through
+    existing = set(MaintenanceRequest.objects.values_list('id', flat=True))
+
+    links = []
+    for batch_id, raw in QuotationBatch.objects.values_list('id', 'request_ids_json'):
+        try:
+            ids = {int(pk) for pk in json.loads(raw or '[]')}
+        except (TypeError, ValueError):
+            ids = set()
+        links += [Through(quotationbatch_id=batch_id, maintenancerequest_id=pk) for pk in ids & existing]
+    Through.objects.bulk_create(links)
+
+
+def m2m_to_json(apps, schema_editor):
+    QuotationBatch = apps.get_model('maintenance_app', 'QuotationBatch')
+    for batch in QuotationBatch.objects.prefetch_related('requests'):
+        batch.request_ids_json = json.dumps([str(r.id) for r in batch.requests.all()])
+        batch.save(update_fields=['request_ids_json'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0010_quotationbatch_line_items'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='quotationbatch',
+            old_name='requests',
+            new_name='request_ids_json',
+        ),
+        migrations.AddField(
+            model_name='quotationbatch',
+            name='requests',
+            field=models.ManyToManyField(blank=True, related_name='quotation_batches', to='maintenance_app.maintenancerequest'),
+        ),
+        migrations.RunPython(json_to_m2m, m2m_to_json),
+        # A default lets the column be re-added when this migration is reversed
+        migrations.AlterField(
+            model_name='quotationbatch',
+            name='request_ids_json',
+            field=models.TextField(default='[]'),
+        ),
+        migrations.RemoveField(
+            model_name='quotationbatch',
+            name='request_ids_json',
+        ),
+        migrations.AlterField(
+            model_name='quotationbatch',
+            name='token',
+            field=models.CharField(default=maintenance_app.models.new_batch_token, max_length=64, unique=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-18 08:33
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def seed_rollup(apps, schema_editor):
+    MaintenanceRequest = apps.get_model('maintenance_app', 'MaintenanceRequest')
+    DailyBranchStats = apps.get_model('maintenance_app', 'DailyBranchStats')
+    grouped = (MaintenanceRequest.objects.order_by()
+               .annotate(day=TruncDate('date_submitted', tzinfo=timezone.get_current_timezone()))
+               .values('day', 'branch', 'status')
+               .annotate(n=Count('id'), total=Sum('total_amount')))
+    DailyBranchStats.objects.bulk_create([
+        DailyBranchStats(day=row['day'], branch=row['branch'] or '', status=row['status'],
+                         count=row['n'], amount=row['total'] or 0)
+        for row in grouped
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0011_quotationbatch_requests_m2m'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBranchStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('branch', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily branch stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailybranchstats',
+            constraint=models.UniqueConstraint(fields=('day', 'branch', 'status'), name='unique_daily_branch_status'),
+        ),
+        migrations.RunPython(seed_rollup, migrations.RunPython.noop),
+    ]
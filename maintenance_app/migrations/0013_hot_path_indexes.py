@@ -0,0 +1,37 @@
+# Generated by Django 4.2 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0012_dailybranchstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailybranchstats',
+            index=models.Index(fields=['branch', 'day'], name='stats_branch_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['hod', 'status', 'date_submitted'], name='request_hod_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'branch', 'date_submitted'], name='request_status_branch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['branch', 'date_submitted'], name='request_branch_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['date_submitted', 'id'], name='request_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quotationresponse',
+            index=models.Index(fields=['batch', 'submitted_at'], name='response_batch_submitted_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 08:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0013_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(blank=True, max_length=50)),
+                ('subject', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('html_body', models.TextField(blank=True)),
+                ('from_email', models.CharField(max_length=255)),
+                ('to', models.JSONField(default=list)),
+                ('attachment_name', models.CharField(blank=True, max_length=255)),
+                ('attachment_type', models.CharField(blank=True, max_length=100)),
+                ('attachment', models.BinaryField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('Queued', 'Queued'), ('Sending', 'Sending'), ('Sent', 'Sent'), ('Failed', 'Failed')], default='Queued', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=6)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='outboundemail',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 14:05
+
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS maintenance_request_fts USING fts5("
+    "title, description, lab_name, branch, devices, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+POPULATE_SQL = (
+    "INSERT INTO maintenance_request_fts (rowid, title, description, lab_name, branch, devices) "
+    "SELECT r.id, r.title, r.description, r.lab_name, r.branch, "
+    "COALESCE((SELECT group_concat(i.device, ' ') FROM maintenance_app_requestitem i WHERE i.request_id = r.id), '') "
+    "FROM maintenance_app_maintenancerequest r"
+)
+
+
+def create_index(apps, schema_editor):
+    # FTS5 is SQLite only; other databases use the LIKE fallback in maintenance_app.search
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_SQL)
+        schema_editor.execute(POPULATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS maintenance_request_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0014_outboundemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0015_request_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30)),
+                ('hod_id', models.IntegerField(blank=True, null=True)),
+                ('request_id', models.BigIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=models.Index(fields=['hod_id', 'id'], name='changefeed_hod_id_idx'),
+        ),
+    ]
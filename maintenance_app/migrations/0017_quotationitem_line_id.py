@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0016_changeevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quotationitem',
+            name='line_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quotationitem',
+            name='size',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
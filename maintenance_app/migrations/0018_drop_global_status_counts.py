@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def drop_global_rows(apps, schema_editor):
+    # The all-HOD cards read DailyBranchStats; the hod = NULL rows were written but never read
+    RequestStatusCount = apps.get_model('maintenance_app', 'RequestStatusCount')
+    RequestStatusCount.objects.filter(hod__isnull=True).delete()
+
+
+def restore_global_rows(apps, schema_editor):
+    RequestStatusCount = apps.get_model('maintenance_app', 'RequestStatusCount')
+    totals = RequestStatusCount.objects.order_by().values('status').annotate(n=models.Sum('count'))
+    for row in totals:
+        RequestStatusCount.objects.create(hod_id=None, status=row['status'], count=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('maintenance_app', '0017_quotationitem_line_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_global_rows, restore_global_rows),
+        migrations.RemoveConstraint(
+            model_name='requeststatuscount',
+            name='unique_global_status_count',
+        ),
+        migrations.AlterField(
+            model_name='requeststatuscount',
+            name='hod',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_counts', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 09:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance_app', '0018_drop_global_status_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['hod', 'date_submitted'], name='request_hod_date_idx'),
+        ),
+    ]
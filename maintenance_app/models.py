@@ -3,23 +3,27 @@ from django.contrib.auth.models import User
 import uuid
 from django.db import models
 from django.utils import timezone
-import json
+
+
+def new_batch_token():
+    """Fresh vendor link token (called per row, not once at import)."""
+    return uuid.uuid4().hex
 
 
 class QuotationBatch(models.Model):
     """Batch of requests grouped by Principal to send for quotation."""
-    requests = models.TextField(help_text="JSON list of request IDs")
-    token = models.CharField(max_length=64, unique=True, default=uuid.uuid4().hex)
+    requests = models.ManyToManyField('MaintenanceRequest', related_name='quotation_batches', blank=True)
+    token = models.CharField(max_length=64, unique=True, default=new_batch_token)
     created_at = models.DateTimeField(default=timezone.now)
+    # Lines vendors price, frozen when the batch is created (see quotations.snapshot_lines)
+    line_items = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         return f"QuotationBatch #{self.id}"
 
     def get_request_list(self):
-        try:
-            return json.loads(self.requests)
-        except json.JSONDecodeError:
-            return []
+        """IDs of the requests in this batch (uses the prefetch cache when present)."""
+        return [r.id for r in self.requests.all()]
 
 
 class QuotationResponse(models.Model):
@@ -31,6 +35,9 @@ class QuotationResponse(models.Model):
     total_amount = models.FloatField(default=0)
     selected = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [models.Index(fields=['batch', 'submitted_at'], name='response_batch_submitted_idx')]
+
     def __str__(self):
         return f"{self.company_name} (Batch #{self.batch.id})"
 
@@ -39,8 +46,11 @@ class QuotationItem(models.Model):
     """Each item’s quotation price under a response."""
     quotation = models.ForeignKey(QuotationResponse, on_delete=models.CASCADE, related_name='items')
     request = models.ForeignKey('MaintenanceRequest', on_delete=models.CASCADE)
+    # RequestItem id of the batch line (see quotations.line_key); not a foreign key, edits replace items
+    line_id = models.PositiveIntegerField(null=True, blank=True)
     device = models.CharField(max_length=255)
     brand = models.CharField(max_length=255, blank=True, null=True)
+    size = models.CharField(max_length=255, blank=True, default='')
     quantity = models.IntegerField(default=1)
     price = models.FloatField(default=0)
     subtotal = models.FloatField(default=0)
@@ -70,9 +80,199 @@ class MaintenanceRequest(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     admin_remark = models.TextField(blank=True, null=True)
     updated_at = models.DateTimeField(auto_now=True)
-    selected_items = models.TextField(blank=True, null=True)  
     total_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
-    
-    
+
+    class Meta:
+        # Access paths of the dashboards / reports (see check_query_plans)
+        indexes = [
+            models.Index(fields=['hod', 'date_submitted'], name='request_hod_date_idx'),
+            models.Index(fields=['hod', 'status', 'date_submitted'], name='request_hod_status_date_idx'),
+            models.Index(fields=['status', 'branch', 'date_submitted'], name='request_status_branch_idx'),
+            models.Index(fields=['branch', 'date_submitted'], name='request_branch_date_idx'),
+            models.Index(fields=['date_submitted', 'id'], name='request_date_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.branch}) - {self.status}"
+
+
+class EquipmentCatalog(models.Model):
+    """Equipment HODs can pick in a request, with its current price."""
+    device = models.CharField(max_length=255)
+    brand = models.CharField(max_length=255, blank=True, default='')
+    size = models.CharField(max_length=255, blank=True, default='')
+    usage = models.CharField(max_length=100, blank=True, default='')
+    remarks = models.CharField(max_length=255, blank=True, default='')
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    price_version = models.PositiveIntegerField(default=1, editable=False)
+    is_active = models.BooleanField(default=True)
+    sort_order = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['sort_order', 'id']
+        verbose_name_plural = 'Equipment catalog'
+
+    def save(self, *args, **kwargs):
+        # Every price change gets a new version and a history row
+        old_price = None
+        if self.pk:
+            old_price = EquipmentCatalog.objects.filter(pk=self.pk).values_list('price', flat=True).first()
+            if old_price is not None and old_price != self.price:
+                self.price_version += 1
+        super().save(*args, **kwargs)
+        if old_price is None or old_price != self.price:
+            EquipmentPriceHistory.objects.create(item=self, price=self.price, version=self.price_version)
+
+    def __str__(self):
+        return f"{self.device} ({self.brand}, {self.size}) - ₹{self.price}"
+
+
+class EquipmentPriceHistory(models.Model):
+    """Past prices of a catalog item, one row per price version."""
+    item = models.ForeignKey(EquipmentCatalog, on_delete=models.CASCADE, related_name='price_history')
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    version = models.PositiveIntegerField()
+    effective_from = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-version']
+        constraints = [models.UniqueConstraint(fields=['item', 'version'], name='unique_price_version')]
+
+    def __str__(self):
+        return f"{self.item.device} v{self.version}: ₹{self.price}"
+
+
+class RequestItem(models.Model):
+    """One equipment line of a maintenance request."""
+    request = models.ForeignKey(MaintenanceRequest, on_delete=models.CASCADE, related_name='items')
+    catalog_item = models.ForeignKey(EquipmentCatalog, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='request_items')
+    price_version = models.PositiveIntegerField(null=True, blank=True)
+    device = models.CharField(max_length=255)
+    brand = models.CharField(max_length=255, blank=True, default='')
+    size = models.CharField(max_length=255, blank=True, default='')
+    usage = models.CharField(max_length=100, blank=True, default='')
+    remarks = models.CharField(max_length=255, blank=True, default='')
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    quantity = models.PositiveIntegerField(default=1)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [models.Index(fields=['device'])]
+
+    def __str__(self):
+        return f"{self.device} x {self.quantity} (Request #{self.request_id})"
+
+
+class BackgroundJob(models.Model):
+    """Deferred unit of work (PDF letters, notification emails) run by the run_jobs worker."""
+    STATUS_CHOICES = [('Queued','Queued'),('Running','Running'),('Done','Done'),('Failed','Failed'),]
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} - {self.status}"
+
+
+class RequestStatusCount(models.Model):
+    """
+    Counter cache of MaintenanceRequest rows per HOD and status. Maintained
+    by maintenance_app.counters; all-HOD counts come from DailyBranchStats.
+    """
+    hod = models.ForeignKey(User, on_delete=models.CASCADE, related_name='status_counts')
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hod', 'status'], name='unique_status_count_per_hod'),
+        ]
+
+    def __str__(self):
+        return f"{self.hod} - {self.status}: {self.count}"
+
+
+class DailyBranchStats(models.Model):
+    """
+    Rollup of MaintenanceRequest per submission day (local date), branch and
+    status: how many requests and their summed total_amount. Maintained by
+    maintenance_app.rollup; the reports and dashboard cards read from here.
+    """
+    day = models.DateField()
+    branch = models.CharField(max_length=100)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = 'Daily branch stats'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'branch', 'status'], name='unique_daily_branch_status'),
+        ]
+        indexes = [models.Index(fields=['branch', 'day'], name='stats_branch_day_idx')]
+
+    def __str__(self):
+        return f"{self.day} {self.branch} {self.status}: {self.count}"
+
+
+class OutboundEmail(models.Model):
+    """
+    Email waiting to be sent (or already sent) by the outbox dispatcher in
+    run_jobs; see maintenance_app.outbox.
+    """
+    STATUS_CHOICES = [('Queued','Queued'),('Sending','Sending'),('Sent','Sent'),('Failed','Failed'),]
+    kind = models.CharField(max_length=50, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    attachment_name = models.CharField(max_length=255, blank=True)
+    attachment_type = models.CharField(max_length=100, blank=True)
+    attachment = models.BinaryField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=6)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_idx')]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class ChangeEvent(models.Model):
+    """
+    One entry of the dashboard change feed (see maintenance_app.changefeed):
+    a request submitted, re-statused, edited or deleted, or a vendor quotation
+    saved. The id is the Server-Sent Events id. ``hod_id`` scopes request
+    events to that HOD's dashboard; events without one are for the admins.
+    Plain ids rather than foreign keys, so events outlive what they describe.
+    """
+    kind = models.CharField(max_length=30)
+    hod_id = models.IntegerField(null=True, blank=True)
+    request_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['hod_id', 'id'], name='changefeed_hod_id_idx')]
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} (request {self.request_id})"
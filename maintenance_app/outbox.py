@@ -0,0 +1,182 @@
+"""
+Email outbox.
+
+Job handlers call ``queue()`` instead of sending; the run_jobs worker calls
+``dispatch()``, which claims a batch of due OutboundEmail rows, sends them
+over one connection of EMAIL_BACKEND, keeps to EMAIL_RATE_PER_MINUTE and
+records the outcome of every message (Sent, re-Queued with jittered backoff,
+or Failed after max_attempts).
+"""
+import logging
+import random
+import time
+import traceback
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from . import profiling
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+_throttle = None
+
+
+def queue(message, kind=''):
+    """Store an EmailMessage (or EmailMultiAlternatives) for the dispatcher and return the row."""
+    html = next((content for content, mimetype in getattr(message, 'alternatives', [])
+                 if mimetype == 'text/html'), '')
+    row = OutboundEmail(kind=kind, subject=message.subject, body=message.body, html_body=html,
+                        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL, to=list(message.to))
+    if message.attachments:
+        # Only (filename, content, mimetype) tuples; the letters are the only attachments we send
+        name, content, mimetype = message.attachments[0]
+        row.attachment_name, row.attachment, row.attachment_type = name, content, mimetype or ''
+    row.save()
+    return row
+
+
+def to_message(row, connection=None):
+    message = EmailMultiAlternatives(row.subject, row.body, row.from_email, row.to, connection=connection)
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    if row.attachment is not None:
+        message.attach(row.attachment_name, bytes(row.attachment), row.attachment_type or None)
+    return message
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, so a provider outage doesn't end in a synchronized burst."""
+    base = settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return min(base, settings.EMAIL_RETRY_MAX_SECONDS) * random.uniform(0.5, 1.5)
+
+
+class Throttle:
+    """Space sends out to at most ``per_minute`` messages a minute (0 = no limit)."""
+
+    def __init__(self, per_minute, sleep=time.sleep, clock=time.monotonic):
+        self.interval = 60 / per_minute if per_minute else 0
+        self.sleep = sleep
+        self.clock = clock
+        self.next_at = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_at is not None and now < self.next_at:
+            self.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+def _shared_throttle():
+    """One throttle per process, so the rate also holds across batches."""
+    global _throttle
+    if _throttle is None:
+        _throttle = Throttle(settings.EMAIL_RATE_PER_MINUTE)
+    return _throttle
+
+
+def claim_batch(limit):
+    """Move up to ``limit`` due messages from Queued to Sending (conditional UPDATE, safe with several workers)."""
+    now = timezone.now()
+    candidates = list(OutboundEmail.objects
+                      .filter(status='Queued', next_attempt_at__lte=now)
+                      .order_by('next_attempt_at', 'id')
+                      .values_list('id', flat=True)[:limit])
+    if not candidates:
+        return []
+    OutboundEmail.objects.filter(id__in=candidates, status='Queued').update(status='Sending', updated_at=now)
+    # Only the rows this UPDATE moved carry our timestamp; another worker's claims are left out
+    return list(OutboundEmail.objects.filter(id__in=candidates, status='Sending', updated_at=now).order_by('id'))
+
+
+def _record_failure(row, error):
+    row.last_error = ''.join(traceback.format_exception_only(type(error), error)).strip()
+    if row.attempts >= row.max_attempts:
+        row.status = 'Failed'
+        logger.error("Email %s to %s failed permanently: %s", row.id, row.to, row.last_error)
+    else:
+        row.status = 'Queued'
+        row.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(row.attempts))
+        logger.warning("Email %s failed, retry %s at %s", row.id, row.attempts, row.next_attempt_at)
+
+
+SAVED_FIELDS = ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at']
+
+
+def _fail_all(rows, error):
+    """Count a failed attempt for each of ``rows`` (no connection to send them over)."""
+    for row in rows:
+        row.attempts += 1
+        _record_failure(row, error)
+        row.save(update_fields=SAVED_FIELDS)
+
+
+def _open_connection():
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    return connection
+
+
+def dispatch(batch_size=None, throttle=None):
+    """Send one batch of due messages over a single connection. Returns the number of messages tried."""
+    rows = claim_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not rows:
+        return 0
+    throttle = throttle or _shared_throttle()
+    try:
+        connection = _open_connection()
+    except Exception as e:
+        # Server down or refusing: every claimed row goes back to Queued with backoff, none stays Sending
+        _fail_all(rows, e)
+        return len(rows)
+    try:
+        for index, row in enumerate(rows):
+            throttle.wait()
+            row.attempts += 1
+            try:
+                with profiling.section('smtp'):
+                    connection.send_messages([to_message(row, connection)])
+            except SMTPServerDisconnected as e:
+                # The server dropped the connection; reopen it for the rest of the batch
+                _record_failure(row, e)
+                row.save(update_fields=SAVED_FIELDS)
+                connection.close()
+                try:
+                    connection = _open_connection()
+                except Exception as e:
+                    _fail_all(rows[index + 1:], e)
+                    break
+                continue
+            except Exception as e:
+                _record_failure(row, e)
+            else:
+                row.status = 'Sent'
+                row.sent_at = timezone.now()
+                row.last_error = None
+            row.save(update_fields=SAVED_FIELDS)
+    finally:
+        connection.close()
+    return len(rows)
+
+
+def requeue_stale(minutes=15):
+    """Put back messages left Sending by a worker that died mid-batch."""
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return OutboundEmail.objects.filter(status='Sending', updated_at__lt=cutoff).update(status='Queued')
+
+
+def dispatch_pending():
+    """Dispatch batches until no message is due. Returns the number of messages tried."""
+    total = 0
+    while True:
+        count = dispatch()
+        if not count:
+            return total
+        total += count
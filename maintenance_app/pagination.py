@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination and server-side filters for MaintenanceRequest lists.
+
+Pages are ordered by (date_submitted, id) descending; the cursor encodes the
+last row of the previous page, so fetching page N costs the same as page 1.
+"""
+import base64
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def page_size_from(params, default=DEFAULT_PAGE_SIZE):
+    """``?page_size=`` clamped to 1..MAX_PAGE_SIZE."""
+    try:
+        size = int(params.get('page_size') or default)
+    except ValueError:
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(obj):
+    raw = f"{obj.date_submitted.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (date_submitted, id) from a cursor string, or None if it is missing/invalid."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        stamp, pk = raw.rsplit('|', 1)
+        when = parse_datetime(stamp)
+        return (when, int(pk)) if when else None
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_queryset(queryset, cursor=None):
+    """``queryset`` newest first, restricted to the rows after ``cursor``."""
+    queryset = queryset.order_by('-date_submitted', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        when, pk = position
+        queryset = queryset.filter(Q(date_submitted__lt=when) | Q(date_submitted=when, id__lt=pk))
+    return queryset
+
+
+def keyset_page(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    One page of ``queryset`` newest first, starting after ``cursor``.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = keyset_queryset(queryset, cursor)
+    rows = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+async def akeyset_page(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """keyset_page() through the async ORM, for the ASGI views."""
+    queryset = keyset_queryset(queryset, cursor)
+    rows = [row async for row in queryset[:page_size + 1]]
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def date_range_from(params, today=None):
+    """
+    (date_from, date_to) from ``?range=week|month|year`` or explicit
+    ``?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD``; either end may be None.
+    """
+    today = today or timezone.localdate()
+    quick = params.get('range')
+    if quick == 'week':
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if quick == 'month':
+        start = today.replace(day=1)
+        next_month = (start + timedelta(days=32)).replace(day=1)
+        return start, next_month - timedelta(days=1)
+    if quick == 'year':
+        return date(today.year, 1, 1), date(today.year, 12, 31)
+    return _parse_day(params.get('date_from')), _parse_day(params.get('date_to'))
+
+
+def _parse_day(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def filter_requests(queryset, params):
+    """Apply the status / department / date range filters from GET ``params``."""
+    status = params.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+
+    department = params.get('department')
+    if department and department != 'All':
+        queryset = queryset.filter(branch=department)
+
+    date_from, date_to = date_range_from(params)
+    # Compare against aware datetimes (not __date) so the date_submitted index stays usable
+    if date_from:
+        queryset = queryset.filter(date_submitted__gte=_day_start(date_from))
+    if date_to:
+        queryset = queryset.filter(date_submitted__lt=_day_start(date_to + timedelta(days=1)))
+    return queryset
@@ -0,0 +1,130 @@
+"""
+Bounded pool of long-lived PDF rendering processes.
+
+WeasyPrint is only ever imported inside the pool processes: each one loads it
+(and its fonts) once at start-up and then renders HTML strings sent to it, so
+web workers never pay for the import. Callers block on the result for at most
+PDF_RENDER_TIMEOUT seconds; a render that takes longer gets the whole pool
+restarted so the stuck process can't hold a slot. That also drops the other
+renders in flight, whose callers get RenderTimeout (the letter jobs retry).
+At most PDF_QUEUE_LIMIT renders may be queued or running at once, further
+calls fail fast with RenderQueueFull.
+
+Every failure reaches the caller as a RenderError. The parent checks once
+that WeasyPrint is installed (without importing it) before starting the
+pool, and a process whose start-up failed (e.g. missing system libraries)
+answers each render with that error at once instead of dying: a failing pool
+initializer makes multiprocessing respawn processes forever and leaves every
+caller waiting for the full timeout.
+
+With PDF_WORKERS = 0 HTML is rendered in the calling process instead
+(handy for a dev server or a one-off shell).
+"""
+import atexit
+import importlib.util
+import threading
+
+from django.conf import settings
+
+_pool = None
+_lock = threading.Lock()
+_slots = None
+_installed = None
+# Set in a pool process whose _warm() failed
+_warm_error = None
+
+
+class RenderError(RuntimeError):
+    """A PDF could not be rendered right now; the caller may retry later."""
+
+
+class RenderQueueFull(RenderError):
+    pass
+
+
+class RenderTimeout(RenderError):
+    pass
+
+
+def _warm():
+    """Pool initializer: import WeasyPrint and load the default fonts once per process."""
+    global _warm_error
+    try:
+        from weasyprint import HTML
+
+        HTML(string='<p>warm-up</p>').write_pdf()
+    except Exception as e:
+        # Raising here would make the pool respawn this process in a loop
+        _warm_error = f"PDF renderer failed to start: {e!r}"
+
+
+def _render(html):
+    if _warm_error:
+        raise RenderError(_warm_error)
+    try:
+        from weasyprint import HTML
+
+        return HTML(string=html).write_pdf()
+    except Exception as e:
+        raise RenderError(f"PDF render failed: {e!r}") from None
+
+
+def _check_installed():
+    global _installed
+    if _installed is None:
+        _installed = importlib.util.find_spec('weasyprint') is not None
+    if not _installed:
+        raise RenderError("WeasyPrint is not installed (pip install weasyprint)")
+
+
+def _get_pool():
+    global _pool, _slots
+    with _lock:
+        if _pool is None:
+            import multiprocessing
+
+            # spawn: fresh processes that don't inherit the web worker's DB connections or threads
+            context = multiprocessing.get_context('spawn')
+            _pool = context.Pool(processes=settings.PDF_WORKERS, initializer=_warm,
+                                 maxtasksperchild=settings.PDF_MAX_TASKS_PER_WORKER)
+            _slots = threading.BoundedSemaphore(settings.PDF_QUEUE_LIMIT)
+        return _pool, _slots
+
+
+def shutdown(pool=None):
+    """Stop the rendering processes (or only ``pool`` if it is still current); the next render starts a new pool."""
+    global _pool
+    with _lock:
+        if _pool is not None and pool in (None, _pool):
+            _pool.terminate()
+            _pool.join()
+            _pool = None
+
+
+atexit.register(shutdown)
+
+
+def render(html):
+    """Render ``html`` to PDF bytes in the pool. Raises RenderError (RenderQueueFull / RenderTimeout)."""
+    _check_installed()
+    if not settings.PDF_WORKERS:
+        return _render(html)
+    import multiprocessing
+
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise RenderQueueFull(f"{settings.PDF_QUEUE_LIMIT} PDF renders are already queued")
+    try:
+        result = pool.apply_async(_render, (html,))
+        try:
+            return result.get(timeout=settings.PDF_RENDER_TIMEOUT)
+        except multiprocessing.TimeoutError:
+            # Restarts the whole pool: the other renders in flight are lost too
+            shutdown(pool)
+            raise RenderTimeout(f"PDF render took longer than {settings.PDF_RENDER_TIMEOUT}s")
+        except RenderError:
+            raise
+        except Exception as e:
+            raise RenderError(f"PDF render failed: {e!r}") from e
+    finally:
+        slots.release()
@@ -0,0 +1,276 @@
+"""
+Opt-in request profiling (settings.PROFILING_ENABLED).
+
+ProfilingMiddleware (college_maintenance.middleware.profiling_middleware)
+starts a RequestProfile per request, under WSGI and ASGI; the DB execute
+wrapper (on every connection, so the ORM calls async views make in
+sync_to_async threads count too), the template hook and section() add to it. Totals go into a process-local Registry that
+the /metrics/ view renders in Prometheus text format, and the per-request
+numbers are sent back as a Server-Timing header. Queries and requests over
+PROFILING_SLOW_QUERY_MS / PROFILING_SLOW_REQUEST_MS are logged with their SQL.
+
+Streamed responses (exports, the event stream) are recorded when they close,
+so the metrics include sending the body; their Server-Timing header can only
+cover the time until the headers went out.
+
+section() also works outside a request (e.g. PDF rendering in run_jobs), in
+which case it only feeds the registry of that process.
+"""
+import contextvars
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import FileResponse
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_installed = False
+_query_hook_installed = False
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def slow_query_ms():
+    return getattr(settings, 'PROFILING_SLOW_QUERY_MS', 100)
+
+
+def slow_request_ms():
+    return getattr(settings, 'PROFILING_SLOW_REQUEST_MS', 500)
+
+
+class RequestProfile:
+    """Timings collected while one request is handled (all in milliseconds)."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.view = '-'
+        self.total_ms = 0.0
+        self.db_ms = 0.0
+        self.queries = []
+        self.sections = defaultdict(float)
+        self.recorded = False
+
+    def add_query(self, sql, elapsed_ms):
+        self.db_ms += elapsed_ms
+        self.queries.append((elapsed_ms, sql))
+
+    def finish(self):
+        self.total_ms = (perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        parts = [f'total;dur={self.total_ms:.1f}',
+                 f'db;dur={self.db_ms:.1f};desc="{len(self.queries)} queries"']
+        parts += [f'{name};dur={ms:.1f}' for name, ms in sorted(self.sections.items())]
+        return ', '.join(parts)
+
+
+class Registry:
+    """Process-local Prometheus counters and a request latency histogram."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = defaultdict(int)               # (view, method, status) -> n
+        self.latency = {}                               # view -> [bucket counts..., sum, count]
+        self.db_queries = defaultdict(int)             # view -> n
+        self.db_seconds = defaultdict(float)           # view -> s
+        self.section_seconds = defaultdict(float)      # (view, section) -> s
+
+    def observe_request(self, view, method, status, profile):
+        seconds = profile.total_ms / 1000
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            hist = self.latency.setdefault(view, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+            self.db_queries[view] += len(profile.queries)
+            self.db_seconds[view] += profile.db_ms / 1000
+
+    def observe_section(self, view, name, elapsed_ms):
+        with self._lock:
+            self.section_seconds[(view, name)] += elapsed_ms / 1000
+
+    def render(self):
+        with self._lock:
+            lines = ['# HELP portal_requests_total Requests handled, by view, method and status.',
+                     '# TYPE portal_requests_total counter']
+            lines += [f'portal_requests_total{{view="{v}",method="{m}",status="{s}"}} {n}'
+                      for (v, m, s), n in sorted(self.requests.items())]
+
+            lines += ['# HELP portal_request_duration_seconds Wall time per request.',
+                      '# TYPE portal_request_duration_seconds histogram']
+            for view, hist in sorted(self.latency.items()):
+                for bound, n in zip(LATENCY_BUCKETS, hist):
+                    lines.append(f'portal_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {n}')
+                lines.append(f'portal_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {hist[-1]}')
+                lines.append(f'portal_request_duration_seconds_sum{{view="{view}"}} {hist[-2]:.6f}')
+                lines.append(f'portal_request_duration_seconds_count{{view="{view}"}} {hist[-1]}')
+
+            lines += ['# HELP portal_db_queries_total Database queries run, by view.',
+                      '# TYPE portal_db_queries_total counter']
+            lines += [f'portal_db_queries_total{{view="{v}"}} {n}' for v, n in sorted(self.db_queries.items())]
+            lines += ['# HELP portal_db_seconds_total Time spent in database queries, by view.',
+                      '# TYPE portal_db_seconds_total counter']
+            lines += [f'portal_db_seconds_total{{view="{v}"}} {s:.6f}' for v, s in sorted(self.db_seconds.items())]
+            lines += ['# HELP portal_section_seconds_total Time in template rendering, WeasyPrint and SMTP.',
+                      '# TYPE portal_section_seconds_total counter']
+            lines += [f'portal_section_seconds_total{{view="{v}",section="{name}"}} {s:.6f}'
+                      for (v, name), s in sorted(self.section_seconds.items())]
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def start():
+    """Begin profiling the current request; returns (profile, token) for stop()."""
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    """The RequestProfile of the request being handled, or None."""
+    return _current.get()
+
+
+@contextmanager
+def section(name):
+    """Time a block as ``name`` (template, weasyprint, smtp, ...)."""
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (perf_counter() - started) * 1000
+        profile = _current.get()
+        if profile is not None:
+            profile.sections[name] += elapsed
+        REGISTRY.observe_section(profile.view if profile is not None else '-', name, elapsed)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook: time every query and log slow ones."""
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (perf_counter() - started) * 1000
+        profile = _current.get()
+        if profile is not None:
+            profile.add_query(sql, elapsed)
+        if elapsed >= slow_query_ms():
+            logger.warning("Slow query (%.1f ms): %s", elapsed, sql)
+
+
+def _add_query_wrapper(sender, connection, **kwargs):
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
+
+
+def install_query_hook():
+    """Time the queries of every connection in every thread; idempotent."""
+    global _query_hook_installed
+    if _query_hook_installed:
+        return
+    connection_created.connect(_add_query_wrapper, dispatch_uid='profiling_query_wrapper')
+    for conn in connections.all(initialized_only=True):
+        _add_query_wrapper(None, conn)
+    _query_hook_installed = True
+
+
+def install_template_hook():
+    """Time top-level template renders (render() / render_to_string()); idempotent."""
+    global _installed
+    if _installed:
+        return
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        with section('template'):
+            return original(self, context, request)
+
+    Template.render = render
+    _installed = True
+
+
+def _with_profile(chunks, profile):
+    """Iterate a streaming body with ``profile`` current, so queries made while streaming count."""
+    iterator = iter(chunks)
+    while True:
+        token = _current.set(profile)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+async def _awith_profile(chunks, profile):
+    iterator = chunks.__aiter__()
+    while True:
+        token = _current.set(profile)
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+def _record(request, response, profile):
+    REGISTRY.observe_request(profile.view, request.method, response.status_code, profile)
+    if profile.total_ms >= slow_request_ms():
+        slowest = sorted(profile.queries, reverse=True)[:5]
+        logger.warning(
+            "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms%s",
+            request.method, request.path, profile.view, profile.total_ms, len(profile.queries), profile.db_ms,
+            ''.join(f"\n  {ms:.1f} ms: {sql}" for ms, sql in slowest),
+        )
+
+
+def finish(request, response, profile):
+    """
+    Add Server-Timing to ``response`` and record ``profile`` for ``request``
+    (logging it if it was slow); streamed responses are recorded when they close.
+    """
+    profile.finish()
+    response['Server-Timing'] = profile.server_timing()
+    if not response.streaming:
+        _record(request, response, profile)
+        return response
+
+    # Files are sent by the server (sendfile) and run no queries; leave their body alone
+    if not isinstance(response, FileResponse):
+        wrap = _awith_profile if response.is_async else _with_profile
+        response.streaming_content = wrap(response.streaming_content, profile)
+    close = response.close
+
+    def closed():
+        close()
+        if not profile.recorded:
+            profile.recorded = True
+            profile.finish()
+            _record(request, response, profile)
+
+    response.close = closed
+    return response
@@ -0,0 +1,203 @@
+"""
+Quotation batches, vendor submissions and the vendor comparison matrix.
+
+The lines of a batch are frozen into QuotationBatch.line_items when the batch
+is created and cached by token, so the vendor fill page costs at most one
+query and later edits to the requests don't move the lines being priced.
+
+A submission is written in one transaction: line subtotals and the total are
+worked out in memory, then the response is inserted once (with its total) and
+every QuotationItem goes in with a single bulk_create.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Min, Window
+
+from .models import QuotationBatch, QuotationItem, QuotationResponse, RequestItem
+
+
+def _cache_key(token):
+    return f"quotation_batch:{token}"
+
+
+def snapshot_lines(request_ids):
+    """The priceable lines of the given requests, in request order."""
+    items = (RequestItem.objects.filter(request_id__in=request_ids)
+             .select_related('request').order_by('request_id', 'id'))
+    return [
+        {"line_id": i.id, "request_id": i.request_id, "request_title": i.request.title,
+         "device": i.device, "brand": i.brand, "size": i.size, "quantity": i.quantity}
+        for i in items
+    ]
+
+
+def create_batch(request_ids):
+    """Create a QuotationBatch for ``request_ids`` with its line snapshot."""
+    request_ids = sorted({int(pk) for pk in request_ids})
+    with transaction.atomic():
+        batch = QuotationBatch.objects.create(line_items=snapshot_lines(request_ids))
+        batch.requests.set(request_ids)
+    return batch
+
+
+def batch_snapshot(token):
+    """
+    {'id': batch id, 'lines': [...]} for ``token`` from the cache (one query on a miss),
+    or None if there is no such batch.
+    """
+    key = _cache_key(token)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        row = QuotationBatch.objects.filter(token=token).values('id', 'line_items').first()
+        if row is None:
+            return None
+        snapshot = {'id': row['id'], 'lines': row['line_items']}
+        cache.set(key, snapshot, getattr(settings, 'QUOTATION_SNAPSHOT_TIMEOUT', 24 * 3600))
+    return snapshot
+
+
+def forget_batch(token):
+    cache.delete(_cache_key(token))
+
+
+def line_key(line):
+    """
+    Stable key of a snapshot line: the id of the RequestItem it was taken from
+    (a request can list the same device twice, e.g. in two sizes). Snapshots
+    taken before lines carried an id fall back to request id + device.
+    """
+    if line.get('line_id') is not None:
+        return str(line['line_id'])
+    return f"{line['request_id']}_{line['device']}"
+
+
+def price_field(line):
+    """Name of the form input holding the vendor's price for ``line``."""
+    return f"price_{line_key(line)}"
+
+
+def _price(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def priced_lines(lines, post):
+    """(lines with price/subtotal filled in from ``post``, total)."""
+    priced, total = [], 0.0
+    for line in lines:
+        price = _price(post.get(price_field(line)))
+        subtotal = price * int(line["quantity"])
+        total += subtotal
+        priced.append(dict(line, price=price, subtotal=subtotal))
+    return priced, total
+
+
+def submit_quotation(batch_id, company_name, email, lines, post):
+    """Save a vendor's quotation for batch ``batch_id``; returns the QuotationResponse."""
+    priced, total = priced_lines(lines, post)
+    with transaction.atomic():
+        quotation = QuotationResponse.objects.create(
+            batch_id=batch_id, company_name=company_name, email=email, total_amount=total,
+        )
+        # bulk_create skips QuotationItem.save(), so subtotal is set explicitly
+        QuotationItem.objects.bulk_create([
+            QuotationItem(
+                quotation=quotation,
+                request_id=line["request_id"],
+                line_id=line.get("line_id"),
+                device=line["device"],
+                brand=line["brand"],
+                size=line.get("size", ""),
+                quantity=line["quantity"],
+                price=line["price"],
+                subtotal=line["subtotal"],
+            )
+            for line in priced
+        ])
+    return quotation
+
+
+def _comparison_key(batch_id):
+    return f"quotation_compare:{batch_id}"
+
+
+def _comparison_rows(batch_id):
+    return (QuotationItem.objects
+            .filter(quotation__batch_id=batch_id)
+            # line_id tells apart same-device lines; it is NULL (one partition per device) for old batches
+            .annotate(lowest=Window(Min('price'), partition_by=[F('request_id'), F('device'), F('line_id')]))
+            .values('quotation_id', 'quotation__company_name', 'request_id', 'line_id', 'device', 'size',
+                    'quantity', 'price', 'subtotal', 'lowest')
+            .order_by('request_id', 'line_id', 'device', 'quotation_id'))
+
+
+def _build_matrix(rows):
+    vendors, lines = {}, {}
+    for row in rows:
+        vendor = vendors.setdefault(row['quotation_id'], {
+            'id': row['quotation_id'], 'company_name': row['quotation__company_name'],
+            'total': 0.0, 'lines_quoted': 0,
+        })
+        vendor['total'] += row['subtotal']
+        vendor['lines_quoted'] += 1
+        line = lines.setdefault((row['request_id'], row['device'], row['line_id']), {
+            'request_id': row['request_id'], 'line_id': row['line_id'], 'device': row['device'],
+            'size': row['size'], 'quantity': row['quantity'],
+            'lowest': row['lowest'], 'best_vendor': None, 'prices': {},
+        })
+        line['prices'][row['quotation_id']] = row['price']
+        if row['price'] == row['lowest'] and line['best_vendor'] is None:
+            line['best_vendor'] = row['quotation_id']
+
+    ordered = sorted(vendors.values(), key=lambda v: (v['total'], v['id']))
+    for vendor in ordered:
+        vendor['complete'] = vendor['lines_quoted'] == len(lines)
+    for line in lines.values():
+        prices = line.pop('prices')
+        line['cells'] = [
+            {'price': prices[v['id']], 'delta': prices[v['id']] - line['lowest'],
+             'is_lowest': prices[v['id']] == line['lowest']} if v['id'] in prices else None
+            for v in ordered
+        ]
+
+    best = next((v['id'] for v in ordered if v['complete']), None)
+    return {'vendors': ordered, 'lines': list(lines.values()), 'best_vendor': best}
+
+
+def _matrix_timeout():
+    return getattr(settings, 'QUOTATION_SNAPSHOT_TIMEOUT', 24 * 3600)
+
+
+def comparison_matrix(batch_id):
+    """
+    Line-by-line vendor comparison for a batch, built from one windowed query
+    over QuotationItem and cached until a response for the batch changes:
+
+    {'vendors': [{'id', 'company_name', 'total', 'lines_quoted', 'complete'}, ...]  # cheapest first
+     'lines': [{'request_id', 'line_id', 'device', 'size', 'quantity', 'lowest', 'best_vendor',
+                'cells': [{'price', 'delta', 'is_lowest'} or None per vendor]}, ...],
+     'best_vendor': id of the cheapest vendor that quoted every line, or None}
+    """
+    key = _comparison_key(batch_id)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = _build_matrix(_comparison_rows(batch_id))
+        cache.set(key, matrix, _matrix_timeout())
+    return matrix
+
+
+async def acomparison_matrix(batch_id):
+    """comparison_matrix() through the async ORM and cache API, for the ASGI views."""
+    key = _comparison_key(batch_id)
+    matrix = await cache.aget(key)
+    if matrix is None:
+        matrix = _build_matrix([row async for row in _comparison_rows(batch_id)])
+        await cache.aset(key, matrix, _matrix_timeout())
+    return matrix
+
+
+def forget_comparison(batch_id):
+    cache.delete(_comparison_key(batch_id))
@@ -0,0 +1,251 @@
+"""
+Reports engine: time-bucketed aggregates over MaintenanceRequest and
+streaming CSV / XLSX exports.
+
+Aggregates are computed in SQL (Trunc* + GROUP BY branch, status) over the
+DailyBranchStats rollup and cached per (filters, bucket); the cache key
+carries the requests version from maintenance_app.caching, so any request
+change invalidates them.
+"""
+import csv
+import hashlib
+import re
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.db.models import DateField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from . import caching
+from .models import DailyBranchStats, MaintenanceRequest
+from .pagination import date_range_from, filter_requests
+
+BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+DEFAULT_BUCKET = 'month'
+
+SUMMARY_HEADER = ['Period', 'Department', 'Status', 'Requests', 'Amount']
+REQUESTS_HEADER = ['ID', 'Title', 'Department', 'Status', 'Submitted', 'Amount', 'HOD']
+
+
+def bucket_from(params):
+    bucket = params.get('bucket')
+    return bucket if bucket in BUCKETS else DEFAULT_BUCKET
+
+
+def _filter_key(params, bucket):
+    date_from, date_to = date_range_from(params)
+    parts = [bucket, params.get('status') or '', params.get('department') or 'All',
+             str(date_from or ''), str(date_to or '')]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f"report:{caching.version(caching.REQUESTS)}:{digest}"
+
+
+def filter_rollup(params):
+    """DailyBranchStats rows matching the status / department / date range filters."""
+    queryset = DailyBranchStats.objects.exclude(count=0, amount=0)
+    status = params.get('status')
+    if status:
+        queryset = queryset.filter(status=status)
+    department = params.get('department')
+    if department and department != 'All':
+        queryset = queryset.filter(branch=department)
+    date_from, date_to = date_range_from(params)
+    if date_from:
+        queryset = queryset.filter(day__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(day__lte=date_to)
+    return queryset
+
+
+def _period_rows(params, bucket):
+    trunc = BUCKETS[bucket]('day', output_field=DateField())
+    return (filter_rollup(params)
+            .annotate(period=trunc)
+            .values('period', 'branch', 'status')
+            .annotate(requests=Sum('count'), amount=Sum('amount'))
+            .order_by('period', 'branch', 'status'))
+
+
+def aggregate(params):
+    """
+    Counts and amount sums per (period, branch, status) for the GET filters in
+    ``params``; ``?bucket=day|week|month`` picks the period (default month).
+    Returns a list of {'period', 'branch', 'status', 'requests', 'amount'} dicts,
+    oldest period first.
+    """
+    bucket = bucket_from(params)
+    key = _filter_key(params, bucket)
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(_period_rows(params, bucket))
+        cache.set(key, rows, caching.fragment_ttl())
+    return rows
+
+
+async def aaggregate(params):
+    """aggregate() through the async ORM and cache API, for the ASGI views."""
+    bucket = bucket_from(params)
+    key = _filter_key(params, bucket)
+    rows = await cache.aget(key)
+    if rows is None:
+        rows = [row async for row in _period_rows(params, bucket)]
+        await cache.aset(key, rows, caching.fragment_ttl())
+    return rows
+
+
+def totals(rows):
+    """Grand totals of aggregate() rows: {'requests': n, 'amount': Decimal}."""
+    return {
+        'requests': sum(r['requests'] for r in rows),
+        'amount': sum((r['amount'] or 0 for r in rows), 0),
+    }
+
+
+def summary_rows(params):
+    for r in aggregate(params):
+        yield [r['period'].isoformat(), r['branch'], r['status'], r['requests'], r['amount'] or 0]
+
+
+def request_rows(params):
+    """Every filtered request as an export row, read in chunks from the database."""
+    queryset = (filter_requests(MaintenanceRequest.objects.all(), params)
+                .order_by('date_submitted', 'id')
+                .values_list('id', 'title', 'branch', 'status', 'date_submitted', 'total_amount', 'hod__username'))
+    for pk, title, branch, status, submitted, amount, hod in queryset.iterator(chunk_size=2000):
+        yield [pk, title, branch, status, timezone.localtime(submitted).strftime('%Y-%m-%d %H:%M'), amount, hod]
+
+
+# -------------------------------------------------------------------
+# CSV
+# -------------------------------------------------------------------
+class _Echo:
+    """csv.writer target that hands each formatted line straight back."""
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# -------------------------------------------------------------------
+# XLSX (stdlib zipfile, written to a non-seekable sink and drained as we go)
+# -------------------------------------------------------------------
+_XLSX_PARTS = [
+    ('[Content_Types].xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/workbook.xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+     'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+     '<sheets><sheet name="Report" sheetId="1" r:id="rId1"/></sheets>'
+     '</workbook>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '</Relationships>'),
+]
+_SHEET_HEAD = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+               '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+_SHEET_TAIL = '</sheetData></worksheet>'
+# Characters XML 1.0 does not allow
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+XLSX_FLUSH_ROWS = 500
+
+
+class _ZipSink:
+    """Write-only, non-seekable file for zipfile; drain() returns what was written since last call."""
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _column(index):
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _row_xml(number, values):
+    cells = []
+    for i, value in enumerate(values):
+        ref = f'{_column(i)}{number}'
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(_INVALID_XML.sub('', '' if value is None else str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'.encode()
+
+
+def stream_xlsx(header, rows):
+    import zipfile  # only the XLSX export needs it
+
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in _XLSX_PARTS:
+            zf.writestr(name, xml)
+        yield sink.drain()
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(_SHEET_HEAD.encode())
+            sheet.write(_row_xml(1, header))
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_row_xml(number, row))
+                if number % XLSX_FLUSH_ROWS == 0:
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(_SHEET_TAIL.encode())
+    yield sink.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
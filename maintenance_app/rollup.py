@@ -0,0 +1,126 @@
+"""
+DailyBranchStats rollup: request counts and amount sums per (day, branch, status).
+
+Rows are adjusted incrementally by the MaintenanceRequest signals (and by the
+bulk status update, which bypasses them), so reports group a few rows per day
+instead of scanning the whole request history. rebuild() / check() back the
+rebuild_rollup management command.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyBranchStats, MaintenanceRequest
+
+
+def _money(value):
+    return Decimal(str(value or 0))
+
+
+def state_of(instance):
+    """
+    (day, branch, status, amount) a MaintenanceRequest is rolled up under, or None
+    if the instance isn't saved yet or was loaded without those fields.
+    """
+    values = instance.__dict__
+    if any(values.get(f) is None for f in ('date_submitted', 'status')) or 'total_amount' not in values:
+        return None
+    return (timezone.localdate(values['date_submitted']), values.get('branch') or '',
+            values['status'], _money(values['total_amount']))
+
+
+def _bump(day, branch, status, count, amount):
+    rows = DailyBranchStats.objects.filter(day=day, branch=branch, status=status)
+    if rows.update(count=F('count') + count, amount=F('amount') + amount) or count < 0:
+        return
+    try:
+        with transaction.atomic():
+            DailyBranchStats.objects.create(day=day, branch=branch, status=status, count=count, amount=amount)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(count=F('count') + count, amount=F('amount') + amount)
+
+
+def adjust(key, count, amount):
+    """Add ``count`` requests / ``amount`` to the (day, branch, status) ``key``."""
+    if not (count or amount):
+        return
+    day, branch, status = key
+    _bump(day, branch or '', status, count, _money(amount))
+
+
+def move(old, new):
+    """
+    A request went from ``old`` to ``new`` — each a (day, branch, status, amount)
+    tuple, or None when it didn't exist before / doesn't exist any more.
+    """
+    if old == new:
+        return
+    if old and new and old[:3] == new[:3]:
+        adjust(new[:3], 0, new[3] - old[3])
+        return
+    if old:
+        adjust(old[:3], -1, -old[3])
+    if new:
+        adjust(new[:3], 1, new[3])
+
+
+def _live_groups(queryset):
+    return (queryset.order_by()
+            .annotate(day=TruncDate('date_submitted', tzinfo=timezone.get_current_timezone()))
+            .values('day', 'branch', 'status')
+            .annotate(n=Count('id'), total=Sum('total_amount')))
+
+
+def grouped_for_update(queryset):
+    """Rollup groups of ``queryset``; take this before a bulk ``.update(status=...)``."""
+    return list(_live_groups(queryset))
+
+
+def apply_grouped(grouped, new_status):
+    """Move rollup rows after a bulk ``.update(status=new_status)``."""
+    for row in grouped:
+        if row['status'] != new_status:
+            amount = _money(row['total'])
+            adjust((row['day'], row['branch'], row['status']), -row['n'], -amount)
+            adjust((row['day'], row['branch'], new_status), row['n'], amount)
+
+
+def live_totals():
+    """{(day, branch, status): (count, amount)} computed from MaintenanceRequest."""
+    return {
+        (row['day'], row['branch'], row['status']): (row['n'], _money(row['total']))
+        for row in _live_groups(MaintenanceRequest.objects.all())
+    }
+
+
+def stored_totals():
+    return {
+        (row.day, row.branch, row.status): (row.count, row.amount)
+        for row in DailyBranchStats.objects.exclude(count=0, amount=0)
+    }
+
+
+def check():
+    """Keys whose stored rollup differs from the live data: {key: (stored, live)}."""
+    stored, live = stored_totals(), live_totals()
+    return {
+        key: (stored.get(key), live.get(key))
+        for key in stored.keys() | live.keys()
+        if stored.get(key) != live.get(key)
+    }
+
+
+def rebuild():
+    """Recompute the whole rollup from MaintenanceRequest."""
+    rows = [
+        DailyBranchStats(day=day, branch=branch, status=status, count=count, amount=amount)
+        for (day, branch, status), (count, amount) in live_totals().items()
+    ]
+    with transaction.atomic():
+        DailyBranchStats.objects.all().delete()
+        DailyBranchStats.objects.bulk_create(rows)
+    return len(rows)
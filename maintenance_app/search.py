@@ -0,0 +1,167 @@
+"""
+Full-text search over maintenance requests (SQLite FTS5).
+
+The index is a shadow FTS5 table, one row per request (rowid = request id)
+holding its title, description, lab name, branch and the device names of its
+items. The MaintenanceRequest signals re-index a request in the same
+transaction that changes it, and the item writers (replace_items() and the
+admin inline) call index() themselves; rebuild() / check() back the
+rebuild_search_index command.
+
+Results are ranked with BM25, title and device matches weighing most. On
+other databases search falls back to a case-insensitive LIKE over the same
+columns.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import MaintenanceRequest, RequestItem
+
+TABLE = 'maintenance_request_fts'
+COLUMNS = ('title', 'description', 'lab_name', 'branch', 'devices')
+INDEXED_FIELDS = COLUMNS[:-1]  # the MaintenanceRequest fields; devices come from RequestItem
+# bm25() weights, in COLUMNS order
+WEIGHTS = (10.0, 1.0, 3.0, 2.0, 5.0)
+MAX_TERMS = 8
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+_TERM = re.compile(r'\w+', re.UNICODE)
+# snippet() markers; the text is escaped before they become <mark> tags
+_OPEN, _CLOSE = '\x02', '\x03'
+
+CREATE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+    f"{', '.join(COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+DROP_SQL = f"DROP TABLE IF EXISTS {TABLE}"
+
+
+def available():
+    return connection.vendor == 'sqlite'
+
+
+def state_of(instance):
+    """The indexed fields of a MaintenanceRequest as loaded, to tell whether a save changes its document."""
+    return tuple(instance.__dict__.get(f) for f in INDEXED_FIELDS)
+
+
+def match_expression(text):
+    """
+    FTS5 query for free text typed by a user: every word must match, the
+    words are quoted (no FTS syntax gets through) and treated as prefixes.
+    Returns '' when ``text`` has no searchable words.
+    """
+    terms = _TERM.findall(text or '')[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _documents(request_ids):
+    """(id, title, description, lab_name, branch, devices) rows for ``request_ids``."""
+    devices = {}
+    items = RequestItem.objects.filter(request_id__in=request_ids).order_by('request_id', 'id')
+    for request_id, device in items.values_list('request_id', 'device'):
+        devices.setdefault(request_id, []).append(device)
+    requests = MaintenanceRequest.objects.filter(pk__in=request_ids).order_by()
+    return [row + (' '.join(devices.get(row[0], ())),)
+            for row in requests.values_list('id', 'title', 'description', 'lab_name', 'branch')]
+
+
+def index(request_ids):
+    """(Re-)index the given requests; ids that no longer exist are dropped from the index."""
+    request_ids = list(request_ids)
+    if not request_ids or not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({', '.join(['%s'] * len(request_ids))})",
+                       request_ids)
+        cursor.executemany(f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+                           _documents(request_ids))
+
+
+def remove(request_id):
+    if available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [request_id])
+
+
+def rebuild():
+    """Re-create the whole index from MaintenanceRequest / RequestItem. Returns the number of rows indexed."""
+    if not available():
+        return 0
+    requests, items = MaintenanceRequest._meta.db_table, RequestItem._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(DROP_SQL)
+        cursor.execute(CREATE_SQL)
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, {', '.join(COLUMNS)}) "
+            f"SELECT r.id, r.title, r.description, r.lab_name, r.branch, "
+            f"COALESCE((SELECT group_concat(i.device, ' ') FROM {items} i WHERE i.request_id = r.id), '') "
+            f"FROM {requests} r")
+        count = cursor.rowcount
+        # Merge the b-tree segments written above into one
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return count
+
+
+def check():
+    """(missing, stale): request ids absent from the index, and index rows whose request is gone."""
+    if not available():
+        return set(), set()
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT rowid FROM {TABLE}")
+        indexed = {row[0] for row in cursor.fetchall()}
+    live = set(MaintenanceRequest.objects.values_list('id', flat=True))
+    return live - indexed, indexed - live
+
+
+def highlight(snippet):
+    """HTML of an FTS5 snippet: escaped text with the matched words in <mark>."""
+    return escape(snippet).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+def search(text, hod=None, limit=DEFAULT_LIMIT):
+    """
+    Requests matching ``text``, best match first (only ``hod``'s when given),
+    at most ``limit``. Each has a ``snippet`` attribute (HTML, see highlight()).
+    """
+    expression = match_expression(text)
+    if not expression:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+    hod_id = getattr(hod, 'pk', hod)
+
+    if not available():
+        queryset = MaintenanceRequest.objects.order_by('-date_submitted')
+        for word in _TERM.findall(text)[:MAX_TERMS]:
+            queryset = queryset.filter(Q(title__icontains=word) | Q(description__icontains=word) |
+                                       Q(lab_name__icontains=word) | Q(branch__icontains=word) |
+                                       Q(items__device__icontains=word))
+        if hod_id is not None:
+            queryset = queryset.filter(hod_id=hod_id)
+        results = list(queryset.distinct()[:limit])
+        for r in results:
+            r.snippet = escape(r.title)
+        return results
+
+    table = MaintenanceRequest._meta.db_table
+    weights = ', '.join(str(w) for w in WEIGHTS)
+    # A join rather than "rowid IN (...)": the latter makes SQLite probe the index once per HOD row
+    sql = (
+        f"SELECT r.*, snippet({TABLE}, -1, %s, %s, '…', 12) AS snippet, bm25({TABLE}, {weights}) AS rank "
+        f"FROM {TABLE} JOIN {table} r ON r.id = {TABLE}.rowid "
+        f"WHERE {TABLE} MATCH %s" + (" AND r.hod_id = %s" if hod_id is not None else "") +
+        " ORDER BY rank LIMIT %s"
+    )
+    params = [_OPEN, _CLOSE, expression] + ([hod_id] if hod_id is not None else []) + [limit]
+    results = list(MaintenanceRequest.objects.raw(sql, params))
+    for r in results:
+        r.snippet = highlight(r.snippet)
+    return results
+
+
+def matching_ids(text):
+    """Subquery SQL + params selecting the ids of every request matching ``text`` (SQLite only)."""
+    return f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s", [match_expression(text)]
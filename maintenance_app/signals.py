@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import caching, catalog, changefeed, counters, letters, quotations, rollup, search
+from .models import EquipmentCatalog, MaintenanceRequest, QuotationBatch, QuotationItem, QuotationResponse
+
+
+def _snapshot(instance):
+    """Remember the values the counters and rollup were last updated with."""
+    instance._counted = (instance.__dict__.get('hod_id'), instance.__dict__.get('status'))
+    instance._rolled = rollup.state_of(instance)
+    instance._indexed = search.state_of(instance)
+    instance._shown = changefeed.state_of(instance)
+
+
+@receiver(post_init, sender=MaintenanceRequest)
+def remember_counted_state(sender, instance, **kwargs):
+    _snapshot(instance)
+
+
+@receiver(post_save, sender=MaintenanceRequest)
+def update_counters_on_save(sender, instance, created, **kwargs):
+    old_hod_id, old_status = instance._counted
+    if created:
+        counters.adjust(instance.hod_id, instance.status, 1)
+    elif old_status is not None and (old_hod_id, old_status) != (instance.hod_id, instance.status):
+        counters.adjust(old_hod_id, old_status, -1)
+        counters.adjust(instance.hod_id, instance.status, 1)
+    if created or instance._rolled is not None:
+        rollup.move(None if created else instance._rolled, rollup.state_of(instance))
+    if created or search.state_of(instance) != instance._indexed:
+        # Same transaction as the save, so a rollback leaves the index matching the table
+        search.index([instance.pk])
+    _record_request_change(instance, created)
+    hod_ids = (old_hod_id, instance.hod_id)
+    transaction.on_commit(lambda: caching.requests_changed(*hod_ids))
+    _snapshot(instance)
+
+
+def _record_request_change(instance, created):
+    """Feed the live dashboards: a new request, a status change or an edit of a displayed field."""
+    old_status = instance._shown[0]
+    if created:
+        kind, extra = changefeed.REQUEST_CREATED, {}
+    elif old_status is not None and old_status != instance.status:
+        kind, extra = changefeed.REQUEST_STATUS, {'old_status': old_status}
+    elif changefeed.state_of(instance) != instance._shown:
+        kind, extra = changefeed.REQUEST_UPDATED, {}
+    else:
+        return
+    changefeed.record(kind, changefeed.request_payload(instance, **extra),
+                      hod_id=instance.hod_id, request_id=instance.pk)
+
+
+@receiver(post_delete, sender=MaintenanceRequest)
+def update_counters_on_delete(sender, instance, **kwargs):
+    old_hod_id, old_status = instance._counted
+    if old_status is not None:
+        counters.adjust(old_hod_id, old_status, -1)
+    rollup.move(instance._rolled, None)
+    search.remove(instance.pk)
+    changefeed.record(changefeed.REQUEST_DELETED, {'id': instance.pk}, hod_id=old_hod_id, request_id=instance.pk)
+    transaction.on_commit(lambda: caching.requests_changed(old_hod_id))
+    request_id = instance.pk
+    transaction.on_commit(lambda: letters.forget(request_id))
+
+
+@receiver(post_save, sender=EquipmentCatalog)
+@receiver(post_delete, sender=EquipmentCatalog)
+def invalidate_catalog_cache(sender, **kwargs):
+    # After commit: invalidating earlier lets a reader re-cache the old rows before the change is visible
+    transaction.on_commit(catalog.invalidate)
+    transaction.on_commit(caching.forget_catalog_rows)
+
+
+@receiver(post_delete, sender=QuotationBatch)
+def forget_quotation_snapshot(sender, instance, **kwargs):
+    quotations.forget_batch(instance.token)
+
+
+@receiver(post_save, sender=QuotationBatch)
+@receiver(post_save, sender=QuotationResponse)
+@receiver(post_delete, sender=QuotationBatch)
+@receiver(post_delete, sender=QuotationResponse)
+def refresh_quotation_list(sender, **kwargs):
+    transaction.on_commit(lambda: caching.bump(caching.QUOTATIONS))
+
+
+@receiver(post_save, sender=QuotationResponse)
+@receiver(post_delete, sender=QuotationResponse)
+def forget_vendor_comparison(sender, instance, **kwargs):
+    # After commit, so a reader can't re-cache the matrix before the new items are visible
+    batch_id = instance.batch_id
+    transaction.on_commit(lambda: quotations.forget_comparison(batch_id))
+
+
+@receiver(post_save, sender=QuotationResponse)
+def record_quotation_change(sender, instance, created, **kwargs):
+    kind = changefeed.QUOTATION_RECEIVED if created else changefeed.QUOTATION_UPDATED
+    changefeed.record(kind, changefeed.quotation_payload(instance))
+
+
+@receiver(post_save, sender=QuotationItem)
+@receiver(post_delete, sender=QuotationItem)
+def forget_vendor_comparison_for_item(sender, instance, **kwargs):
+    batch_id = QuotationResponse.objects.filter(pk=instance.quotation_id).values_list('batch_id', flat=True).first()
+    if batch_id:
+        transaction.on_commit(lambda: quotations.forget_comparison(batch_id))
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Apply settings.SQLITE_PRAGMAS to each new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
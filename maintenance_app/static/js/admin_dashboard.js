@@ -1,386 +1,223 @@
+// Principal dashboard: column filters, infinite scroll, bulk approve/reject and quotation links.
+// Page specific values (filters, URLs, CSRF token) come from data-* attributes on <body>.
 document.addEventListener('DOMContentLoaded', () => {
-  // Get global variables
-  const CSRF_TOKEN = window.CSRF_TOKEN || document.querySelector("[name=csrfmiddlewaretoken]")?.value;
-  const generateUrl = window.GENERATE_URL;
-  
-  if (!CSRF_TOKEN) {
-    console.error("CSRF token not found!");
-  }
-
-  // Function to show success/error messages
-  function showMessage(message, type = 'success') {
-    let messagesContainer = document.getElementById('messagesContainer');
-    
-    if (!messagesContainer) {
-      messagesContainer = document.createElement('div');
-      messagesContainer.id = 'messagesContainer';
-      messagesContainer.className = 'container mt-3';
-      const navbar = document.querySelector('nav');
-      if (navbar && navbar.nextSibling) {
-        navbar.parentNode.insertBefore(messagesContainer, navbar.nextSibling);
-      } else {
-        document.body.insertBefore(messagesContainer, document.body.firstChild);
-      }
-    }
-    
-    const alertDiv = document.createElement('div');
-    alertDiv.className = `alert alert-${type} alert-dismissible fade show`;
-    alertDiv.setAttribute('role', 'alert');
-    alertDiv.style.cssText = 'margin-bottom: 1rem;';
-    alertDiv.innerHTML = `
-      ${message}
-      <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
-    `;
-    
-    if (messagesContainer.firstChild) {
-      messagesContainer.insertBefore(alertDiv, messagesContainer.firstChild);
-    } else {
-      messagesContainer.appendChild(alertDiv);
-    }
-    
-    window.scrollTo({ top: 0, behavior: 'smooth' });
-    
-    setTimeout(() => {
-      if (alertDiv && alertDiv.parentNode) {
-        alertDiv.classList.remove('show');
-        setTimeout(() => {
-          if (alertDiv && alertDiv.parentNode) {
-            alertDiv.remove();
-          }
-        }, 300);
-      }
-    }, 5000);
-  }
+  const config = document.body.dataset;
 
-  // Get table rows - use a function to get fresh rows each time
-  function getTableRows() {
-    const table = document.getElementById('requestTable');
-    if (!table) return [];
-    return Array.from(table.querySelectorAll('tbody tr'));
-  }
-
-  // Elements
+  // elements
   const colDeptIcon = document.getElementById('colDeptIcon');
   const colDeptDropdown = document.getElementById('colDeptDropdown');
   const colStatusIcon = document.getElementById('colStatusIcon');
   const colStatusDropdown = document.getElementById('colStatusDropdown');
-  const navbarDeptItems = document.querySelectorAll('.navbar-dept-filter');
+  const tableBody = document.querySelector('#requestTable tbody');
+  const scrollBox = document.querySelector('.table-responsive.fixed-height');
+  const sentinel = document.getElementById('loadMoreSentinel');
 
-  // Helper: open/close dropdowns (only one open at a time)
+  // helper: open/close dropdowns (only one open at a time)
   function closeAllColumnDropdowns() {
-    if (colDeptDropdown) colDeptDropdown.classList.remove('active');
-    if (colStatusDropdown) colStatusDropdown.classList.remove('active');
-    if (colDeptIcon) colDeptIcon.classList.remove('active');
-    if (colStatusIcon) colStatusIcon.classList.remove('active');
+    colDeptDropdown.classList.remove('active');
+    colStatusDropdown.classList.remove('active');
+    colDeptIcon.classList.remove('active');
+    colStatusIcon.classList.remove('active');
   }
 
-  // Combined filter logic - FIXED VERSION
+  // Filtering happens on the server: reload the first page with the chosen filters
   function applyCombinedFilters(deptFilterVal, statusFilterVal) {
-    const rows = getTableRows();
-    
-    rows.forEach(row => {
-      // Get department - from dept-cell
-      const deptCell = row.querySelector('.dept-cell');
-      const rowDept = deptCell ? deptCell.textContent.trim() : '';
-      
-      // Get status - from the status span inside status-cell (more reliable)
-      const statusSpan = row.querySelector('.status-cell .status');
-      const rowStatus = statusSpan ? statusSpan.textContent.trim() : '';
-      
-      // Debug logging (remove in production)
-      // console.log('Row:', rowDept, rowStatus, 'Filters:', deptFilterVal, statusFilterVal);
-      
-      // Apply filters
-      const matchDept = !deptFilterVal || deptFilterVal === '' || rowDept === deptFilterVal;
-      const matchStatus = !statusFilterVal || statusFilterVal === '' || rowStatus === statusFilterVal;
-      
-      // Show row if both filters match
-      if (matchDept && matchStatus) {
-        row.style.display = '';
-      } else {
-        row.style.display = 'none';
-      }
-    });
-    
-    // Update select all checkbox state
-    updateSelectAllCheckbox();
+    const params = new URLSearchParams(window.location.search);
+    params.delete('cursor');
+    deptFilterVal ? params.set('department', deptFilterVal) : params.delete('department');
+    statusFilterVal ? params.set('status', statusFilterVal) : params.delete('status');
+    window.location.search = params.toString();
   }
 
-  // Update select all checkbox based on visible rows
-  function updateSelectAllCheckbox() {
-    const selectAllCheckbox = document.getElementById('selectAll');
-    if (!selectAllCheckbox) return;
-    
-    const visibleRows = getTableRows().filter(row => row.style.display !== 'none');
-    const visibleChecked = visibleRows.filter(row => {
-      const cb = row.querySelector('.req-checkbox');
-      return cb && cb.checked;
-    });
-    
-    if (visibleRows.length === 0) {
-      selectAllCheckbox.indeterminate = false;
-      selectAllCheckbox.checked = false;
-    } else if (visibleChecked.length === visibleRows.length) {
-      selectAllCheckbox.indeterminate = false;
-      selectAllCheckbox.checked = true;
-    } else if (visibleChecked.length > 0) {
-      selectAllCheckbox.indeterminate = true;
-      selectAllCheckbox.checked = false;
-    } else {
-      selectAllCheckbox.indeterminate = false;
-      selectAllCheckbox.checked = false;
-    }
-  }
+  // Track current selections (as rendered by the server)
+  let currentDeptFilter = config.departmentFilter || "";
+  let currentStatusFilter = config.statusFilter || "";
 
-  // Track current selections
-  let currentDeptFilter = '';
-  let currentStatusFilter = '';
-
-  // Open/close dropdowns when clicking icons - FIXED: prevent event propagation
-  if (colDeptIcon) {
-    colDeptIcon.addEventListener('click', (e) => {
-      e.preventDefault();
-      e.stopPropagation();
-      const nowOpen = colDeptDropdown.classList.toggle('active');
-      colDeptIcon.classList.toggle('active', nowOpen);
-      if (colStatusDropdown) colStatusDropdown.classList.remove('active');
-      if (colStatusIcon) colStatusIcon.classList.remove('active');
-    });
+  function markActive(dropdown, value) {
+    dropdown.querySelectorAll('button').forEach(b => b.classList.toggle('active', (b.dataset.filter || '') === value));
   }
+  markActive(colDeptDropdown, currentDeptFilter);
+  markActive(colStatusDropdown, currentStatusFilter);
 
-  if (colStatusIcon) {
-    colStatusIcon.addEventListener('click', (e) => {
-      e.preventDefault();
-      e.stopPropagation();
-      const nowOpen = colStatusDropdown.classList.toggle('active');
-      colStatusIcon.classList.toggle('active', nowOpen);
-      if (colDeptDropdown) colDeptDropdown.classList.remove('active');
-      if (colDeptIcon) colDeptIcon.classList.remove('active');
-    });
-  }
+  // open/close when clicking icons; dropdown positioned inside th so no manual coords needed
+  colDeptIcon.addEventListener('click', (e) => {
+    e.stopPropagation();
+    const nowOpen = colDeptDropdown.classList.toggle('active');
+    colDeptIcon.classList.toggle('active', nowOpen);
+    // close other
+    colStatusDropdown.classList.remove('active');
+    colStatusIcon.classList.remove('active');
+  });
+
+  colStatusIcon.addEventListener('click', (e) => {
+    e.stopPropagation();
+    const nowOpen = colStatusDropdown.classList.toggle('active');
+    colStatusIcon.classList.toggle('active', nowOpen);
+    // close other
+    colDeptDropdown.classList.remove('active');
+    colDeptIcon.classList.remove('active');
+  });
 
-  // Clicking outside closes dropdowns - FIXED: don't close when clicking inside dropdown
+  // clicking outside closes dropdowns
   document.addEventListener('click', (e) => {
-    const isClickInsideDropdown = e.target.closest('.col-filter-dropdown');
-    const isClickOnIcon = e.target.classList.contains('filter-icon') || e.target.closest('.filter-icon');
-    
-    if (!isClickInsideDropdown && !isClickOnIcon) {
+    if (!e.target.closest('.col-filter-dropdown') && !e.target.classList.contains('filter-icon')) {
       closeAllColumnDropdowns();
     }
   });
 
-  // Header column dropdown buttons - FIXED: prevent default and stop propagation
-  if (colDeptDropdown) {
-    colDeptDropdown.querySelectorAll('button[data-filter]').forEach(btn => {
-      btn.addEventListener('click', (e) => {
-        e.preventDefault();
-        e.stopPropagation();
-        
-        // Remove active from all buttons in this dropdown
-        colDeptDropdown.querySelectorAll('button').forEach(b => b.classList.remove('active'));
-        // Add active to clicked button
-        btn.classList.add('active');
-        
-        currentDeptFilter = btn.dataset.filter || '';
-        applyCombinedFilters(currentDeptFilter, currentStatusFilter);
-        closeAllColumnDropdowns();
-      });
+  // header column dropdown buttons: set filter
+  colDeptDropdown.querySelectorAll('button[data-filter]').forEach(btn => {
+    btn.addEventListener('click', () => {
+      closeAllColumnDropdowns();
+      applyCombinedFilters(btn.dataset.filter || '', currentStatusFilter);
     });
-  }
+  });
 
-  if (colStatusDropdown) {
-    colStatusDropdown.querySelectorAll('button[data-filter]').forEach(btn => {
-      btn.addEventListener('click', (e) => {
-        e.preventDefault();
-        e.stopPropagation();
-        
-        // Remove active from all buttons in this dropdown
-        colStatusDropdown.querySelectorAll('button').forEach(b => b.classList.remove('active'));
-        // Add active to clicked button
-        btn.classList.add('active');
-        
-        currentStatusFilter = btn.dataset.filter || '';
-        applyCombinedFilters(currentDeptFilter, currentStatusFilter);
-        closeAllColumnDropdowns();
-      });
+  colStatusDropdown.querySelectorAll('button[data-filter]').forEach(btn => {
+    btn.addEventListener('click', () => {
+      closeAllColumnDropdowns();
+      applyCombinedFilters(currentDeptFilter, btn.dataset.filter || '');
     });
-  }
+  });
 
-  // Navbar department items - FIXED: update both navbar and header dropdown state
-  navbarDeptItems.forEach(a => {
+  // Navbar department items (prevent default navigation and apply filter)
+  document.querySelectorAll('.navbar-dept-filter').forEach(a => {
     a.addEventListener('click', (e) => {
-      e.preventDefault();
-      e.stopPropagation();
-      
-      const val = a.dataset.dept || '';
-      
-      // Update header dropdown button state
-      if (colDeptDropdown) {
-        colDeptDropdown.querySelectorAll('button').forEach(b => b.classList.remove('active'));
-        const matchedBtn = Array.from(colDeptDropdown.querySelectorAll('button')).find(b => (b.dataset.filter || '') === val);
-        if (matchedBtn) matchedBtn.classList.add('active');
-      }
-      
-      currentDeptFilter = val;
-      applyCombinedFilters(currentDeptFilter, currentStatusFilter);
+      e.preventDefault(); // prevent the anchor navigation
       closeAllColumnDropdowns();
+      applyCombinedFilters(a.dataset.dept || '', currentStatusFilter);
     });
   });
 
-  // Select All checkbox behavior - FIXED: only affect visible rows
+  // Infinite scroll: fetch the next keyset page as JSON when the sentinel comes into view
+  let loadingMore = false;
+  async function loadMore() {
+    const cursor = sentinel?.dataset.nextCursor;
+    if (!cursor || loadingMore) return;
+    loadingMore = true;
+    try {
+      // Pages come from the async JSON endpoint, with this page's filters
+      const url = new URL(sentinel.dataset.pageUrl, window.location.origin);
+      new URLSearchParams(window.location.search).forEach((value, key) => url.searchParams.set(key, value));
+      url.searchParams.set('cursor', cursor);
+      const res = await fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
+      const data = await res.json();
+      tableBody.insertAdjacentHTML('beforeend', data.html);
+      sentinel.dataset.nextCursor = data.next_cursor || '';
+      if (!data.next_cursor) sentinel.textContent = '';
+    } catch (err) {
+      console.error('Error loading more requests:', err);
+    } finally {
+      loadingMore = false;
+    }
+  }
+  if (sentinel && 'IntersectionObserver' in window) {
+    new IntersectionObserver(entries => {
+      if (entries.some(entry => entry.isIntersecting)) loadMore();
+    }, {root: scrollBox, rootMargin: '200px'}).observe(sentinel);
+  }
+
+  // Select All checkbox behavior
   const selectAllCheckbox = document.getElementById('selectAll');
   selectAllCheckbox?.addEventListener('change', (e) => {
     const checked = e.target.checked;
-    const rows = getTableRows();
-    rows.forEach(row => {
-      if (row.style.display !== 'none') {
-        const cb = row.querySelector('.req-checkbox');
-        if (cb) cb.checked = checked;
-      }
-    });
-  });
-
-  // Prevent checkbox clicks from triggering anything else
-  document.querySelectorAll('.req-checkbox').forEach(cb => {
-    cb.addEventListener('click', (e) => {
-      e.stopPropagation();
-      updateSelectAllCheckbox();
-    });
+    document.querySelectorAll('.req-checkbox').forEach(cb => cb.checked = checked);
   });
 
-  // AJAX Approve / Reject buttons
-  document.querySelectorAll('form.ajax-form').forEach((form) => {
-    form.addEventListener('submit', async (e) => {
-      e.preventDefault();
-      e.stopPropagation();
-
-      const button = form.querySelector('button[type="submit"]');
-      const originalText = button?.textContent;
-      const isApprove = button?.textContent.trim().toLowerCase().includes('approve');
-      const actionType = isApprove ? 'Approved' : 'Rejected';
-      
-      if (button) {
-        button.disabled = true;
-        button.textContent = 'Processing...';
+  // Bulk approve / reject: one POST for all selected rows, per-row results patch the status cells
+  const bulkUrl = config.bulkUrl;
+  const bulkResultArea = document.getElementById('generatedLinkArea');
+  document.querySelectorAll('.bulk-action-btn').forEach(btn => {
+    btn.addEventListener('click', async () => {
+      const selected = Array.from(document.querySelectorAll('.req-checkbox:checked')).map(i => i.value);
+      if (!selected.length) {
+        alert('Please select at least one request.');
+        return;
       }
 
+      const originalText = btn.textContent;
+      btn.disabled = true;
+      btn.textContent = 'Processing...';
+
       try {
-        const formToken = form.querySelector('[name=csrfmiddlewaretoken]')?.value || CSRF_TOKEN;
-        
-        if (!formToken) {
-          console.error('No CSRF token found!');
-          throw new Error('CSRF token missing');
-        }
-        
-        const formData = new FormData(form);
-        
-        const res = await fetch(form.action, {
+        const fd = new FormData();
+        selected.forEach(id => fd.append('ids[]', id));
+        fd.append('action', btn.dataset.action);
+        fd.append('csrfmiddlewaretoken', config.csrfToken);
+
+        const res = await fetch(bulkUrl, {
           method: 'POST',
-          headers: {
-            'X-CSRFToken': formToken,
-            'X-Requested-With': 'XMLHttpRequest',
-          },
-          body: formData,
+          body: fd,
+          headers: {'X-Requested-With': 'XMLHttpRequest'}
         });
-
-        const contentType = res.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-          const text = await res.text();
-          console.error('Non-JSON response:', text);
-          throw new Error('Server returned non-JSON response');
-        }
-
         const data = await res.json();
 
-        if (data.success) {
-          // Update status in table
-          const row = form.closest('tr');
-          const statusSpan = row.querySelector('.status-cell .status');
+        let updated = 0;
+        (data.results || []).forEach(result => {
+          if (!result.success) return;
+          const cb = document.querySelector(`.req-checkbox[data-id="${result.id}"]`);
+          const statusSpan = cb?.closest('tr').querySelector('.status-cell .status');
           if (statusSpan) {
-            statusSpan.textContent = data.new_status;
-            statusSpan.className = `status ${data.new_status}`;
+            statusSpan.textContent = result.new_status;
+            statusSpan.className = `status ${result.new_status}`;
           }
-          
-          // Reapply filters after status change
-          applyCombinedFilters(currentDeptFilter, currentStatusFilter);
-          
-          // Show success message at the top of the page
-          showMessage(
-            `✅ Request ${actionType.toLowerCase()} successfully! Email notification has been sent to the HOD.`,
-            'success'
-          );
+          if (cb) cb.checked = false;
+          // drop rows that no longer match the active status filter
+          if (currentStatusFilter && result.new_status !== currentStatusFilter) cb?.closest('tr').remove();
+          updated++;
+        });
+
+        if (data.success) {
+          bulkResultArea.innerHTML = `<div class="alert alert-success">✅ ${updated} request(s) updated. Email notifications to the HODs have been queued.</div>`;
         } else {
-          showMessage(data.message || 'Action failed.', 'danger');
+          bulkResultArea.innerHTML = `<div class="alert alert-danger">${data.message || 'Action failed.'}</div>`;
         }
       } catch (err) {
-        console.error('Error:', err);
-        showMessage('Something went wrong while updating status! Please try again.', 'danger');
+        console.error(err);
+        bulkResultArea.innerHTML = `<div class="alert alert-danger">Something went wrong while updating status! Please try again.</div>`;
       } finally {
-        if (button) {
-          button.disabled = false;
-          button.textContent = originalText;
-        }
+        btn.disabled = false;
+        btn.textContent = originalText;
       }
     });
   });
 
   // Quotation button: Generate link and show copy button
   const sendBtn = document.getElementById('sendQuotationBtn');
+  const generateUrl = config.generateUrl;
+  const csrfToken = config.csrfToken;
   const generatedLinkArea = document.getElementById('generatedLinkArea');
-  
+
   sendBtn?.addEventListener('click', async () => {
-    // Only get selected checkboxes from visible rows
-    const visibleRows = getTableRows().filter(row => row.style.display !== 'none');
-    const selected = visibleRows
-      .filter(row => {
-        const cb = row.querySelector('.req-checkbox');
-        return cb && cb.checked;
-      })
-      .map(row => {
-        const cb = row.querySelector('.req-checkbox');
-        return cb ? cb.value : null;
-      })
-      .filter(val => val !== null);
-    
-    if (!selected.length) {
-      showMessage('Please select at least one request.', 'warning');
-      return;
+    const selected = Array.from(document.querySelectorAll('.req-checkbox:checked')).map(i => i.value);
+    if (!selected.length) { 
+      alert('Please select at least one request.'); 
+      return; 
     }
-    
+
     sendBtn.disabled = true;
-    const originalText = sendBtn.textContent;
     sendBtn.textContent = 'Generating...';
-    
+
     try {
       const fd = new FormData();
       selected.forEach(id => fd.append('selected_requests[]', id));
-      fd.append('csrfmiddlewaretoken', CSRF_TOKEN);
-      
-      const res = await fetch(generateUrl, {
-        method: 'POST',
-        body: fd,
-        headers: {
-          'X-Requested-With': 'XMLHttpRequest',
-          'X-CSRFToken': CSRF_TOKEN,
-        }
+      fd.append('csrfmiddlewaretoken', csrfToken);
+
+      const res = await fetch(generateUrl, { 
+        method:'POST', 
+        body: fd, 
+        headers: {'X-Requested-With':'XMLHttpRequest'} 
       });
-      
-      const contentType = res.headers.get('content-type');
-      if (!contentType || !contentType.includes('application/json')) {
-        const text = await res.text();
-        console.error('Non-JSON response:', text);
-        throw new Error('Server returned non-JSON response');
-      }
-      
+
       const data = await res.json();
-      
+
       if (data.success) {
         generatedLinkArea.innerHTML = `
           <div class="alert alert-success mb-2">
             <strong>✅ Quotation link generated successfully!</strong><br>
             <small>Share this link with vendors:</small><br>
             <div class="d-flex align-items-center gap-2 mt-2">
-              <input type="text" class="form-control form-control-sm" id="quotationLinkInput" value="${data.link}" readonly>
+              <input type="text" class="form-control form-control-sm" id="quotationLinkInput" value="${data.link}" readonly style="flex: 1;">
               <button id="copyLinkBtn" class="btn btn-primary btn-sm" title="Copy link">
                 <i class="bi bi-clipboard"></i> Copy
               </button>
@@ -388,65 +225,139 @@ document.addEventListener('DOMContentLoaded', () => {
             <a href="${data.link}" target="_blank" class="text-break small d-block mt-2">${data.link}</a>
           </div>
         `;
-        
+
         // Add copy button functionality
         const copyBtn = document.getElementById('copyLinkBtn');
         const linkInput = document.getElementById('quotationLinkInput');
-        
+
         copyBtn.addEventListener('click', async () => {
           try {
+            // Try using the Clipboard API (modern browsers)
             await navigator.clipboard.writeText(data.link);
             copyBtn.innerHTML = '<i class="bi bi-check"></i> Copied!';
-            copyBtn.classList.replace('btn-primary', 'btn-success');
+            copyBtn.classList.remove('btn-primary');
+            copyBtn.classList.add('btn-success');
+
+            // Reset button after 2 seconds
             setTimeout(() => {
               copyBtn.innerHTML = '<i class="bi bi-clipboard"></i> Copy';
-              copyBtn.classList.replace('btn-success', 'btn-primary');
+              copyBtn.classList.remove('btn-success');
+              copyBtn.classList.add('btn-primary');
             }, 2000);
           } catch (err) {
             // Fallback for older browsers
             linkInput.select();
-            document.execCommand('copy');
-            copyBtn.innerHTML = '<i class="bi bi-check"></i> Copied!';
-            copyBtn.classList.replace('btn-primary', 'btn-success');
-            setTimeout(() => {
-              copyBtn.innerHTML = '<i class="bi bi-clipboard"></i> Copy';
-              copyBtn.classList.replace('btn-success', 'btn-primary');
-            }, 2000);
+            linkInput.setSelectionRange(0, 99999); // For mobile devices
+            try {
+              document.execCommand('copy');
+              copyBtn.innerHTML = '<i class="bi bi-check"></i> Copied!';
+              copyBtn.classList.remove('btn-primary');
+              copyBtn.classList.add('btn-success');
+
+              setTimeout(() => {
+                copyBtn.innerHTML = '<i class="bi bi-clipboard"></i> Copy';
+                copyBtn.classList.remove('btn-success');
+                copyBtn.classList.add('btn-primary');
+              }, 2000);
+            } catch (fallbackErr) {
+              alert('Failed to copy. Please copy manually: ' + data.link);
+            }
           }
         });
       } else {
         generatedLinkArea.innerHTML = `<div class="alert alert-danger">${data.message || 'Failed to generate link'}</div>`;
       }
     } catch (err) {
-      console.error('Error generating quotation link:', err);
+      console.error(err);
       generatedLinkArea.innerHTML = `<div class="alert alert-danger">Error generating link. Please try again.</div>`;
     } finally {
       sendBtn.disabled = false;
-      sendBtn.textContent = originalText;
+      sendBtn.textContent = 'Send Selected to Quotation';
     }
   });
-  
-  // Initialize: Apply any existing filters from URL parameters (if needed)
-  // This ensures filters work on page load if URL has filter parameters
-  const urlParams = new URLSearchParams(window.location.search);
-  const statusParam = urlParams.get('status');
-  const deptParam = urlParams.get('department');
-  
-  if (statusParam && colStatusDropdown) {
-    const statusBtn = Array.from(colStatusDropdown.querySelectorAll('button')).find(
-      b => (b.dataset.filter || '').toLowerCase() === statusParam.toLowerCase()
-    );
-    if (statusBtn) {
-      statusBtn.click();
-    }
-  }
-  
-  if (deptParam && colDeptDropdown) {
-    const deptBtn = Array.from(colDeptDropdown.querySelectorAll('button')).find(
-      b => (b.dataset.filter || '').toLowerCase() === deptParam.toLowerCase()
-    );
-    if (deptBtn) {
-      deptBtn.click();
+
+  // Live updates: the event stream patches single rows instead of reloading the page
+  if (config.eventsUrl && 'EventSource' in window) {
+    const source = new EventSource(config.eventsUrl);
+    const on = (kind, handler) => source.addEventListener(kind, e => handler(JSON.parse(e.data)));
+    const rowFor = id => tableBody?.querySelector(`tr[data-request-id="${id}"]`);
+    const matchesFilters = data => (!currentStatusFilter || data.status === currentStatusFilter) &&
+      (!currentDeptFilter || data.branch === currentDeptFilter);
+
+    // New requests: ask the rows endpoint for the newest rows under this page's filters, so only
+    // matching requests come back, and add the ones not shown yet
+    let pendingNew = 0;
+    let newRowsTimer;
+    async function insertNewRows() {
+      const count = pendingNew;
+      pendingNew = 0;
+      if (!tableBody || !sentinel) {
+        window.location.reload();
+        return;
+      }
+      try {
+        const url = new URL(sentinel.dataset.pageUrl, window.location.origin);
+        new URLSearchParams(window.location.search).forEach((value, key) => url.searchParams.set(key, value));
+        url.searchParams.delete('cursor');
+        url.searchParams.set('page_size', count);
+        const res = await fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
+        const data = await res.json();
+        const template = document.createElement('template');
+        template.innerHTML = data.html;
+        const rows = Array.from(template.content.querySelectorAll('tr[data-request-id]'))
+          .filter(row => !rowFor(row.dataset.requestId));
+        if (!rows.length) return;
+        tableBody.querySelectorAll('tr:not([data-request-id])').forEach(row => row.remove());
+        tableBody.prepend(...rows);
+      } catch (err) {
+        console.error('Error loading new requests:', err);
+      }
     }
+
+    on('request.created', () => {
+      pendingNew++;
+      clearTimeout(newRowsTimer);
+      newRowsTimer = setTimeout(insertNewRows, 300);
+    });
+
+    on('request.status', data => {
+      const row = rowFor(data.id);
+      if (!row) return;
+      if (!matchesFilters(data)) {
+        row.remove();
+        return;
+      }
+      const statusSpan = row.querySelector('.status-cell .status');
+      statusSpan.textContent = data.status;
+      statusSpan.className = `status ${data.status}`;
+    });
+
+    on('request.updated', data => {
+      const row = rowFor(data.id);
+      if (!row) return;
+      if (!matchesFilters(data)) {
+        row.remove();
+        return;
+      }
+      row.querySelector('.title-cell').textContent = data.title;
+      row.querySelector('.dept-cell').textContent = data.branch;
+    });
+
+    on('request.deleted', data => rowFor(data.id)?.remove());
+
+    on('quotation.received', data => {
+      const notice = document.createElement('div');
+      notice.className = 'alert alert-info alert-dismissible fade show';
+      notice.innerHTML = `New quotation from <strong></strong> (₹<span></span>). <a>View batch</a>
+        <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>`;
+      notice.querySelector('strong').textContent = data.company_name;
+      notice.querySelector('span').textContent = Number(data.total_amount).toFixed(2);
+      notice.querySelector('a').href = data.batch_url;
+      document.getElementById('liveNotices')?.prepend(notice);
+    });
+
+    // The feed no longer has the events this page missed
+    on('reset', () => window.location.reload());
   }
-});
+
+}); // DOMContentLoaded
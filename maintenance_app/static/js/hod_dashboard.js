@@ -0,0 +1,103 @@
+// HOD dashboard: live updates from the event stream. Status changes, edits and new requests patch
+// single rows and the summary cards are re-read from the counts API, instead of reloading the page.
+// URLs and the active status filter come from data-* attributes on the dashboard section.
+document.addEventListener('DOMContentLoaded', () => {
+  const section = document.querySelector('.dashboard[data-events-url]');
+  if (!section || !('EventSource' in window)) return;
+  const config = section.dataset;
+  const MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+
+  const rowsBody = () => document.getElementById('hodRequestRows');
+  const rowFor = id => rowsBody()?.querySelector(`tr[data-request-id="${id}"]`);
+  const matchesFilter = status => !config.statusFilter || status === config.statusFilter;
+  const pad = n => String(n).padStart(2, '0');
+
+  // Same format as the server-rendered rows: 18 Oct 2026, 14:05
+  function formatDate(iso) {
+    const d = new Date(iso);
+    return `${pad(d.getDate())} ${MONTHS[d.getMonth()]} ${d.getFullYear()}, ${pad(d.getHours())}:${pad(d.getMinutes())}`;
+  }
+
+  function setStatus(row, status) {
+    const span = row.querySelector('.status-cell .status');
+    span.textContent = status;
+    span.className = `status ${status}`;
+  }
+
+  function buildRow(data) {
+    const row = document.createElement('tr');
+    row.dataset.requestId = data.id;
+    row.dataset.submitted = data.date_submitted;
+    row.innerHTML = `<td class="title-cell"></td><td class="dept-cell"></td>
+      <td class="status-cell"><span class="status"></span></td><td></td>
+      <td><a class="btn-action">View</a></td>`;
+    row.querySelector('.title-cell').textContent = data.title;
+    row.querySelector('.dept-cell').textContent = data.branch;
+    row.children[3].textContent = formatDate(data.date_submitted);
+    row.querySelector('a').href = data.detail_url;
+    setStatus(row, data.status);
+    return row;
+  }
+
+  // Rows are newest first: put the request before the first older one
+  function insertRow(data) {
+    const body = rowsBody();
+    if (!body) {
+      // The page rendered "No maintenance requests yet." without a table
+      window.location.reload();
+      return;
+    }
+    if (rowFor(data.id)) return;
+    const submitted = Date.parse(data.date_submitted);
+    const next = Array.from(body.rows).find(r => Date.parse(r.dataset.submitted) < submitted);
+    body.insertBefore(buildRow(data), next || null);
+  }
+
+  // Several events usually arrive together (bulk approvals): refresh the cards once
+  let countsTimer;
+  function refreshCounts() {
+    clearTimeout(countsTimer);
+    countsTimer = setTimeout(async () => {
+      try {
+        const res = await fetch(config.countsUrl, {headers: {'X-Requested-With': 'XMLHttpRequest'}});
+        const counts = await res.json();
+        section.querySelectorAll('[data-count]').forEach(el => {
+          el.textContent = counts[el.dataset.count];
+        });
+      } catch (err) {
+        console.error('Error refreshing counts:', err);
+      }
+    }, 300);
+  }
+
+  const source = new EventSource(config.eventsUrl);
+  const on = (kind, handler) => source.addEventListener(kind, e => handler(JSON.parse(e.data)));
+
+  on('request.created', data => {
+    if (matchesFilter(data.status)) insertRow(data);
+    refreshCounts();
+  });
+
+  on('request.status', data => {
+    const row = rowFor(data.id);
+    if (!matchesFilter(data.status)) row?.remove();
+    else if (row) setStatus(row, data.status);
+    else insertRow(data);
+    refreshCounts();
+  });
+
+  on('request.updated', data => {
+    const row = rowFor(data.id);
+    if (!row) return;
+    row.querySelector('.title-cell').textContent = data.title;
+    row.querySelector('.dept-cell').textContent = data.branch;
+  });
+
+  on('request.deleted', data => {
+    rowFor(data.id)?.remove();
+    refreshCounts();
+  });
+
+  // The feed no longer has the events this page missed
+  on('reset', () => window.location.reload());
+});
@@ -23,6 +23,9 @@ document.addEventListener('DOMContentLoaded', function () {
         total += subtotal;
 
         selected.push({
+          catalog_id: parseInt(row.dataset.catalogId) || null,
+          // Set on the edit page for lines already saved; they keep their price
+          line_id: parseInt(row.dataset.lineId) || null,
           device: row.querySelector('.device').innerText.trim(),
           brand: row.querySelector('.brand').innerText.trim(),
           size: row.querySelector('.size').innerText.trim(),
@@ -50,29 +53,6 @@ document.addEventListener('DOMContentLoaded', function () {
     qtyInput.addEventListener('input', calculateTotals);
   });
 
-  // Prefill if editing (existingItems comes from template)
-  try {
-    if (typeof existingItems !== 'undefined' && Array.isArray(existingItems) && existingItems.length) {
-      existingItems.forEach(item => {
-        rows.forEach(row => {
-          const device = row.querySelector('.device').innerText.trim();
-          const size = row.querySelector('.size').innerText.trim();
-          const brand = row.querySelector('.brand').innerText.trim();
-
-          // ✅ Match by device + size + brand/model to avoid false matches
-          if (device === item.device && size === item.size && brand === item.brand) {
-            const checkbox = row.querySelector('.item-checkbox');
-            const qtyInput = row.querySelector('.qty-input');
-            checkbox.checked = true;
-            qtyInput.value = item.quantity || 1;
-          }
-        });
-      });
-    }
-  } catch (err) {
-    console.error("Prefill error:", err);
-  }
-
   // Initial calculation
   calculateTotals();
 });
\ No newline at end of file
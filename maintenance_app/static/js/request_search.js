@@ -0,0 +1,64 @@
+// Request search box (partials/request_search.html): queries the full-text search endpoint as you type.
+document.addEventListener('DOMContentLoaded', () => {
+  document.querySelectorAll('.request-search').forEach(box => {
+    const input = box.querySelector('.request-search-input');
+    const list = box.querySelector('.request-search-results');
+    let timer = null;
+    let controller = null;
+
+    function escapeHtml(text) {
+      const div = document.createElement('div');
+      div.textContent = text;
+      return div.innerHTML;
+    }
+
+    function show(results, query) {
+      if (!results.length) {
+        list.innerHTML = `<li class="empty">No requests match “${escapeHtml(query)}”.</li>`;
+      } else {
+        // snippet is escaped server side, with the matched words in <mark>
+        list.innerHTML = results.map(r => `
+          <li><a href="${r.detail_url}">
+            <span class="title">#${r.id} ${escapeHtml(r.title)}</span>
+            <span class="meta">${escapeHtml(r.branch)} · <span class="status ${escapeHtml(r.status)}">${escapeHtml(r.status)}</span>
+              · ${new Date(r.date_submitted).toLocaleDateString()}</span>
+            <span class="snippet">${r.snippet}</span>
+          </a></li>`).join('');
+      }
+      list.hidden = false;
+    }
+
+    async function run() {
+      const query = input.value.trim();
+      if (query.length < 2) {
+        list.hidden = true;
+        return;
+      }
+      controller?.abort();
+      controller = new AbortController();
+      try {
+        const url = new URL(box.dataset.searchUrl, window.location.origin);
+        url.searchParams.set('q', query);
+        const res = await fetch(url, {signal: controller.signal, headers: {'X-Requested-With': 'XMLHttpRequest'}});
+        const data = await res.json();
+        if (data.query === input.value.trim()) show(data.results, query);
+      } catch (err) {
+        if (err.name !== 'AbortError') console.error('Search failed:', err);
+      }
+    }
+
+    input.addEventListener('input', () => {
+      clearTimeout(timer);
+      timer = setTimeout(run, 200);
+    });
+    input.addEventListener('keydown', e => {
+      if (e.key === 'Escape') list.hidden = true;
+    });
+    document.addEventListener('click', e => {
+      if (!box.contains(e.target)) list.hidden = true;
+    });
+    input.addEventListener('focus', () => {
+      if (list.innerHTML && input.value.trim().length >= 2) list.hidden = false;
+    });
+  });
+});
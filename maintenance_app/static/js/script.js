@@ -147,7 +147,7 @@ document.addEventListener("DOMContentLoaded", function () {
           
           // Show success message at the top of the page
           showSuccessMessage(
-            `✅ Request ${actionType.toLowerCase()} successfully! Email notification has been sent to the HOD.`,
+            `✅ Request ${actionType.toLowerCase()} successfully! Email notification to the HOD has been queued.`,
             'success'
           );
         } else {
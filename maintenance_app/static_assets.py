@@ -0,0 +1,89 @@
+"""
+Precompressed, fingerprinted static files.
+
+``build_static`` collects the assets into STATIC_ROOT with content-hashed
+names (ManifestStaticFilesStorage) and writes .gz / .br variants next to the
+text assets. ``serve`` (mounted at STATIC_URL when SERVE_STATIC is on) picks
+the smallest variant the browser accepts, marks hashed files immutable and
+supports Range requests (the homepage video).
+"""
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.utils._os import safe_join
+
+from .files import serve_file
+
+try:
+    import brotli
+except ImportError:  # optional; without it only .gz variants are written
+    brotli = None
+
+COMPRESSIBLE = {'.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.xml'}
+MIN_SIZE = 256
+# ManifestStaticFilesStorage inserts the first 12 hex digits of the MD5: logo.3f2a9c0d1b7e.png
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^.]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=3600'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compress(path):
+    """Write .gz (and .br when brotli is installed) next to ``path`` if that saves space. Returns bytes saved."""
+    data = path.read_bytes()
+    if path.suffix not in COMPRESSIBLE or len(data) < MIN_SIZE:
+        return 0
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    saved = 0
+    for suffix, packed in variants.items():
+        if len(packed) < len(data):
+            path.with_name(path.name + suffix).write_bytes(packed)
+            saved += len(data) - len(packed)
+    return saved
+
+
+def _accepts(header, coding):
+    """True if an Accept-Encoding header allows ``coding`` (q=0 means refused)."""
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() == coding:
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def serve(request, path):
+    """Serve ``path`` from STATIC_ROOT, precompressed when possible."""
+    try:
+        full = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if full.suffix in ('.gz', '.br') or not full.is_file():
+        raise Http404
+
+    content_type = mimetypes.guess_type(full.name)[0] or 'application/octet-stream'
+    served, encoding = full, None
+    # Ranges refer to the identity bytes (video seeking), so only full responses are compressed
+    if 'Range' not in request.headers:
+        accepted = request.headers.get('Accept-Encoding', '')
+        for coding, suffix in ENCODINGS:
+            variant = full.with_name(full.name + suffix)
+            if _accepts(accepted, coding) and variant.is_file():
+                served, encoding = variant, coding
+                break
+
+    stat = served.stat()
+    etag = f'{stat.st_mtime_ns:x}-{stat.st_size:x}' + (f'-{encoding}' if encoding else '')
+    cache_control = IMMUTABLE if HASHED_NAME_RE.search(full.name) else REVALIDATE
+    response = serve_file(request, served, etag, content_type, cache_control=cache_control)
+    if full.suffix in COMPRESSIBLE:
+        response['Vary'] = 'Accept-Encoding'
+    if encoding and response.status_code != 304:
+        response['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,112 @@
+"""
+Job handlers for work that used to run inline in the views
+(approval letter PDF + email, rejection email, new request notification).
+Mails are put in the outbox (maintenance_app.outbox); run_jobs sends them.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from . import letters, outbox
+from .jobs import handler
+from .models import MaintenanceRequest
+
+
+def approval_message(req, pdf):
+    """Approval email for the HOD with the letter PDF attached."""
+    subject = f"Maintenance Request Approved: {req.title}"
+    message = (
+        f"Dear {req.hod.first_name or req.hod.username},\n\n"
+        f"Your maintenance request titled '{req.title}' for branch {req.branch} "
+        f"has been approved.\n\n"
+        f"Total Amount: ₹{req.total_amount}\n\n"
+        f"The detailed request letter (with equipment list) is attached as a PDF.\n\n"
+        f"Thank you,\nAdmin Team"
+    )
+
+    email = EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[req.hod.email],
+    )
+    email.attach('RequestLetter.pdf', pdf, 'application/pdf')
+    return email
+
+
+def rejection_message(req):
+    """Rejection email for the HOD."""
+    subject = f"Maintenance Request Rejected: {req.title}"
+    message = (
+        f"Dear {req.hod.first_name or req.hod.username},\n\n"
+        f"Your maintenance request titled '{req.title}' for branch {req.branch} "
+        f"has been rejected.\n\n"
+        f"Admin Remark: {req.admin_remark}\n\n"
+        f"Total Amount: ₹{req.total_amount}\n\n"
+        f"Thank you,\nAdmin Team"
+    )
+    return EmailMessage(subject=subject, body=message, from_email=settings.DEFAULT_FROM_EMAIL, to=[req.hod.email])
+
+
+@handler('approval_letter')
+def send_approval_letter(request_id, status='Approved'):
+    """Render the request letter to PDF and mail it to the HOD (unless the request is no longer ``status``)."""
+    req = (MaintenanceRequest.objects.select_related('hod').prefetch_related('items')
+           .filter(pk=request_id, status=status).first())
+    if req is None or not req.hod.email:
+        return
+    outbox.queue(approval_message(req, letters.letter_pdf(req)), kind='approval_letter')
+
+
+@handler('rejection_notice')
+def send_rejection_notice(request_id, status='Rejected'):
+    """Mail the HOD that their request was rejected (unless it is no longer ``status``)."""
+    req = MaintenanceRequest.objects.select_related('hod').filter(pk=request_id, status=status).first()
+    if req is None or not req.hod.email:
+        return
+    outbox.queue(rejection_message(req), kind='rejection_notice')
+
+
+@handler('bulk_decision')
+def send_bulk_decision(request_ids, status):
+    """Mails for a bulk approve/reject; the outbox sends them in batches over one connection."""
+    reqs = (MaintenanceRequest.objects.select_related('hod').prefetch_related('items')
+            .filter(pk__in=request_ids, status=status)
+            .exclude(hod__email=''))
+    if status == 'Approved':
+        kind, outgoing = 'approval_letter', [approval_message(req, letters.letter_pdf(req)) for req in reqs]
+    else:
+        kind, outgoing = 'rejection_notice', [rejection_message(req) for req in reqs]
+    # All or nothing, so a retried job doesn't queue the first mails twice
+    with transaction.atomic():
+        for message in outgoing:
+            outbox.queue(message, kind=kind)
+
+
+@handler('new_request_notice')
+def notify_admins_new_request(request_id, link):
+    """Mail superusers and the principal about a newly submitted request."""
+    req = MaintenanceRequest.objects.select_related('hod').filter(pk=request_id).first()
+    if req is None:
+        return
+
+    # Get admins and principals
+    admins = User.objects.filter(is_superuser=True)
+    principals = User.objects.filter(username__iexact='principal')
+    recipients = list(admins) + list(principals)
+    recipient_emails = [u.email for u in recipients if u.email]
+    if not recipient_emails:
+        return
+
+    subject = f'New Maintenance Request Submitted: {req.title}'
+    html_content = render_to_string('emails/new_request.html', {
+        'req': req,
+        'user': req.hod,
+        'link': link,
+    })
+
+    msg = EmailMultiAlternatives(subject, '', 'no-reply@yourdomain.com', recipient_emails)
+    msg.attach_alternative(html_content, "text/html")
+    outbox.queue(msg, kind='new_request_notice')
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.test import TestCase
+from django.urls import reverse
+
+from maintenance_app import counters, jobs, rollup
+from maintenance_app.models import MaintenanceRequest, Profile, RequestStatusCount
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+class CounterCacheTests(TestCase):
+    """The RequestStatusCount counters and the DailyBranchStats rollup must always match the requests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', is_superuser=True)
+        Profile.objects.create(user=cls.admin, role='ADMIN')
+        cls.hods = []
+        for branch in ('CSE', 'ECE'):
+            hod = User.objects.create_user(f'hod_{branch.lower()}', password='x')
+            Profile.objects.create(user=hod, role='HOD', branch=branch)
+            cls.hods.append(hod)
+        cls.requests = [
+            MaintenanceRequest.objects.create(
+                title=f'Request {n}', description='d', branch=hod.profile.branch, hod=hod,
+                status=status, total_amount=Decimal(100 * (n + 1)))
+            for n, (hod, status) in enumerate([
+                (cls.hods[0], 'Pending'), (cls.hods[0], 'Pending'), (cls.hods[0], 'Approved'),
+                (cls.hods[1], 'Pending'), (cls.hods[1], 'Rejected'),
+            ])
+        ]
+
+    def assertCachesMatchRequests(self):
+        live = {(row['hod'], row['status']): row['n'] for row in
+                MaintenanceRequest.objects.order_by().values('hod', 'status').annotate(n=Count('id'))}
+        stored = {(row.hod_id, row.status): row.count for row in RequestStatusCount.objects.exclude(count=0)}
+        self.assertEqual(stored, live)
+        self.assertEqual(rollup.check(), {})
+
+    def bulk(self, action, ids):
+        self.client.force_login(self.admin)
+        return self.client.post(reverse('bulk_update_status'), {'action': action, 'ids[]': ids}, **AJAX)
+
+    def test_single_saves_and_deletes(self):
+        req = self.requests[0]
+        req.status = 'Approved'
+        req.save()
+        req.total_amount = Decimal('999.00')
+        req.save()
+        self.requests[1].hod = self.hods[1]
+        self.requests[1].save()
+        self.requests[3].delete()
+        self.assertCachesMatchRequests()
+        self.assertEqual(counters.status_counts(self.hods[0]),
+                         {'total': 2, 'pending': 0, 'approved': 2, 'rejected': 0})
+
+    def test_bulk_update_keeps_counters_and_rollup(self):
+        # A mix of Pending, already Approved, Rejected and an id that doesn't exist
+        ids = [r.id for r in self.requests] + [9999]
+        response = self.bulk('approve', ids)
+        self.assertTrue(response.json()['success'])
+        self.assertEqual([r['success'] for r in response.json()['results']], [True] * 5 + [False])
+        self.assertCachesMatchRequests()
+        self.assertEqual(counters.status_counts(),
+                         {'total': 5, 'pending': 0, 'approved': 5, 'rejected': 0})
+        self.assertEqual(counters.status_counts(self.hods[1]),
+                         {'total': 2, 'pending': 0, 'approved': 2, 'rejected': 0})
+
+        self.bulk('reject', [self.requests[0].id, self.requests[3].id])
+        self.assertCachesMatchRequests()
+        self.assertEqual(counters.status_counts()['rejected'], 2)
+
+    def test_bulk_update_rolls_back_when_the_job_cannot_be_queued(self):
+        with mock.patch.object(jobs, 'enqueue', side_effect=RuntimeError('queue down')):
+            with self.assertRaises(RuntimeError):
+                self.bulk('approve', [r.id for r in self.requests])
+        self.assertEqual(MaintenanceRequest.objects.filter(status='Approved').count(), 1)
+        self.assertCachesMatchRequests()
+
+    def test_rebuild_matches_incremental_updates(self):
+        self.bulk('reject', [self.requests[1].id])
+        before = set(RequestStatusCount.objects.exclude(count=0).values_list('hod', 'status', 'count'))
+        stored = rollup.stored_totals()
+        counters.rebuild()
+        rollup.rebuild()
+        self.assertEqual(set(RequestStatusCount.objects.values_list('hod', 'status', 'count')), before)
+        self.assertEqual(rollup.stored_totals(), stored)
@@ -0,0 +1,98 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from maintenance_app import jobs, tasks
+from maintenance_app.models import BackgroundJob, MaintenanceRequest, OutboundEmail
+
+calls = []
+
+
+def flaky(fail_times):
+    """Test handler that raises on its first ``fail_times`` runs."""
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError(f"failure {len(calls)}")
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        patcher = mock.patch.dict(jobs.handlers(), {'test_flaky': flaky})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_due(self, job):
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+    def test_failed_job_is_requeued_with_backoff(self):
+        job = jobs.enqueue('test_flaky', fail_times=1)
+        before = timezone.now()
+        with self.assertLogs('maintenance_app.jobs', 'WARNING'):
+            self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Queued', 1))
+        self.assertIn('failure 1', job.last_error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=jobs.backoff_delay(1)))
+        # Not due yet: the worker leaves it alone
+        self.assertEqual(jobs.run_pending(), 0)
+
+        self.make_due(job)
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), ('Done', 2, None))
+
+    def test_job_fails_after_max_attempts(self):
+        job = jobs.enqueue('test_flaky', max_attempts=3, fail_times=10)
+        with self.assertLogs('maintenance_app.jobs', 'WARNING') as logs:
+            for _ in range(3):
+                self.make_due(job)
+                jobs.run_pending()
+        self.assertIn('failed permanently', logs.output[-1])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Failed', 3))
+        self.make_due(job)
+        self.assertEqual(jobs.run_pending(), 0)
+        self.assertEqual(len(calls), 3)
+
+    def test_backoff_grows_and_is_capped(self):
+        delays = [jobs.backoff_delay(n) for n in range(1, 20)]
+        self.assertEqual(delays, sorted(delays))
+        self.assertEqual(delays[-1], jobs.RETRY_MAX_SECONDS)
+
+    def test_a_job_is_claimed_once(self):
+        job = jobs.enqueue('test_flaky', fail_times=0)
+        self.assertEqual(jobs.claim_next().pk, job.pk)
+        self.assertIsNone(jobs.claim_next())
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = jobs.enqueue('test_flaky', fail_times=0)
+        jobs.claim_next()
+        BackgroundJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=30))
+        self.assertEqual(jobs.requeue_stale(15), 1)
+        self.assertEqual(jobs.run_pending(), 1)
+
+    def test_unknown_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            jobs.enqueue('no_such_job')
+
+
+class DecisionMailTests(TestCase):
+    """A delayed or retried decision job must not mail a decision that has since been reversed."""
+
+    def setUp(self):
+        hod = User.objects.create_user('hod', email='hod@example.com')
+        self.req = MaintenanceRequest.objects.create(title='t', description='d', branch='CSE', hod=hod,
+                                                     status='Rejected')
+
+    def test_approval_letter_skips_a_request_that_is_no_longer_approved(self):
+        tasks.send_approval_letter(request_id=self.req.pk, status='Approved')
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_rejection_notice_is_queued_while_the_request_is_rejected(self):
+        tasks.send_rejection_notice(request_id=self.req.pk, status='Rejected')
+        self.assertEqual(list(OutboundEmail.objects.values_list('kind', flat=True)), ['rejection_notice'])
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core.mail import EmailMessage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from maintenance_app import outbox
+from maintenance_app.models import OutboundEmail
+
+
+class FakeConnection:
+    """Connection whose open() / send_messages() fail as scripted."""
+
+    def __init__(self, open_errors, send_error=None):
+        self.open_errors = open_errors
+        self.send_error = send_error
+
+    def open(self):
+        if self.open_errors:
+            raise self.open_errors.pop(0)
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if self.send_error:
+            raise self.send_error
+        return len(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class DispatchTests(TestCase):
+
+    def setUp(self):
+        self.rows = [outbox.queue(EmailMessage(f'Subject {n}', 'Body', 'portal@example.com', ['hod@example.com']))
+                     for n in range(3)]
+
+    def dispatch(self, *connections):
+        connections = list(connections)
+        with mock.patch.object(outbox, 'get_connection', lambda **kwargs: connections.pop(0)):
+            if not connections:
+                return outbox.dispatch(throttle=outbox.Throttle(0))
+            with self.assertLogs('maintenance_app.outbox', 'WARNING'):
+                return outbox.dispatch(throttle=outbox.Throttle(0))
+
+    def states(self):
+        return list(OutboundEmail.objects.order_by('id').values_list('status', 'attempts'))
+
+    def test_sends_a_batch(self):
+        self.assertEqual(outbox.dispatch(throttle=outbox.Throttle(0)), 3)
+        self.assertEqual(self.states(), [('Sent', 1)] * 3)
+        self.assertEqual(outbox.dispatch(throttle=outbox.Throttle(0)), 0)
+
+    def test_refused_connection_requeues_every_claimed_row(self):
+        start = timezone.now()
+        self.assertEqual(self.dispatch(FakeConnection([ConnectionRefusedError(111, 'refused')])), 3)
+        self.assertEqual(self.states(), [('Queued', 1)] * 3)
+        for row in OutboundEmail.objects.all():
+            self.assertIn('ConnectionRefusedError', row.last_error)
+            self.assertGreater(row.next_attempt_at, start)
+        # Backed off: nothing is due on the next round
+        self.assertEqual(self.dispatch(), 0)
+
+    def test_failed_reopen_requeues_the_rest_of_the_batch(self):
+        dropped = FakeConnection([], send_error=SMTPServerDisconnected('bye'))
+        self.dispatch(dropped, FakeConnection([ConnectionRefusedError(111, 'refused')]))
+        self.assertEqual(self.states(), [('Queued', 1)] * 3)
+        errors = list(OutboundEmail.objects.order_by('id').values_list('last_error', flat=True))
+        self.assertIn('SMTPServerDisconnected', errors[0])
+        self.assertTrue(all('ConnectionRefusedError' in error for error in errors[1:]))
+
+    def test_row_fails_after_max_attempts(self):
+        OutboundEmail.objects.update(attempts=4, max_attempts=5)
+        self.dispatch(FakeConnection([OSError('network down')]))
+        self.assertEqual(self.states(), [('Failed', 5)] * 3)
+
+    def test_stale_sending_rows_are_requeued(self):
+        outbox.claim_batch(10)
+        OutboundEmail.objects.update(updated_at=timezone.now() - timedelta(minutes=30))
+        self.assertEqual(outbox.requeue_stale(15), 3)
+        self.assertEqual(outbox.dispatch(throttle=outbox.Throttle(0)), 3)
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from maintenance_app.models import MaintenanceRequest
+from maintenance_app.pagination import decode_cursor, keyset_page
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        hod = User.objects.create_user('hod')
+        now = timezone.now()
+        for n in range(7):
+            req = MaintenanceRequest.objects.create(title=f'Request {n}', description='d', branch='CSE', hod=hod)
+            # Pairs share a timestamp, so the id tie-breaker decides the order within them
+            MaintenanceRequest.objects.filter(pk=req.pk).update(date_submitted=now - timedelta(days=n // 2))
+
+    def walk(self, queryset, page_size):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(queryset, cursor, page_size)
+            pages.append([r.pk for r in rows])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        expected = list(MaintenanceRequest.objects.order_by('-date_submitted', '-id').values_list('pk', flat=True))
+        pages = self.walk(MaintenanceRequest.objects.all(), 3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_exact_multiple_has_no_empty_last_page(self):
+        pages = self.walk(MaintenanceRequest.objects.all(), 7)
+        self.assertEqual([len(page) for page in pages], [7])
+
+    def test_rows_added_while_paging_do_not_shift_later_pages(self):
+        queryset = MaintenanceRequest.objects.all()
+        first, cursor = keyset_page(queryset, None, 3)
+        MaintenanceRequest.objects.create(title='Newer', description='d', branch='CSE', hod=first[0].hod)
+        second, _ = keyset_page(queryset, cursor, 3)
+        expected = list(queryset.order_by('-date_submitted', '-id').exclude(title='Newer')
+                        .values_list('pk', flat=True))[3:6]
+        self.assertEqual([r.pk for r in second], expected)
+
+    def test_invalid_cursor_starts_from_the_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        rows, _ = keyset_page(MaintenanceRequest.objects.all(), 'not-a-cursor', 3)
+        self.assertEqual(rows, keyset_page(MaintenanceRequest.objects.all(), None, 3)[0])
@@ -14,12 +14,23 @@ urlpatterns = [
     path('request/<int:pk>/approve/', views.approve_request, name='approve_request'),
     path('request/<int:pk>/reject/', views.reject_request, name='reject_request'),
     path('request/<int:pk>/edit/',views.edit_request, name='edit_request'),
+    path('request/<int:pk>/letter/', views.request_letter, name='request_letter'),
+    path('requests/bulk-status/', views.bulk_update_status, name='bulk_update_status'),
+    path('jobs/<int:pk>/', views.job_status, name='job_status'),
     path('quotation/generate/', views.generate_quotation_link, name='generate_quotation_link'),
     path('quotation/fill/<str:token>/', views.quotation_fill_view, name='quotation_fill'),
     path('quotation/view/', views.principal_view_quotations, name='principal_view_quotations'),
     path('quotation/select/<int:response_id>/', views.select_quotation, name='select_quotation'),
     path('reports/', views.reports_view, name='reports'),
+    path('reports/data/', views.reports_data, name='reports_data'),
+    path('api/counts/', views.dashboard_counts, name='dashboard_counts'),
+    path('api/requests/', views.requests_page, name='requests_page'),
+    path('api/search/', views.search_requests, name='search_requests'),
+    path('api/events/', views.event_stream, name='event_stream'),
+    path('reports/export/', views.reports_export, name='reports_export'),
     path('departments/', views.department_list, name='department_list'),
+    path('metrics/', views.metrics, name='metrics'),
     path('principal/quotations/<int:batch_id>/',views.principal_view_quotations_batch,name='principal_view_quotations_batch'),
+    path('principal/quotations/<int:batch_id>/comparison/', views.quotation_comparison, name='quotation_comparison'),
 ]
  
\ No newline at end of file
@@ -1,28 +1,37 @@
-
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from .models import MaintenanceRequest, Profile
-from .forms import MaintenanceRequestForm
-from django.contrib.auth.models import User
-from django.contrib.auth.views import LoginView
-from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.views import LoginView, redirect_to_login
+from django.core.handlers.asgi import ASGIRequest
 from django.contrib.auth import logout
-import json,uuid
-from django.core.mail import send_mail
-from django.conf import settings
-from django.core.mail import EmailMessage
-import tempfile
-import os
-from weasyprint import HTML
-from django.template.loader import render_to_string
-from django.core.mail import EmailMultiAlternatives
 from django.urls import reverse
 from django.views.decorators.cache import never_cache
-import uuid, json
-from django.shortcuts import render, redirect, get_object_or_404
-from .models import MaintenanceRequest, QuotationBatch, QuotationResponse, QuotationItem
-from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.template.loader import render_to_string
+from .models import MaintenanceRequest, QuotationBatch, QuotationResponse, BackgroundJob
+from . import blocking, caching, catalog, changefeed, counters, files, jobs, letters, pdf_pool, profiling, reports, rollup, search
+from .quotations import acomparison_matrix, batch_snapshot, comparison_matrix, create_batch, price_field, submit_quotation
+from .items import device_summary, edit_rows, parse_selected_items, replace_items
+from .pagination import akeyset_page, date_range_from, filter_requests, keyset_page, page_size_from
+
+BULK_ACTIONS = {
+    'approve': ('Approved', 'Approved by admin'),
+    'reject': ('Rejected', 'Rejected by admin'),
+}
+ROWS_TEMPLATES = {
+    'admin': 'partials/admin_request_rows.html',
+    'report': 'partials/report_rows.html',
+}
 
 
 def is_admin(user): 
@@ -34,6 +43,30 @@ def is_admin(user):
         return user.is_superuser
 
 
+def _resolve_user(request):
+    """Load the lazy request.user (session and user queries); returns (authenticated, admin)."""
+    user = request.user
+    return user.is_authenticated, user.is_authenticated and is_admin(user)
+
+
+def _async_access(admin):
+    # login_required / user_passes_test only wrap sync views in Django 4.2
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            authenticated, request.user_is_admin = await sync_to_async(_resolve_user)(request)
+            if not authenticated or (admin and not request.user_is_admin):
+                return redirect_to_login(request.get_full_path())
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Async counterparts of @login_required and @login_required + @user_passes_test(is_admin)
+async_login_required = _async_access(admin=False)
+async_admin_required = _async_access(admin=True)
+
+
 @login_required
 @user_passes_test(is_admin)
 def generate_quotation_link(request):
@@ -45,11 +78,11 @@ def generate_quotation_link(request):
         if not selected_ids:
             return JsonResponse({"success": False, "message": "Please select at least one request."})
 
-        # create a quotation batch
-        batch = QuotationBatch.objects.create(
-            requests=json.dumps(selected_ids),
-            token=uuid.uuid4().hex
-        )
+        # create a quotation batch (line items are snapshotted here)
+        try:
+            batch = create_batch(selected_ids)
+        except ValueError:
+            return JsonResponse({"success": False, "message": "Invalid request selection."})
 
         # generate URL for vendor fill page (use quotation_fill with token)
         try:
@@ -65,25 +98,13 @@ def generate_quotation_link(request):
 
 def quotation_fill_view(request, token):
     """Vendor fills and submits quotation form."""
-    batch = get_object_or_404(QuotationBatch, token=token)
-    request_ids = batch.get_request_list()
-    requests = MaintenanceRequest.objects.filter(id__in=request_ids)
-
-    # Collect all maintenance request items
-    items = []
-    for req in requests:
-        try:
-            req_items = json.loads(req.selected_items)
-            for i in req_items:
-                items.append({
-                    "request_id": req.id,
-                    "request_title": req.title,
-                    "device": i.get("device", ""),
-                    "brand": i.get("brand", ""),
-                    "quantity": i.get("quantity", 1),
-                })
-        except Exception:
-            continue
+    # Frozen line snapshot, cached by token
+    snapshot = batch_snapshot(token)
+    if snapshot is None:
+        raise Http404("Quotation link not found.")
+    items = snapshot['lines']
+    # Lines with the name of their price input, for the form
+    rows = [dict(line, price_field=price_field(line)) for line in items]
 
     # Handle form submission
     if request.method == "POST":
@@ -92,38 +113,15 @@ def quotation_fill_view(request, token):
 
         if not company_name or not email:
             messages.error(request, "Company name and email are required.")
-            return render(request, "quotation_fill.html", {"items": items, "batch": batch})
-
-        # Create a new quotation response
-        quotation = QuotationResponse.objects.create(batch=batch, company_name=company_name, email=email)
-
-        total = 0
-        for item in items:
-            try:
-                price = float(request.POST.get(f"price_{item['request_id']}_{item['device']}", 0))
-            except ValueError:
-                price = 0
-
-            subtotal = price * int(item["quantity"])
-            total += subtotal
-
-            QuotationItem.objects.create(
-                quotation=quotation,
-                request_id=item["request_id"],
-                device=item["device"],
-                brand=item["brand"],
-                quantity=item["quantity"],
-                price=price,
-                subtotal=subtotal,
-            )
-
-        quotation.total_amount = total
-        quotation.save()
+            return render(request, "quotation_fill.html", {"items": rows})
+
+        # One transaction: response + all items in a single bulk insert
+        submit_quotation(snapshot['id'], company_name, email, items, request.POST)
 
         messages.success(request, "Your quotation has been submitted successfully!")
         return redirect(request.path)  # Stay on same page (shows success message)
 
-    return render(request, "quotation_fill.html", {"items": items, "batch": batch})
+    return render(request, "quotation_fill.html", {"items": rows})
 
 
 # -------------------------------------------------------------------
@@ -133,8 +131,14 @@ def quotation_fill_view(request, token):
 @user_passes_test(is_admin)
 def principal_view_quotations(request):
     """List all quotation batches."""
-    batches = QuotationBatch.objects.all().order_by("-created_at")
-    return render(request, "quotation_list.html", {"batches": batches})
+    batches = (QuotationBatch.objects.prefetch_related('requests')
+               .annotate(response_count=Count('responses')).order_by("-created_at"))
+    return render(request, "quotation_list.html", {
+        "batches": batches,
+        # The table is cached until a batch or vendor response changes
+        "fragment_ttl": caching.fragment_ttl(),
+        "quotations_version": caching.version(caching.QUOTATIONS),
+    })
 
 
 # -------------------------------------------------------------------
@@ -143,12 +147,15 @@ def principal_view_quotations(request):
 @login_required
 @user_passes_test(is_admin)
 def principal_view_quotations_batch(request, batch_id):
-    batch = get_object_or_404(QuotationBatch, id=batch_id)
-    quotations = QuotationResponse.objects.filter(batch=batch).order_by("-submitted_at")
+    batch = get_object_or_404(QuotationBatch.objects.prefetch_related('requests'), id=batch_id)
+    # Items for every vendor in one extra query instead of one per card
+    quotations = (QuotationResponse.objects.filter(batch=batch)
+                  .prefetch_related('items').order_by("-submitted_at"))
 
     return render(request, "quotation_batch_detail.html", {
         "batch": batch,
         "quotations": quotations,
+        "comparison": comparison_matrix(batch.id),
     })
 
 # -------------------------------------------------------------------
@@ -207,12 +214,19 @@ def home_redirect(request):
         except Exception:
             return redirect('hod_dashboard')
 
-    return render(request, 'homepage.html')
+    # The public homepage is the same for every visitor: render once per TTL
+    ttl = caching.public_page_ttl()
+    html = cache.get_or_set('page:homepage', lambda: render_to_string('homepage.html'), ttl)
+    response = HttpResponse(html)
+    patch_cache_control(response, public=True, max_age=ttl)
+    return response
 
 
 @never_cache
 @login_required
 def hod_dashboard(request):
+    # Read first: the live updates resume from here, so nothing committed after the render is missed
+    last_event_id = changefeed.latest_id()
     # Base queryset (only this HOD’s requests)
     requests = MaintenanceRequest.objects.filter(hod=request.user).order_by('-date_submitted')
 
@@ -222,51 +236,38 @@ def hod_dashboard(request):
     if status_filter:
         requests = requests.filter(status=status_filter)
 
-    # Summary counts for cards
-    total = requests.count() if not status_filter else MaintenanceRequest.objects.filter(hod=request.user).count()
-    pending = MaintenanceRequest.objects.filter(hod=request.user, status="Pending").count()
-    approved = MaintenanceRequest.objects.filter(hod=request.user, status="Approved").count()
-    rejected = MaintenanceRequest.objects.filter(hod=request.user, status="Rejected").count()
+    # Summary counts for cards (counter cache, one query)
+    counts = counters.status_counts(hod=request.user)
 
     context = {
         "requests": requests,
-        "total": total,
-        "pending": pending,
-        "approved": approved,
-        "rejected": rejected,
+        "total": counts["total"],
+        "pending": counts["pending"],
+        "approved": counts["approved"],
+        "rejected": counts["rejected"],
         "status_filter": status_filter,
+        # The table fragment is cached until this HOD's requests change
+        "fragment_ttl": caching.fragment_ttl(),
+        "requests_version": caching.version(caching.hod_scope(request.user.id)),
+        "last_event_id": last_event_id,
     }
 
     return render(request, "hod_dashboard.html", context)
 
 @login_required
 def new_request(request):
-    items = [
-        {"device": "SSD", "brand": "Any", "size": "256GB", "price": 1750, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "RAM", "brand": "Any", "size": "8GB ddr3", "price": 1600, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Motherboard", "brand": "Any", "size": "G41-LGA 775 Socket", "price": 1800, "usage": "win-7", "remarks": "best and less price"},
-        {"device": "Motherboard", "brand": "Any", "size": "H61-LGA 1155 Socket", "price": 2100, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Motherboard", "brand": "Any", "size": "H110-LGA 1151 Socket", "price": 2100, "usage": "win-11", "remarks": "best and less price"},
-        {"device": "Processor", "brand": "i3 3rd gen", "size": "any", "price": 1200, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Processor", "brand": "Intel dual core", "size": "any", "price": 1000, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "SMPS", "brand": "Any", "size": "any", "price": 650, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Keyboard", "brand": "Any", "size": "any", "price": 700, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Mouse", "brand": "Any", "size": "any", "price": 400, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Keyboard-Mouse combo", "brand": "Any", "size": "any", "price": 1000, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "USB to PS2 Connector", "brand": "Any", "size": "any", "price": 650, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "USB to LAN Connector", "brand": "Any", "size": "any", "price": 650, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Monitor", "brand": "Any", "size": "any", "price": 5600, "usage": "win-11", "remarks": "best and less price"},
-        {"device": "One Set (i3)", "brand": "G61 + H61", "size": "SSD 256GB + RAM 8GB", "price": 7200, "usage": "-", "remarks": "Souza's Price 7200"},
-        {"device": "One Set (i5)", "brand": "Gh110", "size": "SSD 256GB + RAM 8GB ddr4", "price": 8800, "usage": "-", "remarks": "Souza's Price 8800"},
-        {"device": "One Set (Dual core)", "brand": "G41", "size": "SSD 256GB + RAM 8GB", "price": 6500, "usage": "-", "remarks": "Souza's Price"},
-    ]
+    items = catalog.catalog_items()
 
     if request.method == 'POST':
         branch = request.POST.get('branch')
         title = request.POST.get('title')
         description = request.POST.get('description')
-        selected_items = request.POST.get('selected_items')  
-        total_amount = request.POST.get('total_amount')
+        try:
+            # Prices and total come from the catalog, not from the posted form
+            entries, total_amount = catalog.price_entries(parse_selected_items(request.POST.get('selected_items')))
+        except ValueError:
+            messages.error(request, "Invalid equipment data. Please select the items again.")
+            return render(request, 'new_request.html', {'items': items})
 
         # Create the request
         mr = MaintenanceRequest(
@@ -274,8 +275,7 @@ def new_request(request):
             description=description,
             branch=branch,
             hod=request.user,
-            selected_items=selected_items,
-            total_amount=total_amount or 0
+            total_amount=total_amount
         )
 
         # Set branch if not provided
@@ -285,30 +285,12 @@ def new_request(request):
         except Exception:
             pass
 
-        mr.save()
-
-        # ------------------- Send Email ------------------- #
-        # Get admins and principals
-        admins = User.objects.filter(is_superuser=True)
-        principals = User.objects.filter(username__iexact='principal')
-        recipients = list(admins) + list(principals)
-        recipient_emails = [u.email for u in recipients if u.email]
-
-        if recipient_emails:
-            subject = f'New Maintenance Request Submitted: {mr.title}'
-            link = f'http://yourdomain.com/request/{mr.pk}/'  # replace with your domain
-
-            # Render HTML email template
-            html_content = render_to_string('emails/new_request.html', {
-                'req': mr,
-                'user': request.user,
-                'link': link
-            })
-
-            msg = EmailMultiAlternatives(subject, '', 'no-reply@yourdomain.com', recipient_emails)
-            msg.attach_alternative(html_content, "text/html")
-            msg.send()
-        # -------------------------------------------------- #
+        with transaction.atomic():
+            mr.save()
+            replace_items(mr, entries)
+            # Notify admins/principal in the background
+            jobs.enqueue('new_request_notice', request_id=mr.pk,
+                         link=request.build_absolute_uri(reverse('request_detail', args=[mr.pk])))
 
         messages.success(request, 'Request submitted successfully.')
         return redirect('hod_dashboard')
@@ -317,33 +299,62 @@ def new_request(request):
 
 @login_required
 def request_detail(request, pk):
-    req = get_object_or_404(MaintenanceRequest, pk=pk)
-    items = []
+    req = get_object_or_404(MaintenanceRequest.objects.prefetch_related('items'), pk=pk)
 
-    if req.selected_items:
-        try:
-            items = json.loads(req.selected_items)
-            # Handle double-encoded JSON if needed
-            if isinstance(items, str):
-                items = json.loads(items)
+    return render(request, 'request_detail.html', {
+        'req': req,
+        'items': req.items.all(),
+    })
 
-            # Compute subtotal
-            for item in items:
-                try:
-                    price = float(item.get('price', 0))
-                    quantity = int(item.get('quantity', 1))
-                    item['subtotal'] = price * quantity
-                except (ValueError, TypeError):
-                    item['subtotal'] = 0
 
-            print(items)  # 👈 Check console output
+@async_login_required
+async def request_letter(request, pk):
+    """The request letter as PDF; rendered once per version of the request, then served from disk."""
+    queryset = MaintenanceRequest.objects.select_related('hod').prefetch_related('items')
+    try:
+        req = await queryset.aget(pk=pk)
+    except MaintenanceRequest.DoesNotExist:
+        raise Http404
+    if req.hod_id != request.user.id and not request.user_is_admin:
+        raise Http404
+    html = await sync_to_async(letters.letter_html)(req)
+    try:
+        # WeasyPrint (and waiting for a free renderer) happens off the event loop
+        path, key = await blocking.run(letters.stored_letter, req.pk, html)
+    except pdf_pool.RenderError as e:
+        response = HttpResponse(f"The letter could not be generated right now ({e}). Please try again.",
+                                status=503, content_type='text/plain')
+        response['Retry-After'] = '30'
+        return response
+    return files.serve_file(request, path, key, 'application/pdf', filename=f'RequestLetter-{req.pk}.pdf')
+
+
+def request_row(r):
+    """JSON shape of one request row for the paginated dashboard/report tables."""
+    return {
+        "id": r.id,
+        "title": r.title,
+        "branch": r.branch,
+        "status": r.status,
+        "date_submitted": r.date_submitted.isoformat(),
+        "total_amount": str(r.total_amount),
+        "detail_url": reverse('request_detail', args=[r.id]),
+    }
 
-        except (json.JSONDecodeError, TypeError):
-            items = []
 
-    return render(request, 'request_detail.html', {
-        'req': req,
-        'items': items,
+def paginated_requests(request, queryset, rows_template):
+    """
+    Filter + keyset-paginate ``queryset`` from the GET params.
+    Returns (page, next_cursor, json_response); json_response is set for ?format=json.
+    """
+    queryset = filter_requests(queryset, request.GET)
+    page, next_cursor = keyset_page(queryset, request.GET.get('cursor'), page_size_from(request.GET))
+    if request.GET.get('format') != 'json':
+        return page, next_cursor, None
+    return page, next_cursor, JsonResponse({
+        "results": [request_row(r) for r in page],
+        "html": render_to_string(rows_template, {'requests': page}, request=request),
+        "next_cursor": next_cursor,
     })
 
 
@@ -353,34 +364,31 @@ def request_detail(request, pk):
 def admin_dashboard(request):
     status_filter = request.GET.get('status') or ''
     department_filter = request.GET.get('department') or ''
+    last_event_id = changefeed.latest_id()
 
-    requests_qs = MaintenanceRequest.objects.order_by('-date_submitted')
-
-    # Apply filters
-    if status_filter:
-        requests_qs = requests_qs.filter(status=status_filter)
+    # Filtered, keyset-paginated rows (?cursor=, ?page_size=, ?format=json for "load more")
+    page, next_cursor, json_response = paginated_requests(
+        request, MaintenanceRequest.objects.all(), 'partials/admin_request_rows.html')
+    if json_response:
+        return json_response
 
-    if department_filter:
-        requests_qs = requests_qs.filter(branch=department_filter)
+    # Counts for cards (counter cache, one query)
+    counts = counters.status_counts()
 
-    # Counts for cards
-    total = MaintenanceRequest.objects.count()
-    pending = MaintenanceRequest.objects.filter(status='Pending').count()
-    approved = MaintenanceRequest.objects.filter(status='Approved').count()
-    rejected = MaintenanceRequest.objects.filter(status='Rejected').count()
-
-    # Distinct departments for dropdown (sorted)
-    departments = list(MaintenanceRequest.objects.values_list('branch', flat=True).distinct().order_by('branch'))
+    # Distinct departments for dropdown (sorted, cached)
+    departments = caching.departments()
 
     context = {
-        'requests': requests_qs,
-        'total': total,
-        'pending': pending,
-        'approved': approved,
-        'rejected': rejected,
+        'requests': page,
+        'next_cursor': next_cursor,
+        'total': counts['total'],
+        'pending': counts['pending'],
+        'approved': counts['approved'],
+        'rejected': counts['rejected'],
         'departments': departments,
         'status_filter': status_filter,
         'department_filter': department_filter,
+        'last_event_id': last_event_id,
     }
     return render(request, 'admin_dashboard.html', context)
 
@@ -397,66 +405,19 @@ def approve_request(request, pk):
     # update status and admin remark
     req.status = 'Approved'
     req.admin_remark = request.POST.get('admin_remark', 'Approved by admin')
-    req.save()
-
-    # Build items list safely
-    items = []
-    if req.selected_items:
-        try:
-            items = json.loads(req.selected_items)
-            if isinstance(items, str):
-                items = json.loads(items)
-        except (json.JSONDecodeError, TypeError):
-            items = []
-
-    # Try to send email with PDF; if fails, continue but report in console
-    try:
-        hod_email = req.hod.email
-        if hod_email:
-            html_content = render_to_string('request_letter.html', {'request_obj': req, 'items': items})
-
-            # Write PDF to temp file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                HTML(string=html_content).write_pdf(temp_file.name)
-                pdf_path = temp_file.name
-
-            subject = f"Maintenance Request Approved: {req.title}"
-            message = (
-                f"Dear {req.hod.first_name or req.hod.username},\n\n"
-                f"Your maintenance request titled '{req.title}' for branch {req.branch} "
-                f"has been approved.\n\n"
-                f"Total Amount: ₹{req.total_amount}\n\n"
-                f"The detailed request letter (with equipment list) is attached as a PDF.\n\n"
-                f"Thank you,\nAdmin Team"
-            )
-
-            email = EmailMessage(
-                subject=subject,
-                body=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[hod_email],
-            )
-
-            with open(pdf_path, 'rb') as f:
-                email.attach('RequestLetter.pdf', f.read(), 'application/pdf')
-
-            email.send(fail_silently=False)
-
-            # Remove temp file
-            try:
-                os.remove(pdf_path)
-            except OSError:
-                pass
-    except Exception as e:
-        # log exception for debugging (print or logger)
-        print("Error sending approval email/PDF:", e)
+    # One transaction: the status never changes without its letter job (and vice versa)
+    with transaction.atomic():
+        req.save()
+        # PDF letter + email are rendered and sent by the job worker
+        job = jobs.enqueue('approval_letter', request_id=req.pk, status='Approved')
 
     # If AJAX, return JSON
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({"success": True, "new_status": "Approved"})
+        return JsonResponse({"success": True, "new_status": "Approved", "job_id": job.id,
+                             "job_url": reverse('job_status', args=[job.id])})
 
     # Non-AJAX: flash message and redirect
-    messages.success(request, 'Request approved and letter (with equipment) sent as PDF.')
+    messages.success(request, 'Request approved. The letter (with equipment) will be emailed as PDF shortly.')
     return redirect('admin_dashboard')
 
 
@@ -471,56 +432,95 @@ def reject_request(request, pk):
     req = get_object_or_404(MaintenanceRequest, pk=pk)
     req.status = 'Rejected'
     req.admin_remark = request.POST.get('admin_remark', 'Rejected by admin')
-    req.save()
-
-    # Try to send rejection email (no PDF required)
-    try:
-        hod_email = req.hod.email
-        if hod_email:
-            subject = f"Maintenance Request Rejected: {req.title}"
-            message = (
-                f"Dear {req.hod.first_name or req.hod.username},\n\n"
-                f"Your maintenance request titled '{req.title}' for branch {req.branch} "
-                f"has been rejected.\n\n"
-                f"Admin Remark: {req.admin_remark}\n\n"
-                f"Total Amount: ₹{req.total_amount}\n\n"
-                f"Thank you,\nAdmin Team"
-            )
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [hod_email], fail_silently=False)
-    except Exception as e:
-        print("Error sending rejection email:", e)
+    with transaction.atomic():
+        req.save()
+        # Rejection email is sent by the job worker
+        job = jobs.enqueue('rejection_notice', request_id=req.pk, status='Rejected')
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({"success": True, "new_status": "Rejected"})
+        return JsonResponse({"success": True, "new_status": "Rejected", "job_id": job.id,
+                             "job_url": reverse('job_status', args=[job.id])})
 
-    messages.success(request, 'Request rejected and email notification sent.')
+    messages.success(request, 'Request rejected. Email notification queued.')
     return redirect('admin_dashboard')
 
+@login_required
+@user_passes_test(is_admin)
+def bulk_update_status(request):
+    """
+    AJAX endpoint: approve or reject many requests at once.
+    POST ids[] + action (approve/reject) [+ admin_remark]; all rows are updated
+    with a single UPDATE and the mails go out as one background job.
+    Returns per-row results so the dashboard can patch every status cell.
+    """
+    if request.method != "POST":
+        return JsonResponse({"success": False, "message": "Invalid request."}, status=405)
+
+    action = request.POST.get('action')
+    if action not in BULK_ACTIONS:
+        return JsonResponse({"success": False, "message": "Unknown action."}, status=400)
+    new_status, default_remark = BULK_ACTIONS[action]
+
+    try:
+        ids = {int(i) for i in request.POST.getlist('ids[]') or request.POST.getlist('ids')}
+    except ValueError:
+        return JsonResponse({"success": False, "message": "Invalid request id."}, status=400)
+    if not ids:
+        return JsonResponse({"success": False, "message": "Please select at least one request."})
+
+    with transaction.atomic():
+        rows = MaintenanceRequest.objects.filter(id__in=ids)
+        # .update() skips the model signals, so move the status counters and feed the dashboards here
+        before = list(rows.only(*changefeed.PAYLOAD_FIELDS))
+        found = {r.id for r in before}
+        grouped = list(rows.order_by().values('hod', 'status').annotate(n=Count('id')))
+        rolled = rollup.grouped_for_update(rows)
+        rows.update(
+            status=new_status,
+            admin_remark=request.POST.get('admin_remark') or default_remark,
+            updated_at=timezone.now(),
+        )
+        counters.apply_grouped(grouped, new_status)
+        rollup.apply_grouped(rolled, new_status)
+        changefeed.record_status_changes(before, new_status)
+        transaction.on_commit(lambda: caching.requests_changed(*(row['hod'] for row in grouped)))
+        # Same transaction as the UPDATE: no status change without its mail job
+        job = jobs.enqueue('bulk_decision', request_ids=sorted(found), status=new_status) if found else None
+
+    results = [
+        {"id": i, "success": True, "new_status": new_status} if i in found
+        else {"id": i, "success": False, "message": "Request not found."}
+        for i in sorted(ids)
+    ]
+    return JsonResponse({
+        "success": bool(found),
+        "results": results,
+        "job_id": job.id if job else None,
+        "job_url": reverse('job_status', args=[job.id]) if job else None,
+    })
+
+@login_required
+@user_passes_test(is_admin)
+def job_status(request, pk):
+    """JSON status of a background job (used to follow up on queued approval/rejection mails)."""
+    job = get_object_or_404(BackgroundJob, pk=pk)
+    return JsonResponse({
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat(),
+        "last_error": job.last_error,
+    })
+
 @login_required
 @user_passes_test(is_admin)
 def edit_request(request, pk):
     req = get_object_or_404(MaintenanceRequest, pk=pk)
 
     # equipment list (same as new_request)
-    items = [
-        {"device": "SSD", "brand": "Any", "size": "256GB", "price": 1750, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "RAM", "brand": "Any", "size": "8GB ddr3", "price": 1600, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Motherboard", "brand": "Any", "size": "G41-LGA 775 Socket", "price": 1800, "usage": "win-7", "remarks": "best and less price"},
-        {"device": "Motherboard", "brand": "Any", "size": "H61-LGA 1155 Socket", "price": 2100, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Motherboard", "brand": "Any", "size": "H110-LGA 1151 Socket", "price": 2100, "usage": "win-11", "remarks": "best and less price"},
-        {"device": "Processor", "brand": "i3 3rd gen", "size": "any", "price": 1200, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Processor", "brand": "Intel dual core", "size": "any", "price": 1000, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "SMPS", "brand": "Any", "size": "any", "price": 650, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Keyboard", "brand": "Any", "size": "any", "price": 700, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Mouse", "brand": "Any", "size": "any", "price": 400, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Keyboard-Mouse combo", "brand": "Any", "size": "any", "price": 1000, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "USB to PS2 Connector", "brand": "Any", "size": "any", "price": 650, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "USB to LAN Connector", "brand": "Any", "size": "any", "price": 650, "usage": "win-10", "remarks": "best and less price"},
-        {"device": "Monitor", "brand": "Any", "size": "any", "price": 5600, "usage": "win-11", "remarks": "best and less price"},
-        {"device": "One Set (i3)", "brand": "G61 + H61", "size": "SSD 256GB + RAM 8GB", "price": 7200, "usage": "-", "remarks": "Souza's Price 7200"},
-        {"device": "One Set (i5)", "brand": "Gh110", "size": "SSD 256GB + RAM 8GB ddr4", "price": 8800, "usage": "-", "remarks": "Souza's Price 8800"},
-        {"device": "One Set (Dual core)", "brand": "G41", "size": "SSD 256GB + RAM 8GB", "price": 6500, "usage": "-", "remarks": "Souza's Price"},
-    ]
+    items = catalog.catalog_items()
 
     if request.method == 'POST':
         # Update basic fields
@@ -529,73 +529,243 @@ def edit_request(request, pk):
         req.lab_name = request.POST.get('lab_name', req.lab_name)
         req.description = request.POST.get('description', req.description)
 
-        # Handle selected items JSON
-        sel_items = request.POST.get('selected_items', '')
-        total_amount = request.POST.get('total_amount', '0')
-
+        # Handle selected items JSON: saved lines keep their price, new ones are priced from the catalog
         try:
-            if sel_items:
-                json.loads(sel_items)  # Validate JSON
-                req.selected_items = sel_items
-            else:
-                req.selected_items = None
-        except json.JSONDecodeError:
+            entries, req.total_amount = catalog.price_entries(
+                parse_selected_items(request.POST.get('selected_items', '')),
+                lines={line.id: line for line in req.items.all()})
+        except ValueError:
             messages.error(request, "Invalid equipment data. Items not saved.")
             return redirect('admin_dashboard')
 
-        # Assign total
-        try:
-            req.total_amount = float(total_amount)
-        except ValueError:
-            req.total_amount = 0.0
-
-        req.save()
+        with transaction.atomic():
+            req.save()
+            replace_items(req, entries)
         messages.success(request, "Request updated successfully.")
         return redirect('admin_dashboard')
 
-    # For GET request → Preload selected items for display
-    selected_data = {}
-    if req.selected_items:
-        try:
-            selected_items = json.loads(req.selected_items)
-            # Use a unique key to differentiate same devices (like multiple Motherboards)
-            for item in selected_items:
-                key = f"{item.get('device')}_{item.get('size')}"
-                selected_data[key] = item.get('quantity', 0)
-        except (json.JSONDecodeError, TypeError):
-            selected_data = {}
-
+    # For GET request → the catalog with the saved lines preselected
     return render(request, 'edit_request.html', {
         'req': req,
-        'items': items,
-        'selected_data': selected_data,
+        'rows': edit_rows(req, items),
     })
 
 def user_logout(request):
     logout(request)
     return redirect('home_redirect') 
 
-from django.shortcuts import render
-
 @login_required
 @user_passes_test(is_admin)
 def reports_view(request):
-    """View for displaying maintenance reports with filtering."""
-    # Get all maintenance requests ordered by date
-    requests = MaintenanceRequest.objects.all().order_by('-date_submitted')
-    
-    # Get distinct departments for the filter dropdown
-    departments = list(MaintenanceRequest.objects.values_list('branch', flat=True).distinct().order_by('branch'))
-    
+    """View for displaying maintenance reports with server-side filtering and paging."""
+    page, next_cursor, json_response = paginated_requests(
+        request, MaintenanceRequest.objects.all(), 'partials/report_rows.html')
+    if json_response:
+        return json_response
+
+    # Get distinct departments for the filter dropdown (cached)
+    departments = caching.departments()
+    date_from, date_to = date_range_from(request.GET)
+    # Equipment totals for the same filters, aggregated over RequestItem in SQL
+    summary = device_summary(filter_requests(MaintenanceRequest.objects.all(), request.GET))
+    # Per period / branch / status totals (cached per filters + bucket)
+    period_rows = reports.aggregate(request.GET)
+
     context = {
-        'requests': requests,
+        'requests': page,
+        'next_cursor': next_cursor,
+        'device_summary': summary,
+        'period_rows': period_rows,
+        'period_totals': reports.totals(period_rows),
+        'bucket': reports.bucket_from(request.GET),
+        'buckets': list(reports.BUCKETS),
+        'export_query': request.GET.urlencode(),
         'departments': departments,
+        'department_filter': request.GET.get('department') or 'All',
+        'range_filter': request.GET.get('range') or '',
+        'date_from': date_from,
+        'date_to': date_to,
     }
-    
+
     return render(request, 'reports.html', context)
 
+@async_admin_required
+async def reports_data(request):
+    """JSON reports API: ?bucket=day|week|month plus the usual status/department/date filters."""
+    rows = await reports.aaggregate(request.GET)
+    totals = reports.totals(rows)
+    return JsonResponse({
+        "bucket": reports.bucket_from(request.GET),
+        "rows": [dict(r, period=r['period'].isoformat(), amount=str(r['amount'] or 0)) for r in rows],
+        "totals": dict(totals, amount=str(totals['amount'])),
+    })
+
+
+@async_login_required
+async def dashboard_counts(request):
+    """Dashboard card counts as JSON: every request for admins, the HOD's own otherwise."""
+    return JsonResponse(await counters.astatus_counts(None if request.user_is_admin else request.user))
+
+
+@async_login_required
+async def requests_page(request):
+    """
+    One keyset page of requests as JSON for the "load more" tables (?cursor=, ?page_size= and
+    the status/department/date filters). Admins page through every request (?rows=admin|report
+    picks the row markup), HODs through their own.
+    """
+    queryset = MaintenanceRequest.objects.all()
+    if request.user_is_admin:
+        rows_template = ROWS_TEMPLATES.get(request.GET.get('rows'), ROWS_TEMPLATES['admin'])
+    else:
+        queryset = queryset.filter(hod_id=request.user.id)
+        rows_template = ROWS_TEMPLATES['report']
+    page, next_cursor = await akeyset_page(
+        filter_requests(queryset, request.GET), request.GET.get('cursor'), page_size_from(request.GET))
+    return JsonResponse({
+        "results": [request_row(r) for r in page],
+        "html": render_to_string(rows_template, {'requests': page}, request=request),
+        "next_cursor": next_cursor,
+    })
+
+
+@async_login_required
+async def search_requests(request):
+    """
+    Full-text search as JSON (?q=, ?limit=): best matches first, each with a highlighted snippet.
+    Admins search every request, HODs their own.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = int(request.GET.get('limit') or search.DEFAULT_LIMIT)
+    except ValueError:
+        limit = search.DEFAULT_LIMIT
+    hod = None if request.user_is_admin else request.user.id
+    results = await sync_to_async(search.search)(query, hod=hod, limit=limit)
+    return JsonResponse({
+        "query": query,
+        "results": [dict(request_row(r), snippet=r.snippet) for r in results],
+    })
+
+
+def _event_data(event):
+    """An event's payload plus the links the dashboards follow."""
+    data = dict(event.payload)
+    if event.kind in (changefeed.QUOTATION_RECEIVED, changefeed.QUOTATION_UPDATED):
+        data['batch_url'] = reverse('principal_view_quotations_batch', args=[data['batch_id']])
+    elif event.request_id and event.kind != changefeed.REQUEST_DELETED:
+        data['detail_url'] = reverse('request_detail', args=[event.request_id])
+    return changefeed.message(event.id, event.kind, data)
+
+
+@async_login_required
+async def event_stream(request):
+    """
+    Server-Sent Events feed of dashboard changes (maintenance_app.changefeed), resuming after the
+    Last-Event-ID header or ?last_event_id= (the newest event when neither is given). Admins get
+    every event, HODs those of their own requests. Under ASGI the stream stays open; under WSGI
+    each connection returns what is pending, so a dashboard never holds a sync worker.
+    """
+    hod_id = None if request.user_is_admin else request.user.id
+    raw = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_id = int(raw) if raw else None
+    except ValueError:
+        last_id = None
+    prelude = f"retry: {int(settings.CHANGE_FEED_RETRY_SECONDS * 1000)}\n\n"
+    if last_id is None or await changefeed.aexpired(last_id):
+        if last_id is not None:
+            prelude += changefeed.message(None, changefeed.RESET, {})
+        last_id = await changefeed.alatest_id()
+        prelude += f"id: {last_id}\n\n"
+
+    if not isinstance(request, ASGIRequest):
+        events = await changefeed.aevents_after(last_id, hod_id)
+        response = HttpResponse(prelude + ''.join(_event_data(e) for e in events), content_type='text/event-stream')
+    else:
+        async def stream(last_id):
+            yield prelude
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.CHANGE_FEED_STREAM_SECONDS
+            quiet_since = loop.time()
+            while loop.time() < deadline:
+                events = await changefeed.aevents_after(last_id, hod_id)
+                if events:
+                    last_id = events[-1].id
+                    quiet_since = loop.time()
+                    yield ''.join(_event_data(e) for e in events)
+                    if len(events) == changefeed.BATCH_SIZE:
+                        continue
+                elif loop.time() - quiet_since >= settings.CHANGE_FEED_HEARTBEAT_SECONDS:
+                    # Comment line: keeps proxies from timing out an idle connection
+                    quiet_since = loop.time()
+                    yield ": ping\n\n"
+                await changefeed.wait(min(settings.CHANGE_FEED_POLL_SECONDS, max(deadline - loop.time(), 0)))
+
+        response = StreamingHttpResponse(stream(last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@async_admin_required
+async def quotation_comparison(request, batch_id):
+    """Vendor comparison matrix of a batch as JSON (see quotations.comparison_matrix)."""
+    if not await QuotationBatch.objects.filter(id=batch_id).aexists():
+        raise Http404
+    return JsonResponse(await acomparison_matrix(batch_id))
+
+
+@login_required
+@user_passes_test(is_admin)
+def reports_export(request):
+    """
+    Stream the filtered report as CSV or XLSX (?format=csv|xlsx).
+    ?kind=summary exports the bucketed totals, anything else the individual requests.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in reports.EXPORT_FORMATS:
+        return JsonResponse({"success": False, "message": "Unknown export format."}, status=400)
+    stream, content_type, extension = reports.EXPORT_FORMATS[fmt]
+
+    if request.GET.get('kind') == 'summary':
+        header, rows = reports.SUMMARY_HEADER, reports.summary_rows(request.GET)
+        name = f"report-{reports.bucket_from(request.GET)}"
+    else:
+        header, rows = reports.REQUESTS_HEADER, reports.request_rows(request.GET)
+        name = "requests"
+
+    response = StreamingHttpResponse(stream(header, rows), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{name}-{timezone.localdate():%Y%m%d}.{extension}"'
+    return response
+
+
 def department_list(request):
-    return render(request, 'department_list.html')
+    """Departments with their request counts (fragment cached until requests change)."""
+    departments = (MaintenanceRequest.objects.order_by('branch').values('branch')
+                   .annotate(total=Count('id')))
+    return render(request, 'department_list.html', {
+        'departments': departments,
+        'fragment_ttl': caching.fragment_ttl(),
+        'requests_version': caching.version(caching.REQUESTS),
+    })
+
+
+def metrics(request):
+    """
+    Prometheus metrics of this process (only when PROFILING_ENABLED).
+    Open to admins, or to scrapers sending ``Authorization: Bearer <PROFILING_METRICS_TOKEN>``.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise Http404
+    token = settings.PROFILING_METRICS_TOKEN
+    bearer = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    allowed = (token and constant_time_compare(bearer, token)) or (
+        request.user.is_authenticated and is_admin(request.user))
+    if not allowed:
+        return HttpResponse("Forbidden", status=403, content_type='text/plain')
+    return HttpResponse(profiling.REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 def reports_page(request):